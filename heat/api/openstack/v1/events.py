@@ -106,6 +106,13 @@ class EventController(object):
 
         return [format_event(req, e, keys) for e in events]
 
+    def _paged_event_list(self, req, identity, marker=None, **kwargs):
+        def fetch(limit, marker):
+            return self._event_list(req, identity, limit=limit,
+                                    marker=marker, **kwargs)
+
+        return util.paged_list(fetch, lambda e: e['id'], marker=marker)
+
     @util.identified_stack
     def index(self, req, identity, resource_name=None):
         """Lists summary information for all events."""
@@ -140,6 +147,11 @@ class EventController(object):
         else:
             filter_params['resource_name'] = resource_name
 
+        if resource_name is None and rpc_api.PARAM_LIMIT not in params:
+            events = self._paged_event_list(
+                req, identity, filters=filter_params, **params)
+            return {'events': events}
+
         events = self._event_list(
             req, identity, filters=filter_params, **params)
 
@@ -306,9 +306,22 @@ class StackController(object):
             cnxt = req.context
             include_project = False
 
-        stacks = self.rpc_client.list_stacks(cnxt,
-                                             filters=filter_params,
-                                             **params)
+        if rpc_api.PARAM_LIMIT in params:
+            stacks = self.rpc_client.list_stacks(cnxt,
+                                                 filters=filter_params,
+                                                 **params)
+        else:
+            def fetch(limit, marker):
+                page_params = dict(params)
+                if limit is not None:
+                    page_params.update(limit=limit, marker=marker)
+                return self.rpc_client.list_stacks(cnxt,
+                                                   filters=filter_params,
+                                                   **page_params)
+
+            stacks = util.paged_list(
+                fetch, lambda s: s[rpc_api.STACK_ID]['stack_id'],
+                marker=params.get('marker'))
         count = None
         if with_count:
             try:
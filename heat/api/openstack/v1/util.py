@@ -11,11 +11,15 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+from oslo_config import cfg
 import six
 from webob import exc
 
 from heat.common.i18n import _
 from heat.common import identifier
+from heat.common import serializers
+
+cfg.CONF.import_opt('api_list_page_size', 'heat.common.wsgi')
 
 
 def policy_enforce(handler):
@@ -111,3 +115,32 @@ def get_allowed_params(params, whitelist):
             allowed_params[key] = value
 
     return allowed_params
+
+
+def paged_list(fetch, get_marker, marker=None):
+    """Return a list of items retrieved from the engine a page at a time.
+
+    ``fetch`` is called with the ``limit`` and ``marker`` of each page and
+    returns the items in it, and ``get_marker`` returns the marker for the
+    page following an item. The first page is retrieved immediately, so that
+    any error is reported in the usual way; the rest are retrieved only as the
+    response is written.
+
+    If paging is disabled, the whole list is retrieved at once.
+    """
+    page_size = cfg.CONF.api_list_page_size
+    if page_size <= 0:
+        return fetch(limit=None, marker=marker)
+
+    first_page = fetch(limit=page_size, marker=marker)
+
+    def items():
+        page = first_page
+        while True:
+            for item in page:
+                yield item
+            if len(page) < page_size:
+                return
+            page = fetch(limit=page_size, marker=get_marker(page[-1]))
+
+    return serializers.StreamedList(items())
@@ -15,6 +15,7 @@ import itertools
 
 from heat.api.openstack.v1 import util
 from heat.api.openstack.v1.views import views_common
+from heat.common import serializers
 from heat.rpc import api as rpc_api
 
 _collection_name = 'stacks'
@@ -65,8 +66,12 @@ def format_stack(req, stack, keys=None, include_project=False):
 
 def collection(req, stacks, count=None, include_project=False):
     keys = basic_keys
-    formatted_stacks = [format_stack(req, s, keys, include_project)
-                        for s in stacks]
+    if isinstance(stacks, serializers.StreamedList):
+        formatted_stacks = serializers.StreamedList(
+            format_stack(req, s, keys, include_project) for s in stacks)
+    else:
+        formatted_stacks = [format_stack(req, s, keys, include_project)
+                            for s in stacks]
 
     result = {'stacks': formatted_stacks}
     links = views_common.get_collection_links(req, formatted_stacks)
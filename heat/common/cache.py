@@ -91,6 +91,55 @@ def register_cache_configurations(conf):
     conf.register_group(find_cache_group)
     conf.register_opts(find_cache_opts, group=find_cache_group)
 
+    stack_list_cache_group = cfg.OptGroup('stack_list_cache')
+    stack_list_cache_opts = [
+        cfg.IntOpt('expiration_time', default=60,
+                   help=_(
+                       'TTL, in seconds, for any cached item in the '
+                       'dogpile.cache region used for caching of the '
+                       'results of listing and counting stacks.')),
+        cfg.BoolOpt('caching', default=False,
+                    help=_(
+                        'Toggle to enable/disable caching when Orchestration '
+                        'Engine lists or counts the stacks of a tenant. '
+                        'Cached results are discarded whenever the state of '
+                        'a stack of the tenant changes. Only the cache of '
+                        'the engine making the change is invalidated, so '
+                        'when more than one engine worker or host is '
+                        'running, a backend shared between them (such as '
+                        'memcached) must be configured in the [cache] group, '
+                        'otherwise results may be out of date for up to '
+                        'expiration_time seconds. Please note that the '
+                        'global toggle for oslo.cache(enabled=True in [cache] '
+                        'group) must be enabled to use this feature.'))
+    ]
+    conf.register_group(stack_list_cache_group)
+    conf.register_opts(stack_list_cache_opts, group=stack_list_cache_group)
+
+    nested_output_cache_group = cfg.OptGroup('nested_output_cache')
+    nested_output_cache_opts = [
+        cfg.IntOpt('expiration_time', default=30,
+                   help=_(
+                       'TTL, in seconds, for any cached item in the '
+                       'dogpile.cache region used for caching of the '
+                       'outputs of nested stacks. Outputs that refer to '
+                       'live attributes of resources, which can change '
+                       'without the nested stack changing, may be out of '
+                       'date for up to this long.')),
+        cfg.BoolOpt('caching', default=True,
+                    help=_(
+                        'Toggle to enable/disable caching when Orchestration '
+                        'Engine retrieves the outputs of a complete nested '
+                        'stack to resolve the attributes of its parent '
+                        'resource. Cached outputs are discarded whenever the '
+                        'state of the nested stack changes. Please note that '
+                        'the global toggle for oslo.cache(enabled=True in '
+                        '[cache] group) must be enabled to use this feature.'))
+    ]
+    conf.register_group(nested_output_cache_group)
+    conf.register_opts(nested_output_cache_opts,
+                       group=nested_output_cache_group)
+
     return conf
 
 
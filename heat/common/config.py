@@ -160,6 +160,119 @@ engine_opts = [
                help=_('Maximum events that will be available per stack. Older'
                       ' events will be deleted when this is reached. Set to 0'
                       ' for unlimited events per stack.')),
+    cfg.BoolOpt('compress_event_properties',
+                default=False,
+                help=_('Compress the resource properties stored with each '
+                       'event. This allows larger properties to be stored '
+                       'in full at the cost of some CPU time, but the '
+                       'stored data can no longer be read directly from '
+                       'the database.')),
+    cfg.BoolOpt('event_write_behind',
+                default=False,
+                help=_('Buffer events in the engine and write them to the '
+                       'database in batches instead of one at a time. '
+                       'Pending events are always written when a stack '
+                       'changes state.')),
+    cfg.IntOpt('event_write_behind_batch_size',
+               default=100,
+               min=1,
+               help=_('Maximum number of buffered events that will be '
+                      'written in a single batch when event_write_behind '
+                      'is enabled.')),
+    cfg.FloatOpt('event_write_behind_interval',
+                 default=1.0,
+                 min=0,
+                 help=_('Maximum time in seconds an event may stay buffered '
+                        'before it is written to the database when '
+                        'event_write_behind is enabled.')),
+    cfg.IntOpt('template_cache_max_size',
+               default=16777216,
+               min=0,
+               help=_('Maximum approximate size in bytes of the stored '
+                      'templates that each engine keeps parsed in memory '
+                      'for loading resource definitions. Set to 0 to '
+                      'disable the template cache.')),
+    cfg.StrOpt('sync_point_store',
+               default='sql',
+               help=_('The storage driver used for convergence sync points. '
+                      'The "sql" driver stores them in the Heat database. '
+                      'The "memory" driver keeps them in the engine process; '
+                      'it requires num_engine_workers to be 1, and the '
+                      'engine refuses to start while heat-engine is running '
+                      'on another host.')),
+    cfg.IntOpt('sync_point_compress_threshold',
+               default=0,
+               min=0,
+               help=_('Size in bytes above which the data passed between '
+                      'resources during a convergence traversal is '
+                      'compressed. Set to 0 to disable compression.')),
+    cfg.IntOpt('poll_backoff_max_period',
+               default=1,
+               min=1,
+               help=_('Maximum number of scheduler steps (of about one '
+                      'second each) to wait between successive checks of '
+                      'whether a resource action has completed. The wait '
+                      'increases exponentially, with random jitter, once '
+                      'poll_backoff_initial_polls checks have been made. '
+                      'Set to 1 to check on every step.')),
+    cfg.IntOpt('poll_backoff_initial_polls',
+               default=10,
+               min=0,
+               help=_('Number of checks of whether a resource action has '
+                      'completed that are made on every scheduler step '
+                      'before the wait between checks starts to '
+                      'increase.')),
+    cfg.FloatOpt('poll_backoff_factor',
+                 default=1.5,
+                 min=1,
+                 help=_('Factor by which the wait between checks of whether '
+                        'a resource action has completed increases after '
+                        'each check.')),
+    cfg.IntOpt('server_status_poll_interval',
+               default=0,
+               min=0,
+               help=_('Minimum number of seconds between bulk requests to '
+                      'Nova for the status of the servers in a project that '
+                      'the engine is waiting on. When enabled, the status '
+                      'checks of servers that are being built or deleted '
+                      'are answered from a single list of the servers that '
+                      'have changed, instead of a request per server. Set '
+                      'to 0 to fetch each server separately.')),
+    cfg.IntOpt('volume_status_poll_interval',
+               default=0,
+               min=0,
+               help=_('Number of seconds for which a list of the volumes in '
+                      'a project is used to answer the status checks of '
+                      'the volumes in a transitional state, such as '
+                      'creating or extending, that the engine is waiting '
+                      'on. The volumes are only listed when that takes '
+                      'fewer requests than fetching each of them. Set to 0 '
+                      'to fetch each volume separately.')),
+    cfg.IntOpt('max_concurrent_stack_operations',
+               default=0,
+               min=0,
+               help=_('Maximum number of stack operations and convergence '
+                      'resource checks of top-level stacks that may run at '
+                      'once in each engine worker. Further operations are '
+                      'queued and started fairly between tenants, and '
+                      'between the stacks of each tenant. Operations on '
+                      'nested stacks and signals are never queued. Set to 0 '
+                      'for no limit.')),
+    cfg.DictOpt('stack_operation_tenant_weights',
+                default={},
+                help=_('Relative share of the operations allowed by '
+                       'max_concurrent_stack_operations given to each '
+                       'tenant, as a map of tenant IDs to weights greater '
+                       'than 0. Tenants that are not listed have a weight '
+                       'of 1.')),
+    cfg.BoolOpt('local_nested_stack_operations',
+                default=False,
+                help=_('Create and update nested stacks in the engine that '
+                       'is running the operation on their parent stack, '
+                       'reusing the parsed nested template, instead of '
+                       'sending a request over RPC. Requests are still sent '
+                       'over RPC when another engine holds the lock on the '
+                       'parent stack.')),
     cfg.IntOpt('stack_action_timeout',
                default=3600,
                help=_('Timeout in seconds for stack action (ie. create or'
@@ -18,11 +18,17 @@ from heat.common import template_format
 SECTIONS = (
     PARAMETERS, RESOURCE_REGISTRY, PARAMETER_DEFAULTS,
     ENCRYPTED_PARAM_NAMES, EVENT_SINKS,
-    PARAMETER_MERGE_STRATEGIES,
+    PARAMETER_MERGE_STRATEGIES, CONCURRENCY_LIMITS,
 ) = (
     'parameters', 'resource_registry', 'parameter_defaults',
     'encrypted_param_names', 'event_sinks',
-    'parameter_merge_strategies',
+    'parameter_merge_strategies', 'concurrency_limits',
+)
+
+CONCURRENCY_LIMITS_KEYS = (
+    MAX_RESOURCES, RESOURCE_TYPES,
+) = (
+    'max_resources', 'resource_types',
 )
 
 
@@ -65,7 +71,8 @@ def validate(env):
 def default_for_missing(env):
     """Checks a parsed environment for missing sections."""
     for param in SECTIONS:
-        if param not in env and param != PARAMETER_MERGE_STRATEGIES:
+        if param not in env and param not in (PARAMETER_MERGE_STRATEGIES,
+                                              CONCURRENCY_LIMITS):
             if param in (ENCRYPTED_PARAM_NAMES, EVENT_SINKS):
                 env[param] = []
             else:
@@ -164,5 +164,5 @@ def merge_environments(environment_files, files,
                                                            param_schemata,
                                                            merge_strategies)
                 else:
-                    params[section_key] = merge_map(params[section_key],
-                                                    section_value)
+                    params[section_key] = merge_map(
+                        params.get(section_key, {}), section_value)
@@ -0,0 +1,43 @@
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Storage format for the resource properties recorded with events.
+
+Properties are stored as UTF-8 encoded JSON, optionally compressed with zlib.
+A JSON object always starts with '{', which is never a valid first byte of a
+zlib stream, so the two forms can be told apart without any extra marker and
+uncompressed rows remain readable with ordinary database tools.
+"""
+
+import zlib
+
+from oslo_serialization import jsonutils
+from oslo_utils import encodeutils
+
+
+def dumps(properties, compress=False):
+    """Serialise a dict of resource properties for storage."""
+    data = encodeutils.safe_encode(jsonutils.dumps(properties))
+    if compress:
+        data = zlib.compress(data)
+    return data
+
+
+def loads(data):
+    """Deserialise resource properties stored by :func:`dumps`."""
+    if data is None:
+        return None
+    data = bytes(data)
+    if not data.startswith(b'{'):
+        data = zlib.decompress(data)
+    return jsonutils.loads(data)
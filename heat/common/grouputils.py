@@ -11,10 +11,35 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import collections
+
 import six
 
 from heat.common import exception
 
+FAILED = 'FAILED'
+
+Member = collections.namedtuple('Member', ['name', 'status', 'created_time',
+                                           'physical_resource_id'])
+
+
+def get_member_view(group, include_failed=False):
+    """Get a list of Member summaries of the members of the specified group.
+
+    The list is sorted in the same order as get_members(). Where the group
+    supports it, the members are read from the database in a single query,
+    without loading the nested stack or creating a Resource for each member.
+    """
+    if getattr(type(group), 'nested_resource_summaries', None) is None:
+        return [Member(r.name, r.status, r.created_time, r.resource_id)
+                for r in get_members(group, include_failed)]
+
+    members = [Member(s.name, s.status, s.created_at, s.physical_resource_id)
+               for s in group.nested_resource_summaries()
+               if include_failed or s.status != FAILED]
+    return sorted(members,
+                  key=lambda m: (m.status != FAILED, m.created_time, m.name))
+
 
 def get_size(group, include_failed=False):
     """Get number of member resources managed by the specified group.
@@ -22,12 +47,7 @@ def get_size(group, include_failed=False):
     The size exclude failed members default, set include_failed=True
     to get total size.
     """
-    if group.nested():
-        resources = [r for r in six.itervalues(group.nested())
-                     if include_failed or r.status != r.FAILED]
-        return len(resources)
-    else:
-        return 0
+    return len(get_member_view(group, include_failed))
 
 
 def get_members(group, include_failed=False):
@@ -66,7 +86,7 @@ def get_member_names(group):
 
     Failed resources will be ignored.
     """
-    return [r.name for r in get_members(group)]
+    return [m.name for m in get_member_view(group)]
 
 
 def get_resource(stack, resource_name, use_indices, key):
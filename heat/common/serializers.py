@@ -27,22 +27,85 @@ import six
 
 LOG = logging.getLogger(__name__)
 
+# Size in bytes of the chunks in which a streamed response body is written.
+STREAM_CHUNK_SIZE = 65536
+
+
+class StreamedList(object):
+    """A list in a response that is serialised as it is iterated.
+
+    A controller may return a dict containing a StreamedList as one of its
+    top-level values in place of a list, so that the items need not all be
+    held in memory at once. The JSON serializer then writes the response body
+    incrementally as the items are produced.
+    """
+
+    def __init__(self, items):
+        self.items = items
+
+    def __iter__(self):
+        return iter(self.items)
+
 
 class JSONResponseSerializer(object):
 
-    def to_json(self, data):
+    @staticmethod
+    def _dumps(data):
         def sanitizer(obj):
             if isinstance(obj, datetime.datetime):
                 return obj.isoformat()
             return six.text_type(obj)
 
-        response = jsonutils.dumps(data, default=sanitizer)
+        return jsonutils.dumps(data, default=sanitizer)
+
+    def to_json(self, data):
+        response = self._dumps(data)
         LOG.debug("JSON response : %s" % response)
         return response
 
     def default(self, response, result):
         response.content_type = 'application/json'
-        response.body = six.b(self.to_json(result))
+        if (isinstance(result, dict) and
+                any(isinstance(v, StreamedList)
+                    for v in six.itervalues(result))):
+            response.app_iter = self.to_json_chunks(result)
+        else:
+            response.body = six.b(self.to_json(result))
+
+    def _json_parts(self, data):
+        yield '{'
+        for i, (key, value) in enumerate(sorted(six.iteritems(data))):
+            if i:
+                yield ', '
+            yield '%s: ' % self._dumps(key)
+            if isinstance(value, StreamedList):
+                yield '['
+                for j, item in enumerate(value):
+                    if j:
+                        yield ', '
+                    yield self._dumps(item)
+                yield ']'
+            else:
+                yield self._dumps(value)
+        yield '}'
+
+    def to_json_chunks(self, data):
+        """Return an iterator over the chunks of a JSON response body."""
+        def chunks(parts):
+            buf = []
+            size = 0
+            for part in parts:
+                part = part.encode('utf-8')
+                buf.append(part)
+                size += len(part)
+                if size >= STREAM_CHUNK_SIZE:
+                    yield b''.join(buf)
+                    buf = []
+                    size = 0
+            if buf:
+                yield b''.join(buf)
+
+        return chunks(self._json_parts(data))
 
 
 # Escape XML serialization for these keys, as the AWS API defines them as
@@ -53,7 +116,7 @@ JSON_ONLY_KEYS = ('TemplateBody', 'Metadata')
 class XMLResponseSerializer(object):
 
     def object_to_element(self, obj, element):
-        if isinstance(obj, list):
+        if isinstance(obj, (list, StreamedList)):
             for item in obj:
                 subelement = etree.SubElement(element, "member")
                 self.object_to_element(item, subelement)
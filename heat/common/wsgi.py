@@ -193,10 +193,21 @@ json_size_opt = cfg.IntOpt('max_json_body_size',
                            help=_('Maximum raw byte size of JSON request body.'
                                   ' Should be larger than max_template_size.'))
 cfg.CONF.register_opt(json_size_opt)
+list_page_size_opt = cfg.IntOpt('api_list_page_size',
+                                default=0,
+                                help=_('Number of items to request from the '
+                                       'engine at a time when a list of '
+                                       'stacks or events is requested without '
+                                       'a limit. When set, the response is '
+                                       'written as each page arrives rather '
+                                       'than after the whole list has been '
+                                       'retrieved. The default of 0 retrieves '
+                                       'the whole list in one request.'))
+cfg.CONF.register_opt(list_page_size_opt)
 
 
 def list_opts():
-    yield None, [json_size_opt]
+    yield None, [json_size_opt, list_page_size_opt]
     yield 'heat_api', api_opts
     yield 'heat_api_cfn', api_cfn_opts
     yield 'heat_api_cloudwatch', api_cw_opts
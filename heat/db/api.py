@@ -138,6 +138,10 @@ def resource_get_all_active_by_stack(context, stack_id):
     return IMPL.resource_get_all_active_by_stack(context, stack_id)
 
 
+def resource_get_summaries_by_stack(context, stack_id):
+    return IMPL.resource_get_summaries_by_stack(context, stack_id)
+
+
 def resource_get_all_by_root_stack(context, stack_id, filters=None):
     return IMPL.resource_get_all_by_root_stack(context, stack_id, filters)
 
@@ -182,12 +186,12 @@ def stack_get_all(context, limit=None, sort_keys=None, marker=None,
                   sort_dir=None, filters=None,
                   show_deleted=False, show_nested=False, show_hidden=False,
                   tags=None, tags_any=None, not_tags=None,
-                  not_tags_any=None, eager_load=False):
+                  not_tags_any=None, eager_load=False, columns=None):
     return IMPL.stack_get_all(context, limit, sort_keys,
                               marker, sort_dir, filters,
                               show_deleted, show_nested, show_hidden,
                               tags, tags_any, not_tags, not_tags_any,
-                              eager_load=eager_load)
+                              eager_load=eager_load, columns=columns)
 
 
 def stack_get_all_by_owner_id(context, owner_id):
@@ -294,6 +298,18 @@ def event_get_all_by_stack(context, stack_id, limit=None, marker=None,
                                        filters=filters)
 
 
+def event_get_all_by_root_stack(context, root_stack_id, nested_depth=None,
+                                limit=None, marker=None, sort_keys=None,
+                                sort_dir=None, filters=None):
+    return IMPL.event_get_all_by_root_stack(context, root_stack_id,
+                                            nested_depth=nested_depth,
+                                            limit=limit,
+                                            marker=marker,
+                                            sort_keys=sort_keys,
+                                            sort_dir=sort_dir,
+                                            filters=filters)
+
+
 def event_count_all_by_stack(context, stack_id):
     return IMPL.event_count_all_by_stack(context, stack_id)
 
@@ -302,6 +318,10 @@ def event_create(context, values):
     return IMPL.event_create(context, values)
 
 
+def event_create_batch(context, values_list):
+    return IMPL.event_create_batch(context, values_list)
+
+
 def watch_rule_get(context, watch_rule_id):
     return IMPL.watch_rule_get(context, watch_rule_id)
 
@@ -451,6 +471,15 @@ def sync_point_update_input_data(context, entity_id,
                                              atomic_key, input_data)
 
 
+def sync_point_input_create(context, values):
+    return IMPL.sync_point_input_create(context, values)
+
+
+def sync_point_input_get_all(context, entity_id, traversal_id, is_update):
+    return IMPL.sync_point_input_get_all(context, entity_id, traversal_id,
+                                         is_update)
+
+
 def db_sync(engine, version=None):
     """Migrate the database to `version` or the most recent version."""
     return IMPL.db_sync(engine, version=version)
@@ -12,6 +12,7 @@
 #    under the License.
 
 """Implementation of SQLAlchemy backend."""
+import collections
 import datetime
 import sys
 
@@ -28,6 +29,7 @@ import six
 import sqlalchemy
 from sqlalchemy import and_
 from sqlalchemy import func
+from sqlalchemy import or_
 from sqlalchemy import orm
 from sqlalchemy.orm import aliased as orm_aliased
 
@@ -214,9 +216,16 @@ def resource_get_all(context):
 
 def resource_purge_deleted(context, stack_id):
     filters = {'stack_id': stack_id, 'action': 'DELETE', 'status': 'COMPLETE'}
-    query = context.session.query(models.Resource.id)
-    result = query.filter_by(**filters)
-    result.delete()
+    session = context.session
+    with session.begin(subtransactions=True):
+        counts = session.query(
+            models.Resource.root_stack_id, func.count(models.Resource.id)
+        ).filter_by(**filters).group_by(models.Resource.root_stack_id).all()
+        query = session.query(models.Resource.id)
+        result = query.filter_by(**filters)
+        result.delete()
+        for root_stack_id, count in counts:
+            _resource_count_add(context, root_stack_id, -count)
 
 
 def resource_update(context, resource_id, values, atomic_key,
@@ -245,6 +254,7 @@ def resource_delete(context, resource_id):
         resource = session.query(models.Resource).get(resource_id)
         if resource:
             session.delete(resource)
+            _resource_count_add(context, resource.root_stack_id, -1)
 
 
 def resource_data_get_all(context, resource_id, data=None):
@@ -364,9 +374,12 @@ def resource_data_delete(context, resource_id, key):
 
 
 def resource_create(context, values):
-    resource_ref = models.Resource()
-    resource_ref.update(values)
-    resource_ref.save(context.session)
+    session = context.session
+    with session.begin(subtransactions=True):
+        resource_ref = models.Resource()
+        resource_ref.update(values)
+        resource_ref.save(session)
+        _resource_count_add(context, values.get('root_stack_id'), 1)
     return resource_ref
 
 
@@ -395,6 +408,24 @@ def resource_get_all_active_by_stack(context, stack_id):
     return dict((res.id, res) for res in results)
 
 
+def resource_get_summaries_by_stack(context, stack_id):
+    """Return a few columns of each resource in a stack, ordered by id.
+
+    This avoids loading the properties, metadata and data of the resources
+    when only their names and states are needed.
+    """
+    return context.session.query(
+        models.Resource.id,
+        models.Resource.name,
+        models.Resource.action,
+        models.Resource.status,
+        models.Resource.created_at,
+        models.Resource.physical_resource_id
+    ).filter_by(
+        stack_id=stack_id
+    ).order_by(models.Resource.id).all()
+
+
 def resource_get_all_by_root_stack(context, stack_id, filters=None):
     query = context.session.query(
         models.Resource
@@ -494,6 +525,11 @@ def _get_sort_keys(sort_keys, mapping):
     return [mapping[key] for key in sort_keys or [] if key in mapping]
 
 
+# Sort order that is paginated by seeking on its key rather than through
+# oslo.db, see _keyset_paginate_query()
+_KEYSET_SORT_KEYS = ['created_at', 'id']
+
+
 def _paginate_query(context, query, model, limit=None, sort_keys=None,
                     marker=None, sort_dir=None):
     default_sort_keys = ['created_at']
@@ -506,6 +542,11 @@ def _paginate_query(context, query, model, limit=None, sort_keys=None,
     # even for sort_key values that are not unique in the database
     sort_keys = sort_keys + ['id']
 
+    if sort_keys == _KEYSET_SORT_KEYS:
+        marker_filter = model.id == marker if marker else None
+        return _keyset_paginate_query(context, query, model, limit,
+                                      marker_filter, sort_dir)
+
     model_marker = None
     if marker:
         model_marker = context.session.query(model).get(marker)
@@ -518,6 +559,50 @@ def _paginate_query(context, query, model, limit=None, sort_keys=None,
     return query
 
 
+def _keyset_paginate_query(context, query, model, limit, marker_filter,
+                           sort_dir):
+    """Paginate a query ordered by (created_at, id).
+
+    Rather than handing the whole marker row to oslo.db, only the marker's
+    (created_at, id) key is fetched and the page is selected with a range
+    condition on that key. Together with a (created_at, id) index this makes
+    every page a short index range scan, however deep into the results it is.
+
+    :param marker_filter: criterion selecting the marker row, or None
+    """
+    sort_dir = sort_dir or 'asc'
+    if sort_dir not in ('asc', 'desc'):
+        raise exception.Invalid(reason=_('Unknown sort direction, must be '
+                                         'one of: asc, desc'))
+    created_at, model_id = model.created_at, model.id
+
+    if marker_filter is not None:
+        marker_key = context.session.query(
+            created_at, model_id).filter(marker_filter).first()
+        if marker_key is not None:
+            marker_created_at, marker_id = marker_key
+            # The first condition alone is enough for the index range scan;
+            # the second one skips the rows up to and including the marker.
+            if sort_dir == 'asc':
+                query = query.filter(
+                    created_at >= marker_created_at
+                ).filter(or_(created_at > marker_created_at,
+                             model_id > marker_id))
+            else:
+                query = query.filter(
+                    created_at <= marker_created_at
+                ).filter(or_(created_at < marker_created_at,
+                             model_id < marker_id))
+
+    if sort_dir == 'asc':
+        query = query.order_by(created_at.asc(), model_id.asc())
+    else:
+        query = query.order_by(created_at.desc(), model_id.desc())
+    if limit is not None:
+        query = query.limit(limit)
+    return query
+
+
 def _query_stack_get_all(context,  show_deleted=False,
                          show_nested=False, show_hidden=False, tags=None,
                          tags_any=None, not_tags=None, not_tags_any=None):
@@ -573,7 +658,7 @@ def stack_get_all(context, limit=None, sort_keys=None, marker=None,
                   sort_dir=None, filters=None,
                   show_deleted=False, show_nested=False, show_hidden=False,
                   tags=None, tags_any=None, not_tags=None,
-                  not_tags_any=None, eager_load=False):
+                  not_tags_any=None, eager_load=False, columns=None):
     query = _query_stack_get_all(context,
                                  show_deleted=show_deleted,
                                  show_nested=show_nested,
@@ -582,6 +667,10 @@ def stack_get_all(context, limit=None, sort_keys=None, marker=None,
                                  not_tags_any=not_tags_any)
     if eager_load:
         query = query.options(orm.joinedload("raw_template"))
+    if columns is not None:
+        # Only the given columns are fetched; the others are loaded from the
+        # database, one row at a time, if they are accessed.
+        query = query.options(orm.load_only(*columns))
     return _filter_and_page_query(context, query, limit, sort_keys,
                                   marker, sort_dir, filters).all()
 
@@ -660,8 +749,12 @@ def stack_delete(context, stack_id):
                                      'msg': 'that does not exist'})
     session = context.session
     with session.begin():
+        deleted = collections.Counter()
         for r in s.resources:
             session.delete(r)
+            deleted[r.root_stack_id] += 1
+        for root_stack_id, count in six.iteritems(deleted):
+            _resource_count_add(context, root_stack_id, -count)
         delete_softly(context, s)
 
 
@@ -731,7 +824,7 @@ def stack_get_root_id(context, stack_id):
     return s.id
 
 
-def stack_count_total_resources(context, stack_id):
+def _stack_count_resources_in_tree(context, stack_id):
     # count all resources which belong to the root stack
     results = context.session.query(
         models.Resource
@@ -739,6 +832,35 @@ def stack_count_total_resources(context, stack_id):
     return results
 
 
+def _resource_count_add(context, root_stack_id, delta):
+    if root_stack_id is None:
+        return
+    context.session.query(models.Stack).filter_by(
+        id=root_stack_id
+    ).filter(
+        models.Stack.resource_count.isnot(None)
+    ).update({'resource_count': models.Stack.resource_count + delta},
+             synchronize_session='evaluate')
+
+
+def stack_count_total_resources(context, stack_id):
+    """Return the number of resources in the tree of a root stack.
+
+    This reads the counter maintained on the root stack row, initialising it
+    from the resource table the first time it is needed for a stack.
+    """
+    if stack_id is None:
+        return _stack_count_resources_in_tree(context, stack_id)
+    session = context.session
+    count = session.query(models.Stack.resource_count).filter_by(
+        id=stack_id).scalar()
+    if count is None:
+        count = _stack_count_resources_in_tree(context, stack_id)
+        session.query(models.Stack).filter_by(id=stack_id).update(
+            {'resource_count': count}, synchronize_session='evaluate')
+    return count
+
+
 def user_creds_create(context):
     values = context.to_dict()
     user_creds_ref = models.UserCreds()
@@ -836,6 +958,27 @@ def event_get_all_by_stack(context, stack_id, limit=None, marker=None,
                                          sort_keys, sort_dir, filters).all()
 
 
+def event_get_all_by_root_stack(context, root_stack_id, nested_depth=None,
+                                limit=None, marker=None, sort_keys=None,
+                                sort_dir=None, filters=None):
+    """Return events of a root stack and of the stacks nested below it.
+
+    :param nested_depth: only include stacks nested at most this deep
+    """
+    # Select the stacks with a subquery rather than a join, so that the
+    # filters are applied to the events and not to the stacks. Backup stacks
+    # share the root_stack_id of the stack they back up, but are not listed.
+    stacks = context.session.query(models.Stack.id).filter(
+        models.Stack.deleted_at.is_(None)).filter_by(backup=False)
+    if nested_depth is not None:
+        stacks = stacks.filter(models.Stack.nested_depth <= nested_depth)
+    query = context.session.query(models.Event).filter_by(
+        root_stack_id=root_stack_id
+    ).filter(models.Event.stack_id.in_(stacks.subquery()))
+    return _events_filter_and_page_query(context, query, limit, marker,
+                                         sort_keys, sort_dir, filters).all()
+
+
 def _events_paginate_query(context, query, model, limit=None, sort_keys=None,
                            marker=None, sort_dir=None):
     default_sort_keys = ['created_at']
@@ -848,10 +991,15 @@ def _events_paginate_query(context, query, model, limit=None, sort_keys=None,
     # even for sort_key values that are not unique in the database
     sort_keys = sort_keys + ['id']
 
+    # not to use context.session.query(model).get(marker), because
+    # user can only see the ID(column 'uuid') and the ID as the marker
+    if sort_keys == _KEYSET_SORT_KEYS:
+        marker_filter = model.uuid == marker if marker else None
+        return _keyset_paginate_query(context, query, model, limit,
+                                      marker_filter, sort_dir)
+
     model_marker = None
     if marker:
-        # not to use context.session.query(model).get(marker), because
-        # user can only see the ID(column 'uuid') and the ID as the marker
         model_marker = context.session.query(
             model).filter_by(uuid=marker).first()
     try:
@@ -901,19 +1049,114 @@ def _delete_event_rows(context, stack_id, limit):
     return q.delete(synchronize_session='fetch')
 
 
+def _event_count_get(context, stack_id):
+    """Return the number of events stored for a stack.
+
+    This reads the counter maintained on the stack row, initialising it from
+    the event table the first time it is needed for a stack.
+    """
+    session = context.session
+    count = session.query(models.Stack.event_count).filter_by(
+        id=stack_id).scalar()
+    if count is None:
+        count = event_count_all_by_stack(context, stack_id)
+        session.query(models.Stack).filter_by(id=stack_id).update(
+            {'event_count': count}, synchronize_session=False)
+    return count
+
+
+def _event_count_add(context, stack_id, delta):
+    context.session.query(models.Stack).filter_by(
+        id=stack_id
+    ).filter(
+        models.Stack.event_count.isnot(None)
+    ).update({'event_count': models.Stack.event_count + delta},
+             synchronize_session=False)
+
+
+def _event_count_reset(context, stack_id):
+    """Forget the event counter of a stack.
+
+    The counter is only maintained while max_events_per_stack is set, so it is
+    cleared when events are added without it and initialised again from the
+    event table if the limit is turned back on.
+    """
+    context.session.query(models.Stack).filter_by(
+        id=stack_id
+    ).filter(
+        models.Stack.event_count.isnot(None)
+    ).update({'event_count': None}, synchronize_session=False)
+
+
+def _make_room_for_events(context, stack_id, new_count):
+    """Prune the oldest events of a stack so that new_count more will fit."""
+    excess = (_event_count_get(context, stack_id) + new_count -
+              cfg.CONF.max_events_per_stack)
+    if excess > 0:
+        deleted = _delete_event_rows(
+            context, stack_id,
+            max(excess, cfg.CONF.event_purge_batch_size))
+        _event_count_add(context, stack_id, -deleted)
+
+
 def event_create(context, values):
-    if 'stack_id' in values and cfg.CONF.max_events_per_stack:
-        if ((event_count_all_by_stack(context, values['stack_id']) >=
-             cfg.CONF.max_events_per_stack)):
-            # prune
-            _delete_event_rows(
-                context, values['stack_id'], cfg.CONF.event_purge_batch_size)
-    event_ref = models.Event()
-    event_ref.update(values)
-    event_ref.save(context.session)
+    stack_id = values.get('stack_id')
+    session = context.session
+    with session.begin(subtransactions=True):
+        if stack_id is not None and cfg.CONF.max_events_per_stack:
+            _make_room_for_events(context, stack_id, 1)
+        event_ref = models.Event()
+        event_ref.update(values)
+        event_ref.save(session)
+        if stack_id is not None:
+            if cfg.CONF.max_events_per_stack:
+                _event_count_add(context, stack_id, 1)
+            else:
+                _event_count_reset(context, stack_id)
     return event_ref
 
 
+def event_create_batch(context, values_list):
+    """Insert a batch of events with a single bulk INSERT.
+
+    The max_events_per_stack limit is checked once per stack in the batch
+    rather than once per event, and enough rows are pruned to make room for
+    the whole batch.
+    """
+    max_events = cfg.CONF.max_events_per_stack
+    new_counts = collections.Counter(values['stack_id']
+                                     for values in values_list)
+    session = context.session
+    with session.begin(subtransactions=True):
+        for stack_id, new_count in six.iteritems(new_counts):
+            if not max_events:
+                continue
+            if new_count > max_events:
+                # Only the newest events of this batch would survive
+                # pruning anyway, so don't bother inserting the rest.
+                skip = new_count - max_events
+                kept = []
+                for values in values_list:
+                    if skip and values['stack_id'] == stack_id:
+                        skip -= 1
+                        continue
+                    kept.append(values)
+                values_list = kept
+                new_counts[stack_id] = new_count = max_events
+            _make_room_for_events(context, stack_id, new_count)
+        event_refs = []
+        for values in values_list:
+            event_ref = models.Event()
+            event_ref.update(values)
+            event_refs.append(event_ref)
+        session.bulk_save_objects(event_refs)
+        for stack_id, new_count in six.iteritems(new_counts):
+            if max_events:
+                _event_count_add(context, stack_id, new_count)
+            else:
+                _event_count_reset(context, stack_id)
+
+
 def watch_rule_get(context, watch_rule_id):
     result = context.session.query(models.WatchRule).get(watch_rule_id)
     return result
@@ -1203,6 +1446,8 @@ def purge_deleted(age, granularity='days', project_id=None):
     user_creds = sqlalchemy.Table('user_creds', meta, autoload=True)
     service = sqlalchemy.Table('service', meta, autoload=True)
     syncpoint = sqlalchemy.Table('sync_point', meta, autoload=True)
+    syncpoint_input = sqlalchemy.Table('sync_point_input', meta,
+                                       autoload=True)
 
     # find the soft-deleted stacks that are past their expiry
     if project_id:
@@ -1243,6 +1488,12 @@ def purge_deleted(age, granularity='days', project_id=None):
         event_del = event.delete().where(event.c.stack_id.in_(stack_ids))
         engine.execute(event_del)
         # clean up any sync_points that may have lingered
+        sync_trvsl_where = sqlalchemy.select(
+            [syncpoint.c.traversal_id]).where(
+                syncpoint.c.stack_id.in_(stack_ids))
+        sync_input_del = syncpoint_input.delete().where(
+            syncpoint_input.c.traversal_id.in_(sync_trvsl_where))
+        engine.execute(sync_input_del)
         sync_del = syncpoint.delete().where(
             syncpoint.c.stack_id.in_(stack_ids))
         engine.execute(sync_del)
@@ -1301,8 +1552,13 @@ def purge_deleted(age, granularity='days', project_id=None):
 
 def sync_point_delete_all_by_stack_and_traversal(context, stack_id,
                                                  traversal_id):
-    rows_deleted = context.session.query(models.SyncPoint).filter_by(
-        stack_id=stack_id, traversal_id=traversal_id).delete()
+    session = context.session
+    with session.begin(subtransactions=True):
+        # traversal IDs are unique, so the inputs need no stack filter
+        session.query(models.SyncPointInput).filter_by(
+            traversal_id=traversal_id).delete()
+        rows_deleted = session.query(models.SyncPoint).filter_by(
+            stack_id=stack_id, traversal_id=traversal_id).delete()
     return rows_deleted
 
 
@@ -1336,6 +1592,24 @@ def sync_point_update_input_data(context, entity_id,
     return rows_updated
 
 
+def sync_point_input_create(context, values):
+    values['entity_id'] = str(values['entity_id'])
+    sync_point_input_ref = models.SyncPointInput()
+    sync_point_input_ref.update(values)
+    sync_point_input_ref.save(context.session)
+    return sync_point_input_ref
+
+
+def sync_point_input_get_all(context, entity_id, traversal_id, is_update):
+    entity_id = str(entity_id)
+    query = context.session.query(models.SyncPointInput.input_data).filter_by(
+        entity_id=entity_id,
+        traversal_id=traversal_id,
+        is_update=is_update
+    ).order_by(models.SyncPointInput.id)
+    return [input_data for (input_data,) in query]
+
+
 def db_sync(engine, version=None):
     """Migrate the database to `version` or the most recent version."""
     if version is not None and int(version) < db_version(engine):
@@ -0,0 +1,23 @@
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import sqlalchemy
+
+
+def upgrade(migrate_engine):
+    meta = sqlalchemy.MetaData(bind=migrate_engine)
+    stack = sqlalchemy.Table('stack', meta, autoload=True)
+    # Left NULL for existing stacks; the count is initialised lazily the
+    # next time the total number of resources of the stack is needed.
+    resource_count = sqlalchemy.Column('resource_count', sqlalchemy.Integer)
+    resource_count.create(stack)
@@ -22,6 +22,7 @@ from sqlalchemy.ext import declarative
 from sqlalchemy.orm import backref
 from sqlalchemy.orm import relationship
 
+from heat.common import event_properties
 from heat.db.sqlalchemy import types
 
 BASE = declarative.declarative_base()
@@ -101,6 +102,32 @@ class SyncPoint(BASE, HeatBase):
     input_data = sqlalchemy.Column(types.Json)
 
 
+class SyncPointInput(BASE, HeatBase):
+    """Represents input data sent to a syncpoint by one of its predecessors.
+
+    Each predecessor appends a row rather than updating the sync_point row,
+    so that concurrent senders do not conflict with each other.
+    """
+
+    __tablename__ = 'sync_point_input'
+    __table_args__ = (
+        sqlalchemy.ForeignKeyConstraint(
+            ['entity_id', 'traversal_id', 'is_update'],
+            ['sync_point.entity_id', 'sync_point.traversal_id',
+             'sync_point.is_update']),
+        sqlalchemy.Index('ix_sync_point_input_sync_point',
+                         'entity_id', 'traversal_id', 'is_update'),
+        sqlalchemy.Index('ix_sync_point_input_traversal_id',
+                         'traversal_id'),
+    )
+
+    id = sqlalchemy.Column(sqlalchemy.Integer, primary_key=True)
+    entity_id = sqlalchemy.Column(sqlalchemy.String(36), nullable=False)
+    traversal_id = sqlalchemy.Column(sqlalchemy.String(36), nullable=False)
+    is_update = sqlalchemy.Column(sqlalchemy.Boolean, nullable=False)
+    input_data = sqlalchemy.Column(types.Json)
+
+
 class Stack(BASE, HeatBase, SoftDelete, StateAware):
     """Represents a stack created by the heat engine."""
 
@@ -108,6 +135,7 @@ class Stack(BASE, HeatBase, SoftDelete, StateAware):
     __table_args__ = (
         sqlalchemy.Index('ix_stack_name', 'name', mysql_length=255),
         sqlalchemy.Index('ix_stack_tenant', 'tenant', mysql_length=255),
+        sqlalchemy.Index('ix_stack_created_at_id', 'created_at', 'id'),
     )
 
     id = sqlalchemy.Column(sqlalchemy.String(36), primary_key=True,
@@ -143,6 +171,17 @@ class Stack(BASE, HeatBase, SoftDelete, StateAware):
     current_traversal = sqlalchemy.Column('current_traversal',
                                           sqlalchemy.String(36))
     current_deps = sqlalchemy.Column('current_deps', types.Json)
+    # Number of events stored for this stack, maintained by event_create so
+    # that max_events_per_stack can be enforced without counting rows. NULL
+    # means it has not been initialised yet.
+    event_count = sqlalchemy.Column('event_count', sqlalchemy.Integer,
+                                    default=0)
+    # Number of resources in all of the stacks of which this is the root,
+    # maintained as resources are created and deleted so that
+    # max_resources_per_stack can be enforced without counting rows. NULL
+    # means it has not been initialised yet.
+    resource_count = sqlalchemy.Column('resource_count', sqlalchemy.Integer,
+                                       default=0)
 
     # Override timestamp column to store the correct value: it should be the
     # time the create/update call was issued, not the time the DB entry is
@@ -187,12 +226,19 @@ class Event(BASE, HeatBase):
     """Represents an event generated by the heat engine."""
 
     __tablename__ = 'event'
+    __table_args__ = (
+        sqlalchemy.Index('ix_event_stack_id_created_at_id',
+                         'stack_id', 'created_at', 'id'),
+        sqlalchemy.Index('ix_event_root_stack_id_created_at_id',
+                         'root_stack_id', 'created_at', 'id'),
+    )
 
     id = sqlalchemy.Column(sqlalchemy.Integer, primary_key=True)
     stack_id = sqlalchemy.Column(sqlalchemy.String(36),
                                  sqlalchemy.ForeignKey('stack.id'),
                                  nullable=False)
     stack = relationship(Stack, backref=backref('events'))
+    root_stack_id = sqlalchemy.Column(sqlalchemy.String(36))
 
     uuid = sqlalchemy.Column(sqlalchemy.String(36),
                              default=lambda: str(uuid.uuid4()),
@@ -204,7 +250,12 @@ class Event(BASE, HeatBase):
     _resource_status_reason = sqlalchemy.Column(
         'resource_status_reason', sqlalchemy.String(255))
     resource_type = sqlalchemy.Column(sqlalchemy.String(255))
-    resource_properties = sqlalchemy.Column(sqlalchemy.PickleType)
+    # legacy column, only read for events stored before
+    # resource_properties_data was introduced
+    _resource_properties = sqlalchemy.Column('resource_properties',
+                                             sqlalchemy.PickleType)
+    # JSON, optionally zlib-compressed; see heat.common.event_properties
+    resource_properties_data = sqlalchemy.Column(sqlalchemy.LargeBinary)
 
     @property
     def resource_status_reason(self):
@@ -214,6 +265,20 @@ class Event(BASE, HeatBase):
     def resource_status_reason(self, reason):
         self._resource_status_reason = reason and reason[:255] or ''
 
+    @property
+    def resource_properties(self):
+        if self.resource_properties_data is not None:
+            return event_properties.loads(self.resource_properties_data)
+        return self._resource_properties
+
+    @resource_properties.setter
+    def resource_properties(self, properties):
+        if properties is None:
+            self.resource_properties_data = None
+        else:
+            self.resource_properties_data = event_properties.dumps(
+                properties)
+
 
 class ResourceData(BASE, HeatBase):
     """Key/value store of arbitrary, resource-specific data."""
@@ -109,11 +109,9 @@ class CfnTemplateBase(template_common.CommonTemplate):
                                      user_params=user_params,
                                      param_defaults=param_defaults)
 
-    def resource_definitions(self, stack):
+    def _parse_resource_definitions(self, stack, conditions):
         resources = self.t.get(self.RESOURCES) or {}
 
-        conditions = self.conditions(stack)
-
         def defns():
             for name, snippet in resources.items():
                 try:
@@ -155,6 +153,7 @@ class CfnTemplateBase(template_common.CommonTemplate):
         if self.t.get(self.RESOURCES) is None:
             self.t[self.RESOURCES] = {}
         self.t[self.RESOURCES][name] = cfn_tmpl
+        self.resources_changed()
 
 
 class CfnTemplate(CfnTemplateBase):
@@ -13,6 +13,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import collections
 import six
 
 import eventlet.queue
@@ -23,6 +24,7 @@ from oslo_log import log as logging
 from heat.common import exception
 from heat.common.i18n import _LE
 from heat.common.i18n import _LI
+from heat.db import api as db_api
 from heat.engine import resource
 from heat.engine import scheduler
 from heat.engine import stack as parser
@@ -33,6 +35,73 @@ from heat.rpc import listener_client
 
 LOG = logging.getLogger(__name__)
 
+# Number of seconds to wait before re-checking a resource that could not be
+# started because too many resources of its stack were in progress. The delay
+# doubles on each attempt, up to CONCURRENCY_MAX_RETRY_DELAY.
+CONCURRENCY_RETRY_DELAY = 1
+CONCURRENCY_MAX_RETRY_DELAY = 60
+
+
+class ThrottledChecks(object):
+    """Checks held back by the concurrency limits of their stack.
+
+    A held back check is sent again when a resource of its stack finishes in
+    this engine, or failing that after a delay that doubles on each attempt,
+    since resources may also finish in other engines.
+    """
+
+    def __init__(self):
+        self._waiting = collections.defaultdict(collections.OrderedDict)
+        self._attempts = {}
+
+    def defer(self, stack_id, traversal, key, send):
+        """Send a check later, by calling send().
+
+        :param key: a key identifying the check within the traversal
+        """
+        # Forget the attempts of older traversals of the stack
+        for k in [k for k in self._attempts
+                  if k[0] == stack_id and k[1] != traversal]:
+            del self._attempts[k]
+
+        attempt_key = (stack_id, traversal) + tuple(key)
+        attempt = self._attempts.get(attempt_key, 0)
+        self._attempts[attempt_key] = attempt + 1
+        delay = min(CONCURRENCY_RETRY_DELAY * 2 ** attempt,
+                    CONCURRENCY_MAX_RETRY_DELAY)
+
+        waiting = self._waiting[stack_id]
+        if attempt_key in waiting:
+            waiting.pop(attempt_key)[0].cancel()
+        timer = eventlet.spawn_after(delay, self._send, stack_id,
+                                     attempt_key)
+        waiting[attempt_key] = (timer, send)
+
+    def started(self, stack_id, traversal, key):
+        """Forget the attempts of a check that is no longer held back."""
+        self._attempts.pop((stack_id, traversal) + tuple(key), None)
+
+    def release(self, stack_id):
+        """Send the oldest check held back for a stack straight away."""
+        waiting = self._waiting.get(stack_id)
+        if not waiting:
+            return
+        attempt_key = next(iter(waiting))
+        waiting[attempt_key][0].cancel()
+        self._send(stack_id, attempt_key)
+
+    def _send(self, stack_id, attempt_key):
+        waiting = self._waiting.get(stack_id)
+        if waiting is None or attempt_key not in waiting:
+            return
+        timer, send = waiting.pop(attempt_key)
+        if not waiting:
+            del self._waiting[stack_id]
+        send()
+
+
+_throttled_checks = ThrottledChecks()
+
 
 class CancelOperation(BaseException):
     """Exception to cancel an in-progress operation on a resource.
@@ -182,7 +251,7 @@ class CheckResource(object):
         try:
             propagate_check_resource(cnxt, self._rpc_client, resource_id,
                                      current_traversal, predecessors, key,
-                                     None, key[1], None)
+                                     None, key[1], None, retrigger=True)
         except exception.EntityNotFound as e:
             if e.entity != "Sync Point":
                 raise
@@ -244,6 +313,53 @@ class CheckResource(object):
             else:
                 raise
 
+    def _engine_alive(self, cnxt, engine_id, alive):
+        if engine_id in (None, self.engine_id):
+            return True
+        if engine_id not in alive:
+            alive[engine_id] = listener_client.EngineListenerClient(
+                engine_id).is_alive(cnxt)
+        return alive[engine_id]
+
+    def _concurrency_limit_reached(self, cnxt, rsrc, stack):
+        """Return True if the stack has too many resources in progress.
+
+        The limits on concurrent resource actions are set in the stack's
+        environment. Since the resources of a stack may be checked by any
+        engine, the resources that are in progress are counted in the
+        database. Resources locked by an engine that is no longer alive are
+        not counted, since they will never complete.
+        """
+        max_running = stack.env.get_concurrency_limit()
+        type_limit = stack.env.get_concurrency_limit(rsrc.type())
+        if max_running is None and type_limit is None:
+            return False
+
+        def limit_reached(running):
+            if max_running is not None and len(running) >= max_running:
+                return True
+            if type_limit is not None:
+                defns = stack.t.resource_definitions(stack)
+                same_type = [r for r in running
+                             if r.name in defns and
+                             defns[r.name].resource_type == rsrc.type()]
+                if len(same_type) >= type_limit:
+                    return True
+            return False
+
+        in_progress = db_api.resource_get_all_by_stack(
+            cnxt, stack.id, filters={'status': resource.Resource.IN_PROGRESS})
+        others = [r for r in six.itervalues(in_progress) if r.id != rsrc.id]
+        if not limit_reached(others):
+            return False
+
+        # Only check the engines when the limit would be reached, since it
+        # takes an RPC call for each engine.
+        alive = {}
+        return limit_reached([r for r in others
+                              if self._engine_alive(cnxt, r.engine_id,
+                                                    alive)])
+
     def check(self, cnxt, resource_id, current_traversal,
               resource_data, is_update, adopt_stack_data,
               rsrc, stack):
@@ -265,11 +381,32 @@ class CheckResource(object):
                     rsrc.current_template_id != tmpl.id):
                 return
 
-        check_resource_done = self._do_check_resource(cnxt, current_traversal,
-                                                      tmpl, resource_data,
-                                                      is_update,
-                                                      rsrc, stack,
-                                                      adopt_stack_data)
+        check_key = (resource_id, is_update)
+        if self._concurrency_limit_reached(cnxt, rsrc, stack):
+            LOG.debug('Too many resources of stack %(stack)s in progress; '
+                      'retrying %(rsrc)s later',
+                      {'stack': stack.name, 'rsrc': rsrc.name})
+            # Send the check again later from another greenthread, so that
+            # neither the RPC dispatcher nor the operation slot of the stack
+            # is held in the meantime.
+            send = functools.partial(
+                self._rpc_client.check_resource,
+                cnxt, resource_id, current_traversal,
+                sync_point.serialize_input_data(resource_data),
+                is_update, adopt_stack_data)
+            _throttled_checks.defer(stack.id, current_traversal, check_key,
+                                    send)
+            return
+        _throttled_checks.started(stack.id, current_traversal, check_key)
+
+        try:
+            check_resource_done = self._do_check_resource(
+                cnxt, current_traversal, tmpl, resource_data, is_update,
+                rsrc, stack, adopt_stack_data)
+        finally:
+            # The resource is no longer in progress, so a check held back
+            # by the concurrency limits may be able to start.
+            _throttled_checks.release(stack.id)
 
         if check_resource_done:
             # initiate check on next set of resources from graph
@@ -346,15 +483,20 @@ def check_stack_complete(cnxt, stack, current_traversal, sender_id, deps,
 
 def propagate_check_resource(cnxt, rpc_client, next_res_id,
                              current_traversal, predecessors, sender_key,
-                             sender_data, is_update, adopt_stack_data):
-    """Trigger processing of node if all of its dependencies are satisfied."""
+                             sender_data, is_update, adopt_stack_data,
+                             retrigger=False):
+    """Trigger processing of node if all of its dependencies are satisfied.
+
+    A retrigger resends the check even if the sync point was already
+    propagated.
+    """
     def do_check(entity_id, data):
         rpc_client.check_resource(cnxt, entity_id, current_traversal,
                                   data, is_update, adopt_stack_data)
 
     sync_point.sync(cnxt, next_res_id, current_traversal,
                     is_update, do_check, predecessors,
-                    {sender_key: sender_data})
+                    {sender_key: sender_data}, force=retrigger)
 
 
 def _check_for_message(msg_queue):
@@ -14,7 +14,10 @@
 from cinderclient import client as cc
 from cinderclient import exceptions
 from keystoneauth1 import exceptions as ks_exceptions
+from oslo_config import cfg
 from oslo_log import log as logging
+from oslo_utils import timeutils
+import six
 
 from heat.common import exception
 from heat.common.i18n import _
@@ -26,9 +29,117 @@ from heat.engine import constraints
 
 LOG = logging.getLogger(__name__)
 
+cfg.CONF.import_opt('volume_status_poll_interval', 'heat.common.config')
+
 CLIENT_NAME = 'cinder'
 
 
+class VolumeStatusPoller(object):
+    """Share lists of volumes between many volume status checks.
+
+    A poller is shared by all of the volumes of a project that this engine is
+    waiting on. When it takes fewer requests than fetching each of them, the
+    volumes of the project are listed at most once per interval, and the
+    status checks within the interval are answered from the list.
+
+    Only volumes in a transitional state, such as creating or extending, are
+    answered from the list. No action can be issued on a volume in those
+    states, so a listed status can never predate an action that a caller is
+    waiting for, even if the list was in flight when the action was issued.
+    Every other volume is fetched individually, and is no longer tracked by
+    the poller.
+    """
+
+    TRANSITIONAL_STATUSES = ('attaching', 'backing-up', 'creating',
+                             'deleting', 'detaching', 'downloading',
+                             'extending', 'restoring-backup', 'retyping',
+                             'uploading')
+
+    # Volumes that have not been checked for this many seconds are forgotten.
+    EXPIRY = 300
+
+    def __init__(self, interval):
+        self.interval = interval
+        self._volumes = {}
+        self._polled_at = None
+        # The number of requests the last list of the volumes took
+        self._list_requests = 1
+
+    def __len__(self):
+        return len(self._volumes)
+
+    def get_volume(self, client, vol_id):
+        """Return the most recently polled volume object for an ID."""
+        now = timeutils.utcnow()
+        if (self._polled_at is None or
+                timeutils.is_older_than(self._polled_at, self.interval)):
+            self._poll(client, now)
+
+        entry = self._volumes.get(vol_id)
+        if (entry is None or
+                not self._in_transition(entry['volume']) or
+                timeutils.is_older_than(entry['fetched_at'], self.interval)):
+            try:
+                vol = client.volumes.get(vol_id)
+            except Exception:
+                self._volumes.pop(vol_id, None)
+                raise
+            entry = {'volume': vol, 'fetched_at': now}
+
+        if self._in_transition(entry['volume']):
+            entry['checked_at'] = now
+            self._volumes[vol_id] = entry
+        else:
+            self._volumes.pop(vol_id, None)
+        return entry['volume']
+
+    def expire(self, vol_id):
+        """Discard the polled status of a volume."""
+        self._volumes.pop(vol_id, None)
+
+    @classmethod
+    def _in_transition(cls, vol):
+        return getattr(vol, 'status', None) in cls.TRANSITIONAL_STATUSES
+
+    def _poll(self, client, now):
+        # Set this first, so that other callers do not poll concurrently.
+        self._polled_at = now
+        for vol_id, entry in list(six.iteritems(self._volumes)):
+            if timeutils.is_older_than(entry['checked_at'], self.EXPIRY):
+                del self._volumes[vol_id]
+
+        # Fetching the volumes individually is cheaper for a few volumes in
+        # a large project.
+        if len(self._volumes) <= self._list_requests:
+            return
+        for vol in self._list(client):
+            # Only update the volumes still tracked, so that a volume
+            # expired while the list was in flight is fetched again.
+            entry = self._volumes.get(vol.id)
+            if entry is not None:
+                entry['volume'] = vol
+                entry['fetched_at'] = now
+
+    def _list(self, client):
+        # Cinder returns at most its osapi_max_limit volumes per request, so
+        # follow the markers until a page comes back empty.
+        marker = None
+        requests = 0
+        volumes = []
+        while True:
+            page = client.volumes.list(marker=marker)
+            requests += 1
+            if not page or page[-1].id == marker:
+                break
+            volumes.extend(page)
+            marker = page[-1].id
+        self._list_requests = requests
+        return volumes
+
+
+_volume_pollers = {}
+
+
 class CinderClientPlugin(client_plugin.ClientPlugin):
 
     exceptions_module = exceptions
@@ -85,6 +196,40 @@ class CinderClientPlugin(client_plugin.ClientPlugin):
         except exceptions.NotFound:
             raise exception.EntityNotFound(entity='Volume', name=volume)
 
+    def fetch_volume(self, vol_id):
+        """Fetch a volume object for checking its status.
+
+        Use this method in the ``check_*_complete`` methods of resources, so
+        that the status of many volumes can be polled with a single request
+        when volume_status_poll_interval is set.
+        """
+        interval = cfg.CONF.volume_status_poll_interval
+        if interval <= 0:
+            return self.client().volumes.get(vol_id)
+
+        key = (self.context.tenant_id, self._get_region_name())
+        poller = _volume_pollers.get(key)
+        if poller is None or poller.interval != interval:
+            poller = VolumeStatusPoller(interval)
+            _volume_pollers[key] = poller
+        try:
+            return poller.get_volume(self.client(), vol_id)
+        finally:
+            # Drop the poller once it has no volumes left to wait on
+            if not len(poller) and _volume_pollers.get(key) is poller:
+                del _volume_pollers[key]
+
+    def expire_volume(self, vol_id):
+        """Discard any polled status of a volume that an action was issued on.
+
+        Call this after issuing an action on a volume, so that the following
+        checks of its status do not see the status from before the action.
+        """
+        key = (self.context.tenant_id, self._get_region_name())
+        poller = _volume_pollers.get(key)
+        if poller is not None:
+            poller.expire(vol_id)
+
     def get_volume_snapshot(self, snapshot):
         try:
             return self.client().volume_snapshots.get(snapshot)
@@ -131,7 +276,7 @@ class CinderClientPlugin(client_plugin.ClientPlugin):
 
     def check_detach_volume_complete(self, vol_id):
         try:
-            vol = self.client().volumes.get(vol_id)
+            vol = self.fetch_volume(vol_id)
         except Exception as ex:
             self.ignore_not_found(ex)
             return True
@@ -154,7 +299,7 @@ class CinderClientPlugin(client_plugin.ClientPlugin):
             return True
 
     def check_attach_volume_complete(self, vol_id):
-        vol = self.client().volumes.get(vol_id)
+        vol = self.fetch_volume(vol_id)
         if vol.status in ('available', 'attaching'):
             LOG.debug("Volume %(id)s is being attached - "
                       "volume status: %(status)s" % {'id': vol_id,
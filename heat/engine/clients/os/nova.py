@@ -12,6 +12,7 @@
 #    under the License.
 
 import collections
+import datetime
 import email
 from email.mime import multipart
 from email.mime import text
@@ -24,6 +25,7 @@ from novaclient import exceptions
 from oslo_config import cfg
 from oslo_log import log as logging
 from oslo_serialization import jsonutils
+from oslo_utils import timeutils
 from oslo_utils import uuidutils
 from retrying import retry
 import six
@@ -39,11 +41,112 @@ from heat.engine import constraints
 
 LOG = logging.getLogger(__name__)
 
+cfg.CONF.import_opt('server_status_poll_interval', 'heat.common.config')
+
 
 NOVA_API_VERSION = "2.1"
 CLIENT_NAME = 'nova'
 
 
+class ServerStatusPoller(object):
+    """Coalesce the status checks of many servers into bulk list calls.
+
+    A poller is shared by all of the servers of a project that this engine is
+    waiting on. Instead of each server being fetched separately on every
+    check, the poller lists the servers that have changed since its previous
+    poll, at most once per interval, and answers the checks of all of the
+    servers from the results. A server that the poller has not seen before is
+    fetched individually on its first check.
+
+    Only servers that are being built or deleted are answered from the
+    results of the poll. No other action can be issued on a server in those
+    states, so a cached status can never predate an action that a caller is
+    waiting for. Every other server is fetched individually, and is no longer
+    tracked by the poller.
+    """
+
+    # Allowance for clock differences between the engine and Nova when
+    # listing the servers that have changed.
+    CHANGES_SINCE_MARGIN = 60
+
+    # Servers that have not been checked for this many seconds are forgotten.
+    EXPIRY = 300
+
+    def __init__(self, interval):
+        self.interval = interval
+        self._servers = {}
+        self._polled_at = None
+        self._since = None
+
+    def __len__(self):
+        return len(self._servers)
+
+    def get_server(self, client, server_id):
+        """Return the most recently polled server object for an ID."""
+        now = timeutils.utcnow()
+        if (self._polled_at is None or
+                timeutils.is_older_than(self._polled_at, self.interval)):
+            self._poll(client, now)
+
+        entry = self._servers.get(server_id)
+        if (entry is None or
+                not self._in_transition(entry['server']) or
+                timeutils.is_older_than(entry['fetched_at'], self.EXPIRY)):
+            try:
+                server = client.servers.get(server_id)
+            except Exception:
+                self._servers.pop(server_id, None)
+                raise
+            entry = {'server': server, 'fetched_at': now}
+
+        if self._in_transition(entry['server']):
+            entry['checked_at'] = now
+            self._servers[server_id] = entry
+        else:
+            self._servers.pop(server_id, None)
+        return entry['server']
+
+    @staticmethod
+    def _in_transition(server):
+        status = getattr(server, 'status', '').split('(')[0]
+        task_state = getattr(server, 'OS-EXT-STS:task_state', None)
+        return status == 'BUILD' or task_state == 'deleting'
+
+    def _poll(self, client, now):
+        # Set this first, so that other callers do not poll concurrently.
+        self._polled_at = now
+        for server_id, entry in list(six.iteritems(self._servers)):
+            if timeutils.is_older_than(entry['checked_at'], self.EXPIRY):
+                del self._servers[server_id]
+
+        if self._servers and self._since is not None:
+            margin = datetime.timedelta(seconds=self.CHANGES_SINCE_MARGIN)
+            since = (self._since - margin).isoformat()
+            for server in self._list_changed(client, since):
+                entry = self._servers.get(server.id)
+                if entry is not None:
+                    entry['server'] = server
+                    entry['fetched_at'] = now
+        self._since = now
+
+    @staticmethod
+    def _list_changed(client, since):
+        # Nova returns at most its max_limit servers per request, so follow
+        # the markers until a page comes back empty.
+        marker = None
+        while True:
+            servers = client.servers.list(
+                search_opts={'changes-since': since}, marker=marker)
+            if not servers or servers[-1].id == marker:
+                return
+            for server in servers:
+                yield server
+            marker = servers[-1].id
+
+
+_server_pollers = {}
+
+
 class NovaClientPlugin(client_plugin.ClientPlugin):
 
     deferred_server_statuses = ['BUILD',
@@ -117,8 +220,12 @@ class NovaClientPlugin(client_plugin.ClientPlugin):
         where intermittent errors can be tolerated.
         """
         server = None
+        poller = self._server_poller()
         try:
-            server = self.client().servers.get(server_id)
+            if poller is not None:
+                server = poller.get_server(self.client(), server_id)
+            else:
+                server = self.client().servers.get(server_id)
         except exceptions.OverLimit as exc:
             LOG.warning(_LW("Received an OverLimit response when "
                             "fetching server (%(id)s) : %(exception)s"),
@@ -133,8 +240,29 @@ class NovaClientPlugin(client_plugin.ClientPlugin):
                              'exception': exc})
             else:
                 raise
+        finally:
+            # Drop the poller once it has no servers left to wait on
+            if poller is not None and not len(poller):
+                key = (self.context.tenant_id, self._get_region_name())
+                if _server_pollers.get(key) is poller:
+                    del _server_pollers[key]
         return server
 
+    def _server_poller(self):
+        """Return the shared server status poller for this project.
+
+        Returns None if bulk polling of server status is disabled.
+        """
+        interval = cfg.CONF.server_status_poll_interval
+        if interval <= 0:
+            return None
+        key = (self.context.tenant_id, self._get_region_name())
+        poller = _server_pollers.get(key)
+        if poller is None or poller.interval != interval:
+            poller = ServerStatusPoller(interval)
+            _server_pollers[key] = poller
+        return poller
+
     def refresh_server(self, server):
         """Refresh server's attributes.
 
@@ -626,12 +754,15 @@ echo -e '%s\tALL=(ALL)\tNOPASSWD: ALL' >> /etc/sudoers
                                     'err': ex})
             else:
                 raise
+        self.context.clients.client_plugin('cinder').expire_volume(volume_id)
         return va.id
 
     def detach_volume(self, server_id, attach_id):
         # detach the volume using volume_attachment
         try:
             self.client().volumes.delete_server_volume(server_id, attach_id)
+            self.context.clients.client_plugin('cinder').expire_volume(
+                attach_id)
         except Exception as ex:
             if not (self.is_not_found(ex)
                     or self.is_bad_request(ex)):
@@ -701,11 +701,15 @@ class Environment(object):
                                if k not in (env_fmt.PARAMETER_DEFAULTS,
                                             env_fmt.ENCRYPTED_PARAM_NAMES,
                                             env_fmt.EVENT_SINKS,
+                                            env_fmt.CONCURRENCY_LIMITS,
                                             env_fmt.RESOURCE_REGISTRY))
         self.event_sink_classes = event_sink_classes
         self._event_sinks = []
         self._built_event_sinks = []
         self._update_event_sinks(env.get(env_fmt.EVENT_SINKS, []))
+        self.concurrency_limits = {}
+        self._update_concurrency_limits(
+            env.get(env_fmt.CONCURRENCY_LIMITS, {}))
         self.constraints = {}
         self.stack_lifecycle_plugins = []
 
@@ -715,6 +719,8 @@ class Environment(object):
         self.param_defaults.update(
             env_snippet.get(env_fmt.PARAMETER_DEFAULTS, {}))
         self._update_event_sinks(env_snippet.get(env_fmt.EVENT_SINKS, []))
+        self._update_concurrency_limits(
+            env_snippet.get(env_fmt.CONCURRENCY_LIMITS, {}))
 
     def env_as_dict(self):
         """Get the entire environment as a dict."""
@@ -728,10 +734,13 @@ class Environment(object):
 
     def user_env_as_dict(self):
         """Get the environment as a dict, only user-allowed keys."""
-        return {env_fmt.RESOURCE_REGISTRY: self.registry.as_dict(),
-                env_fmt.PARAMETERS: self.params,
-                env_fmt.PARAMETER_DEFAULTS: self.param_defaults,
-                env_fmt.EVENT_SINKS: self._event_sinks}
+        user_env = {env_fmt.RESOURCE_REGISTRY: self.registry.as_dict(),
+                    env_fmt.PARAMETERS: self.params,
+                    env_fmt.PARAMETER_DEFAULTS: self.param_defaults,
+                    env_fmt.EVENT_SINKS: self._event_sinks}
+        if self.concurrency_limits:
+            user_env[env_fmt.CONCURRENCY_LIMITS] = self.concurrency_limits
+        return user_env
 
     def register_class(self, resource_type, resource_class, path=None):
         self.registry.register_class(resource_type, resource_class, path=path)
@@ -789,6 +798,46 @@ class Environment(object):
     def get_event_sinks(self):
         return self._built_event_sinks
 
+    def _update_concurrency_limits(self, limits):
+        def valid_limit(value):
+            return (isinstance(value, six.integer_types) and
+                    not isinstance(value, bool) and value > 0)
+
+        for key, value in six.iteritems(limits):
+            if key not in env_fmt.CONCURRENCY_LIMITS_KEYS:
+                msg = _('Invalid key "%s" in concurrency_limits') % key
+                raise exception.StackValidationFailed(message=msg)
+            if key == env_fmt.RESOURCE_TYPES:
+                if not isinstance(value, collections.Mapping) or not all(
+                        valid_limit(v) for v in six.itervalues(value)):
+                    msg = _('concurrency_limits "%s" must be a map of '
+                            'resource types to positive integers') % key
+                    raise exception.StackValidationFailed(message=msg)
+            elif not valid_limit(value):
+                msg = _('concurrency_limits "%s" must be a positive '
+                        'integer') % key
+                raise exception.StackValidationFailed(message=msg)
+
+        type_limits = limits.get(env_fmt.RESOURCE_TYPES)
+        self.concurrency_limits.update(
+            (k, v) for k, v in six.iteritems(limits)
+            if k != env_fmt.RESOURCE_TYPES)
+        if type_limits:
+            self.concurrency_limits.setdefault(
+                env_fmt.RESOURCE_TYPES, {}).update(type_limits)
+
+    def get_concurrency_limit(self, resource_type=None):
+        """Return the maximum number of resource actions to run at once.
+
+        If a resource type is given, the limit for resources of that type is
+        returned; otherwise the limit for all of the resources in a stack is
+        returned. None is returned if there is no limit.
+        """
+        if resource_type is None:
+            return self.concurrency_limits.get(env_fmt.MAX_RESOURCES)
+        return self.concurrency_limits.get(env_fmt.RESOURCE_TYPES,
+                                           {}).get(resource_type)
+
 
 def get_child_environment(parent_env, child_params, item_to_remove=None,
                           child_resource_name=None):
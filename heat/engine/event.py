@@ -11,27 +11,114 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import eventlet
 import six
 
-from sqlalchemy.util.compat import pickle
-
+from oslo_config import cfg
 import oslo_db.exception
 from oslo_log import log as logging
+from oslo_utils import timeutils
+from oslo_utils import uuidutils
 
+from heat.common import context as heat_context
+from heat.common import event_properties
+from heat.common.i18n import _LE
 from heat.common import identifier
 from heat.objects import event as event_object
 
+cfg.CONF.import_opt('compress_event_properties', 'heat.common.config')
+cfg.CONF.import_opt('event_write_behind', 'heat.common.config')
+cfg.CONF.import_opt('event_write_behind_batch_size', 'heat.common.config')
+cfg.CONF.import_opt('event_write_behind_interval', 'heat.common.config')
+
 LOG = logging.getLogger(__name__)
 
 MAX_EVENT_RESOURCE_PROPERTIES_SIZE = (1 << 16) - 1
 
 
+class WriteBehindQueue(object):
+    """Per-engine buffer of events waiting to be written to the database.
+
+    Buffered events are written with a single bulk INSERT once
+    event_write_behind_batch_size of them have accumulated, or
+    event_write_behind_interval seconds after the first one was queued,
+    whichever comes first.
+    """
+
+    def __init__(self):
+        self._pending = []
+        self._timer = None
+
+    def __len__(self):
+        return len(self._pending)
+
+    def put(self, values):
+        self._pending.append(values)
+        if len(self._pending) >= cfg.CONF.event_write_behind_batch_size:
+            self.flush()
+        elif self._timer is None:
+            self._timer = eventlet.spawn_after(
+                cfg.CONF.event_write_behind_interval, self._flush_on_timer)
+
+    def _flush_on_timer(self):
+        self._timer = None
+        self.flush()
+
+    def flush(self):
+        """Write all buffered events to the database."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        # Swap the buffer out before doing any I/O, so that events queued by
+        # other greenthreads while we write go into the next batch.
+        pending, self._pending = self._pending, []
+        if not pending:
+            return
+
+        # The flush may run in whichever greenthread queued the event that
+        # filled the batch, so failures are logged here rather than raised
+        # into an unrelated caller.
+        ctx = heat_context.get_admin_context()
+        try:
+            event_object.Event.create_batch(ctx, pending)
+        except Exception:
+            LOG.exception(_LE('Failed to write batch of %d events, '
+                              'retrying individually'), len(pending))
+            for values in pending:
+                try:
+                    _create(ctx, values)
+                except Exception:
+                    LOG.exception(_LE('Failed to write event %s'),
+                                  values.get('uuid'))
+
+
+_write_behind_queue = WriteBehindQueue()
+
+
+def flush_pending():
+    """Write any events buffered by this engine to the database."""
+    _write_behind_queue.flush()
+
+
+def _create(context, values):
+    try:
+        return event_object.Event.create(context, values)
+    except oslo_db.exception.DBError:
+        # Give up and drop all properties..
+        err = 'Resource properties are too large to store'
+        values['resource_properties_data'] = event_properties.dumps(
+            {'Error': err})
+        return event_object.Event.create(context, values)
+
+
 class Event(object):
     """Class representing a Resource state change."""
 
     def __init__(self, context, stack, action, status, reason,
                  physical_resource_id, resource_properties, resource_name,
-                 resource_type, uuid=None, timestamp=None, id=None):
+                 resource_type, uuid=None, timestamp=None, id=None,
+                 root_stack_id=None):
         """Initialise from a context, stack, and event information.
 
         The timestamp and database ID may also be initialised if the event is
@@ -39,6 +126,7 @@ class Event(object):
         """
         self.context = context
         self._stack_identifier = stack.identifier()
+        self.root_stack_id = root_stack_id or stack.root_stack_id()
         self.action = action
         self.status = status
         self.reason = reason
@@ -54,16 +142,25 @@ class Event(object):
         self.id = id
 
     def store(self):
-        """Store the Event in the database."""
+        """Store the Event in the database.
+
+        If event_write_behind is enabled, the event is buffered and written
+        later in a batch; its uuid and timestamp are assigned immediately but
+        the database id remains unset.
+
+        :returns: the database id of the event, or None if the event was
+            buffered by event_write_behind
+        """
         ev = {
             'resource_name': self.resource_name,
             'physical_resource_id': self.physical_resource_id,
             'stack_id': self._stack_identifier.stack_id,
+            'root_stack_id': self.root_stack_id,
             'resource_action': self.action,
             'resource_status': self.status,
             'resource_status_reason': self.reason,
             'resource_type': self.resource_type,
-            'resource_properties': self.resource_properties,
+            'resource_properties_data': self._properties_data(),
         }
 
         if self.uuid is not None:
@@ -72,45 +169,56 @@ class Event(object):
         if self.timestamp is not None:
             ev['created_at'] = self.timestamp
 
-        # Workaround: we don't want to attempt to store the
-        # event.resource_properties column if the data is too large
-        # (greater than permitted by BLOB). Otherwise, we end up with
-        # an unsightly log message.
-        rp_size = len(pickle.dumps(ev['resource_properties'],
-                                   pickle.HIGHEST_PROTOCOL))
-        if rp_size > MAX_EVENT_RESOURCE_PROPERTIES_SIZE:
-            LOG.debug('event\'s resource_properties too large to store at '
-                      '%d bytes', rp_size)
-            # Try truncating the largest value and see if that gets us under
-            # the db column's size constraint.
-            max_key, max_val = max(ev['resource_properties'].items(),
-                                   key=lambda i: len(repr(i[1])))
-            err = 'Resource properties are too large to store fully'
-            ev['resource_properties'].update({'Error': err})
-            ev['resource_properties'][max_key] = '<Deleted, too large>'
-            rp_size = len(pickle.dumps(ev['resource_properties'],
-                                       pickle.HIGHEST_PROTOCOL))
-            if rp_size > MAX_EVENT_RESOURCE_PROPERTIES_SIZE:
-                LOG.debug('event\'s resource_properties STILL too large '
-                          'after truncating largest key at %d bytes', rp_size)
-                err = 'Resource properties are too large to attempt to store'
-                ev['resource_properties'] = {'Error': err}
+        if cfg.CONF.event_write_behind:
+            if self.uuid is None:
+                self.uuid = ev['uuid'] = uuidutils.generate_uuid()
+            if self.timestamp is None:
+                self.timestamp = ev['created_at'] = timeutils.utcnow()
+            _write_behind_queue.put(ev)
+            return self.id
 
         # We should have worked around the issue, but let's be extra
         # careful.
-        try:
-            new_ev = event_object.Event.create(self.context, ev)
-        except oslo_db.exception.DBError:
-            # Give up and drop all properties..
-            err = 'Resource properties are too large to store'
-            ev['resource_properties'] = {'Error': err}
-            new_ev = event_object.Event.create(self.context, ev)
+        new_ev = _create(self.context, ev)
 
         self.id = new_ev.id
         self.timestamp = new_ev.created_at
         self.uuid = new_ev.uuid
         return self.id
 
+    def _properties_data(self):
+        """Serialise the resource properties for storage.
+
+        The size is measured on the serialised data, so that we don't attempt
+        to store more than the column permits (which would only end in an
+        unsightly log message). If the data is too large, the largest value
+        is dropped, and failing that all of the properties.
+        """
+        compress = cfg.CONF.compress_event_properties
+        data = event_properties.dumps(self.resource_properties, compress)
+        if len(data) <= MAX_EVENT_RESOURCE_PROPERTIES_SIZE:
+            return data
+
+        LOG.debug('event\'s resource_properties too large to store at '
+                  '%d bytes', len(data))
+        # Try truncating the largest value and see if that gets us under
+        # the db column's size constraint.
+        max_key = max(self.resource_properties,
+                      key=lambda k: len(event_properties.dumps(
+                          self.resource_properties[k])))
+        err = 'Resource properties are too large to store fully'
+        self.resource_properties.update({'Error': err})
+        self.resource_properties[max_key] = '<Deleted, too large>'
+        data = event_properties.dumps(self.resource_properties, compress)
+        if len(data) <= MAX_EVENT_RESOURCE_PROPERTIES_SIZE:
+            return data
+
+        LOG.debug('event\'s resource_properties STILL too large '
+                  'after truncating largest key at %d bytes', len(data))
+        err = 'Resource properties are too large to attempt to store'
+        self.resource_properties = {'Error': err}
+        return event_properties.dumps(self.resource_properties, compress)
+
     def identifier(self):
         """Return a unique identifier for the event."""
         if self.uuid is None:
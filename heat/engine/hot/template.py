@@ -219,9 +219,8 @@ class HOTemplate20130523(template_common.CommonTemplate):
                                         user_params=user_params,
                                         param_defaults=param_defaults)
 
-    def resource_definitions(self, stack):
+    def _parse_resource_definitions(self, stack, conditions):
         resources = self.t.get(self.RESOURCES) or {}
-        conditions = self.conditions(stack)
 
         valid_keys = frozenset(self._RESOURCE_KEYS)
 
@@ -265,6 +264,7 @@ class HOTemplate20130523(template_common.CommonTemplate):
         if self.t.get(self.RESOURCES) is None:
             self.t[self.RESOURCES] = {}
         self.t[self.RESOURCES][name] = definition.render_hot()
+        self.resources_changed()
 
 
 class HOTemplate20141016(HOTemplate20130523):
@@ -0,0 +1,108 @@
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Caching of the outputs of nested stacks.
+
+Outputs are cached individually, so that only those that are required need
+be resolved. They are only cached while the nested stack is in a COMPLETE
+state, and their keys include the action and updated time of the stack, so
+that they are not used again once the stack has changed, even if the change
+was made by another engine. Each nested stack also has a generation stored in
+the cache that forms part of the keys; replacing it when the state of the
+stack changes discards the outputs immediately in the engine that made the
+change.
+"""
+
+from oslo_cache import core
+from oslo_config import cfg
+from oslo_utils import uuidutils
+import six
+
+from heat.common import cache
+from heat.common import exception
+from heat.objects import stack as stack_object
+
+COMPLETE = 'COMPLETE'
+
+_region = cache.get_cache_region()
+
+
+def _enabled():
+    return cfg.CONF.cache.enabled and cfg.CONF.nested_output_cache.caching
+
+
+def _generation_key(stack_id):
+    return 'heat-nested-outputs-generation:%s' % stack_id
+
+
+def _generation(stack_id):
+    key = _generation_key(stack_id)
+    generation = _region.get(key)
+    if generation is core.NO_VALUE:
+        generation = uuidutils.generate_uuid()
+        _region.set(key, generation)
+    return generation
+
+
+def get_outputs(cnxt, stack_id, output_keys, creator):
+    """Return outputs of a nested stack, from the cache where possible.
+
+    :param cnxt: the context of the request
+    :param stack_id: the ID of the nested stack
+    :param output_keys: a list of the keys of the outputs required
+    :param creator: a function that takes a list of output keys and returns
+        a dict of the values of those outputs that are available
+    """
+    if not _enabled():
+        return creator(output_keys)
+
+    try:
+        action, status, reason, updated_time = stack_object.Stack.get_status(
+            cnxt, stack_id)
+    except exception.NotFound:
+        return creator(output_keys)
+    if status != COMPLETE:
+        return creator(output_keys)
+
+    prefix = 'heat-nested-outputs:%s:%s:%s:%s' % (
+        stack_id, _generation(stack_id), action,
+        updated_time.isoformat() if updated_time else '')
+    expiration_time = cfg.CONF.nested_output_cache.expiration_time
+
+    outputs = {}
+    missing = []
+    for key in output_keys:
+        value = _region.get('%s:%s' % (prefix, key),
+                            expiration_time=expiration_time)
+        if value is core.NO_VALUE:
+            missing.append(key)
+        else:
+            outputs[key] = value
+
+    if missing:
+        found = creator(missing)
+        for key, value in six.iteritems(found):
+            # An output that resolved to None may not be final yet, so
+            # leave it to be fetched again.
+            if value is not None:
+                _region.set('%s:%s' % (prefix, key), value)
+        outputs.update(found)
+    return outputs
+
+
+def invalidate(stack_id):
+    """Discard the cached outputs of a nested stack."""
+    if not _enabled():
+        return
+
+    _region.set(_generation_key(stack_id), uuidutils.generate_uuid())
@@ -0,0 +1,25 @@
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from oslo_config import cfg
+
+from heat.engine import notification
+
+
+def send(context, stats):
+    """Send stack operation scheduler statistics as a notification."""
+    body = dict(stats)
+    body['host'] = cfg.CONF.host
+
+    notification.notify(context, 'scheduler.stats',
+                        notification.get_default_level(), body)
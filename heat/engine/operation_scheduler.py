@@ -0,0 +1,205 @@
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Fair admission of stack operations to an engine."""
+
+import collections
+import contextlib
+import time
+
+from eventlet import event
+from oslo_config import cfg
+from oslo_log import log as logging
+import six
+
+from heat.common.i18n import _LW
+
+LOG = logging.getLogger(__name__)
+
+cfg.CONF.import_opt('max_concurrent_stack_operations', 'heat.common.config')
+cfg.CONF.import_opt('stack_operation_tenant_weights', 'heat.common.config')
+
+
+class OperationScheduler(object):
+    """Limit the number of stack operations running at once in an engine.
+
+    Operations that cannot run immediately are queued, and as running
+    operations finish the queued operations are started in an order that is
+    fair between tenants and, within a tenant, between stacks. The next
+    tenant to be served is the one with the fewest running operations
+    relative to its weight; each stack of a tenant is served in turn.
+
+    A maximum of 0 means that operations are never queued.
+    """
+
+    def __init__(self, max_running, tenant_weights=None):
+        for tenant_id, weight in six.iteritems(tenant_weights or {}):
+            if weight <= 0:
+                raise ValueError('The weight of tenant %s must be greater '
+                                 'than 0' % tenant_id)
+        self.max_running = max_running
+        self.tenant_weights = tenant_weights or {}
+        self._running = collections.defaultdict(int)
+        self._running_total = 0
+        self._queues = collections.OrderedDict()
+        self._queued_total = 0
+        self._admitted = 0
+        self._waited = 0
+        self._total_wait_time = 0.0
+        self._max_wait_time = 0.0
+
+    def _weight(self, tenant_id):
+        return self.tenant_weights.get(tenant_id, 1.0)
+
+    @contextlib.contextmanager
+    def slot(self, tenant_id, stack_id):
+        """Context manager to run an operation once it has been admitted."""
+        if self.max_running <= 0:
+            yield
+            return
+
+        self._acquire(tenant_id, stack_id)
+        try:
+            yield
+        finally:
+            self._release(tenant_id)
+
+    def wrap(self, tenant_id, stack_id, func):
+        """Return a function that runs func once it has been admitted."""
+        def run_when_admitted(*args, **kwargs):
+            with self.slot(tenant_id, stack_id):
+                return func(*args, **kwargs)
+
+        return run_when_admitted
+
+    def _acquire(self, tenant_id, stack_id):
+        if self._running_total < self.max_running and not self._queued_total:
+            self._start(tenant_id)
+            return
+
+        waiter = event.Event()
+        stack_queues = self._queues.setdefault(tenant_id,
+                                               collections.OrderedDict())
+        stack_queues.setdefault(stack_id, collections.deque()).append(waiter)
+        self._queued_total += 1
+
+        queued_at = time.time()
+        try:
+            waiter.wait()
+        except BaseException:
+            if waiter.ready():
+                self._release(tenant_id)
+            else:
+                self._dequeue(tenant_id, stack_id, waiter)
+            raise
+
+        wait_time = time.time() - queued_at
+        self._waited += 1
+        self._total_wait_time += wait_time
+        self._max_wait_time = max(self._max_wait_time, wait_time)
+        LOG.debug('Stack %(stack)s operation admitted after waiting '
+                  '%(wait).1fs', {'stack': stack_id, 'wait': wait_time})
+
+    def _start(self, tenant_id):
+        self._running[tenant_id] += 1
+        self._running_total += 1
+        self._admitted += 1
+
+    def _release(self, tenant_id):
+        self._running[tenant_id] -= 1
+        if not self._running[tenant_id]:
+            del self._running[tenant_id]
+        self._running_total -= 1
+
+        while self._queued_total and self._running_total < self.max_running:
+            self._admit_next()
+
+    def _dequeue(self, tenant_id, stack_id, waiter):
+        stack_queues = self._queues[tenant_id]
+        stack_queues[stack_id].remove(waiter)
+        if not stack_queues[stack_id]:
+            del stack_queues[stack_id]
+        if not stack_queues:
+            del self._queues[tenant_id]
+        self._queued_total -= 1
+
+    def _admit_next(self):
+        def load(tenant_id):
+            return self._running[tenant_id] / self._weight(tenant_id)
+
+        # min() returns the first of equally loaded tenants, and served
+        # tenants move to the back of the queue, so ties are round-robin.
+        tenant_id = min(self._queues, key=load)
+        stack_queues = self._queues.pop(tenant_id)
+        stack_id, waiters = stack_queues.popitem(last=False)
+        waiter = waiters.popleft()
+        if waiters:
+            stack_queues[stack_id] = waiters
+        if stack_queues:
+            self._queues[tenant_id] = stack_queues
+        self._queued_total -= 1
+
+        self._start(tenant_id)
+        waiter.send()
+
+    def stats(self):
+        """Return a dict of statistics about queued and running operations."""
+        queued = dict((tenant_id, sum(len(w) for w in
+                                      six.itervalues(stack_queues)))
+                      for tenant_id, stack_queues in
+                      six.iteritems(self._queues))
+        return {
+            'running': self._running_total,
+            'queued': self._queued_total,
+            'queued_by_tenant': queued,
+            'admitted': self._admitted,
+            'waited': self._waited,
+            'total_wait_time': self._total_wait_time,
+            'max_wait_time': self._max_wait_time,
+        }
+
+
+_scheduler = None
+
+
+def get_scheduler():
+    """Return the operation scheduler for this engine."""
+    global _scheduler
+
+    max_running = cfg.CONF.max_concurrent_stack_operations
+    weights = {}
+    invalid = {}
+    for tenant_id, weight in six.iteritems(
+            cfg.CONF.stack_operation_tenant_weights):
+        try:
+            value = float(weight)
+        except ValueError:
+            value = 0
+        if value > 0:
+            weights[tenant_id] = value
+        else:
+            invalid[tenant_id] = weight
+
+    if (_scheduler is None or _scheduler.max_running != max_running or
+            _scheduler.tenant_weights != weights):
+        if _scheduler is not None and (_scheduler._running_total or
+                                       _scheduler._queued_total):
+            # Keep the scheduler that is tracking operations in progress.
+            return _scheduler
+        for tenant_id, weight in six.iteritems(invalid):
+            LOG.warning(_LW('Ignoring the weight %(weight)s of tenant '
+                            '%(tenant)s in stack_operation_tenant_weights; '
+                            'weights must be numbers greater than 0.'),
+                        {'weight': weight, 'tenant': tenant_id})
+        _scheduler = OperationScheduler(max_running, weights)
+    return _scheduler
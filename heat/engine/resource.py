@@ -42,6 +42,7 @@ from heat.engine import resources
 from heat.engine import rsrc_defn
 from heat.engine import scheduler
 from heat.engine import support
+from heat.engine import template
 from heat.objects import resource as resource_objects
 from heat.objects import resource_data as resource_data_objects
 from heat.objects import stack as stack_objects
@@ -153,6 +154,10 @@ class Resource(object):
     # a signal to this resource
     signal_needs_metadata_updates = True
 
+    # Maximum number of steps between checks for completion of an action.
+    # If set to None the poll_backoff_max_period config option is used.
+    poll_backoff_max_period = None
+
     def __new__(cls, name, definition, stack):
         """Create a new Resource of the appropriate class for its type."""
 
@@ -321,8 +326,11 @@ class Resource(object):
             db_stack = stack_objects.Stack.get_by_id(context, db_res.stack_id)
             db_stack.raw_template = None
             db_stack.raw_template_id = db_res.current_template_id
+            tmpl = template.Template.load_cached(context,
+                                                 db_res.current_template_id)
             resource_owning_stack = stack_mod.Stack.load(context,
-                                                         stack=db_stack)
+                                                         stack=db_stack,
+                                                         template=tmpl)
 
         # Load only the resource in question; don't load all resources
         # by invoking stack.resources. Maintain light-weight stack.
@@ -782,6 +790,7 @@ class Resource(object):
             handler_data = handler(*args)
             yield
             if callable(check):
+                backoff = scheduler.PollBackoff(self.poll_backoff_max_period)
                 try:
                     while True:
                         try:
@@ -792,7 +801,7 @@ class Resource(object):
                             if done:
                                 break
                             else:
-                                yield
+                                yield backoff.next_period()
                 except Exception:
                     raise
                 except:  # noqa
@@ -1732,7 +1741,8 @@ class Resource(object):
         physical_res_id = self.resource_id or self.physical_resource_name()
         ev = event.Event(self.context, self.stack, action, status, reason,
                          physical_res_id, self.properties,
-                         self.name, self.type())
+                         self.name, self.type(),
+                         root_stack_id=self.root_stack_id)
 
         ev.store()
         self.stack.dispatch_event(ev)
@@ -87,6 +87,11 @@ class NestedStack(stack_resource.StackResource):
         attribute = self.get_output(key.partition('.')[-1])
         return attributes.select_from_attribute(attribute, path)
 
+    def _output_key(self, attr_name):
+        if attr_name.startswith('Outputs.'):
+            return attr_name.partition('.')[-1]
+        return None
+
     def get_reference_id(self):
         if self.nested() is None:
             return six.text_type(self.name)
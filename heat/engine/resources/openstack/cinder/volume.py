@@ -325,6 +325,7 @@ class CinderVolume(vb.BaseVolume, sh.SchedulerHintsMixin):
     def _extend_volume(self, new_size):
         try:
             self.client().volumes.extend(self.resource_id, new_size)
+            self.client_plugin().expire_volume(self.resource_id)
         except Exception as ex:
             if self.client_plugin().is_client_exception(ex):
                 raise exception.Error(_(
@@ -342,7 +343,7 @@ class CinderVolume(vb.BaseVolume, sh.SchedulerHintsMixin):
         return True
 
     def _check_extend_volume_complete(self):
-        vol = self.client().volumes.get(self.resource_id)
+        vol = self.client_plugin().fetch_volume(self.resource_id)
         if vol.status == 'extending':
             LOG.debug("Volume %s is being extended" % vol.id)
             return False
@@ -361,6 +362,7 @@ class CinderVolume(vb.BaseVolume, sh.SchedulerHintsMixin):
     def _backup_restore(self, vol_id, backup_id):
         try:
             self.client().restores.restore(backup_id, vol_id)
+            self.client_plugin().expire_volume(vol_id)
         except Exception as ex:
             if self.client_plugin().is_client_exception(ex):
                 raise exception.Error(_(
@@ -373,7 +375,7 @@ class CinderVolume(vb.BaseVolume, sh.SchedulerHintsMixin):
         return True
 
     def _check_backup_restore_complete(self):
-        vol = self.client().volumes.get(self.resource_id)
+        vol = self.client_plugin().fetch_volume(self.resource_id)
         if vol.status == 'restoring-backup':
             LOG.debug("Volume %s is being restoring from backup" % vol.id)
             return False
@@ -199,8 +199,8 @@ class AutoScalingResourceGroup(aws_asg.AutoScalingGroup):
             refs = grouputils.get_member_refids(self)
             return refs
         if key == self.REFS_MAP:
-            members = grouputils.get_members(self)
-            refs_map = {m.name: m.resource_id for m in members}
+            members = grouputils.get_member_view(self)
+            refs_map = {m.name: m.physical_resource_id for m in members}
             return refs_map
         if path:
             members = grouputils.get_members(self)
@@ -12,7 +12,6 @@
 #    under the License.
 
 import collections
-import copy
 import itertools
 
 import six
@@ -33,6 +32,65 @@ from heat.scaling import rolling_update
 from heat.scaling import template as scl_template
 
 
+def _index_substitution(value, index_var):
+    """Return a function that substitutes a member name into a value.
+
+    The function replaces index_var with the name in every string within the
+    value. Only the parts of the value that contain index_var are copied;
+    everything else is shared between the results. If nothing in the value
+    contains index_var, None is returned instead of a function.
+    """
+    if isinstance(value, six.string_types):
+        if index_var in value:
+            return lambda name: value.replace(index_var, name)
+    elif isinstance(value, collections.Mapping):
+        subs = dict((k, _index_substitution(v, index_var))
+                    for k, v in value.items())
+        if any(s is not None for s in subs.values()):
+            return lambda name: dict((k, v if subs[k] is None
+                                      else subs[k](name))
+                                     for k, v in value.items())
+    elif isinstance(value, collections.Sequence):
+        subs = [_index_substitution(v, index_var) for v in value]
+        if any(s is not None for s in subs):
+            return lambda name: [v if s is None else s(name)
+                                 for v, s in zip(value, subs)]
+    return None
+
+
+class _MemberProperties(object):
+    """The properties of the members of a group with a resource definition.
+
+    The properties of each member are generated only once, and share the
+    parts of the definition that do not contain the index variable.
+    """
+
+    def __init__(self, properties, index_var):
+        self.properties = properties
+        self.index_var = index_var
+        self._substitute = None
+        if properties:
+            self._substitute = _index_substitution(properties, index_var)
+        self._members = {}
+
+    def matches(self, properties, index_var):
+        if index_var != self.index_var:
+            return False
+        if properties is self.properties:
+            return True
+        if properties != self.properties:
+            return False
+        self.properties = properties
+        return True
+
+    def get(self, name):
+        if self._substitute is None:
+            return self.properties
+        if name not in self._members:
+            self._members[name] = self._substitute(name)
+        return self._members[name]
+
+
 class ResourceGroup(stack_resource.StackResource):
     """Creates one or more identically configured nested resources.
 
@@ -268,6 +326,10 @@ class ResourceGroup(stack_resource.StackResource):
         )
     }
 
+    def __init__(self, name, json_snippet, stack):
+        super(ResourceGroup, self).__init__(name, json_snippet, stack)
+        self._member_props = None
+
     def get_size(self):
         return self.properties.get(self.COUNT)
 
@@ -452,17 +514,22 @@ class ResourceGroup(stack_resource.StackResource):
                 for n in names]
 
     def build_resource_definition(self, res_name, res_defn):
-        res_def = copy.deepcopy(res_defn)
+        props = self._member_properties(res_defn).get(res_name)
 
-        props = res_def.get(self.RESOURCE_DEF_PROPERTIES)
-        if props:
-            props = self._handle_repl_val(res_name, props)
-
-        res_type = res_def[self.RESOURCE_DEF_TYPE]
-        meta = res_def[self.RESOURCE_DEF_METADATA]
+        res_type = res_defn[self.RESOURCE_DEF_TYPE]
+        meta = res_defn[self.RESOURCE_DEF_METADATA]
 
         return rsrc_defn.ResourceDefinition(res_name, res_type, props, meta)
 
+    def _member_properties(self, res_defn):
+        props = res_defn.get(self.RESOURCE_DEF_PROPERTIES)
+        repl_var = self.properties[self.INDEX_VAR]
+
+        if (self._member_props is None or
+                not self._member_props.matches(props, repl_var)):
+            self._member_props = _MemberProperties(props, repl_var)
+        return self._member_props
+
     def get_resource_def(self, include_all=False):
         """Returns the resource definition portion of the group.
 
@@ -500,7 +567,7 @@ class ResourceGroup(stack_resource.StackResource):
         return res_def
 
     def _clean_props(self, res_defn):
-        res_def = copy.deepcopy(res_defn)
+        res_def = dict(res_defn)
         props = res_def.get(self.RESOURCE_DEF_PROPERTIES)
         if props:
             clean = dict((k, v) for k, v in props.items() if v is not None)
@@ -508,20 +575,6 @@ class ResourceGroup(stack_resource.StackResource):
             res_def[self.RESOURCE_DEF_PROPERTIES] = props
         return res_def
 
-    def _handle_repl_val(self, res_name, val):
-        repl_var = self.properties[self.INDEX_VAR]
-
-        def recurse(x):
-            return self._handle_repl_val(res_name, x)
-
-        if isinstance(val, six.string_types):
-            return val.replace(repl_var, res_name)
-        elif isinstance(val, collections.Mapping):
-            return {k: recurse(v) for k, v in val.items()}
-        elif isinstance(val, collections.Sequence):
-            return [recurse(v) for v in val]
-        return val
-
     def _assemble_nested(self, names, include_all=False,
                          template_version=('heat_template_version',
                                            '2015-04-30')):
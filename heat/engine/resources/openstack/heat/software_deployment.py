@@ -11,7 +11,6 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
-import copy
 import uuid
 
 from oslo_config import cfg
@@ -678,7 +677,7 @@ class SoftwareDeploymentGroup(resource_group.ResourceGroup):
         return dict(self.properties)
 
     def build_resource_definition(self, res_name, res_defn):
-        props = copy.deepcopy(res_defn)
+        props = dict(res_defn)
         servers = props.pop(self.SERVERS)
         props[SoftwareDeployment.SERVER] = servers.get(res_name)
         return rsrc_defn.ResourceDefinition(res_name,
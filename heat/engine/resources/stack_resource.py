@@ -11,16 +11,19 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import collections
 import json
 import warnings
 import weakref
 
 from oslo_config import cfg
 from oslo_log import log as logging
+from oslo_messaging.rpc import dispatcher
 from oslo_utils import excutils
 from oslo_utils import reflection
 import six
 
+from heat.common import context
 from heat.common import exception
 from heat.common.i18n import _
 from heat.common.i18n import _LI
@@ -29,17 +32,32 @@ from heat.common import identifier
 from heat.common import template_format
 from heat.engine import attributes
 from heat.engine import environment
+from heat.engine import nested_output_cache
 from heat.engine import resource
 from heat.engine import scheduler
 from heat.engine import stack as parser
 from heat.engine import template
 from heat.objects import raw_template
+from heat.objects import resource as resource_objects
 from heat.objects import stack as stack_object
 from heat.objects import stack_lock
 from heat.rpc import api as rpc_api
 
 LOG = logging.getLogger(__name__)
 
+ResourceSummary = collections.namedtuple('ResourceSummary',
+                                         ['name', 'action', 'status',
+                                          'created_at',
+                                          'physical_resource_id'])
+
+_local_engine = None
+
+
+def set_local_engine(engine):
+    """Set the engine service running in this process, or None."""
+    global _local_engine
+    _local_engine = engine
+
 
 class StackResource(resource.Resource):
     """Allows entire stack to be managed as a resource in a parent stack.
@@ -56,6 +74,7 @@ class StackResource(resource.Resource):
     def __init__(self, name, json_snippet, stack):
         super(StackResource, self).__init__(name, json_snippet, stack)
         self._nested = None
+        self._nested_summaries = None
         self._outputs = None
         self.resource_info = None
 
@@ -138,6 +157,45 @@ class StackResource(resource.Resource):
 
         return self._nested
 
+    def nested_resource_summaries(self):
+        """Return a ResourceSummary for each resource in the nested stack.
+
+        Unless the nested stack has already been loaded, the summaries are
+        read from the database without loading the nested stack or creating
+        its resources, and are kept until this resource changes the nested
+        stack. Only resources named in the nested stack's current template
+        are included, so that rows left by a failed update are ignored, and
+        where a resource has been replaced, only the newest replacement.
+        """
+        if self._nested is not None:
+            return [ResourceSummary(r.name, r.action, r.status,
+                                    r.created_time, r.resource_id)
+                    for r in six.itervalues(self._nested)]
+
+        if self._nested_summaries is None:
+            if self.resource_id is None:
+                return []
+            stack = stack_object.Stack.get_by_id(self.context,
+                                                 self.resource_id)
+            if stack is None:
+                return []
+            tmpl = template.Template.load(self.context,
+                                          stack.raw_template_id,
+                                          stack.raw_template)
+            names = set(tmpl.t.get(tmpl.RESOURCES) or {})
+            summaries = {}
+            for row in resource_objects.Resource.get_summaries_by_stack(
+                    self.context, self.resource_id):
+                if (row.name not in names or
+                        (row.action, row.status) == (self.DELETE,
+                                                     self.COMPLETE)):
+                    continue
+                summaries[row.name] = ResourceSummary(
+                    row.name, row.action, row.status, row.created_at,
+                    row.physical_resource_id)
+            self._nested_summaries = list(summaries.values())
+        return self._nested_summaries
+
     def child_template(self):
         """Default implementation to get the child template.
 
@@ -286,14 +344,14 @@ class StackResource(resource.Resource):
         with self.translate_remote_exceptions:
             result = None
             try:
-                result = self.rpc_client()._create_stack(self.context,
-                                                         **kwargs)
+                result = self._call_engine('create_stack', kwargs)
             finally:
                 if adopt_data is None and not result:
                     raw_template.RawTemplate.delete(self.context,
                                                     kwargs['template_id'])
 
         self.resource_id_set(result['stack_id'])
+        self._nested_summaries = None
 
     def _stack_kwargs(self, user_params, child_template, adopt_data=None):
 
@@ -316,6 +374,7 @@ class StackResource(resource.Resource):
                 'template': None,
                 'params': None,
                 'files': None,
+                'parsed_template': parsed_template,
             }
         else:
             return {
@@ -324,6 +383,48 @@ class StackResource(resource.Resource):
                 'files': parsed_template.files,
             }
 
+    def _in_process_engine(self):
+        """Return the engine in this process if it holds the parent's lock.
+
+        This is the engine that is running the operation on the parent stack,
+        so it can also create or update the nested stack without a round trip
+        through the message bus.
+        """
+        if not cfg.CONF.local_nested_stack_operations or _local_engine is None:
+            return None
+        engine_id = stack_lock.StackLock.get_engine_id(self.context,
+                                                       self.stack.id)
+        if engine_id is None or engine_id != _local_engine.engine_id:
+            return None
+        return _local_engine
+
+    def _call_engine(self, method, kwargs):
+        """Call the engine to create or update the nested stack.
+
+        When the local engine is available the call is made in-process, and
+        the engine uses the already parsed child template rather than loading
+        and parsing it again. Otherwise the call is made over RPC.
+        """
+        parsed_template = kwargs.pop('parsed_template', None)
+        engine = None
+        if parsed_template is not None:
+            engine = self._in_process_engine()
+        if engine is None:
+            return getattr(self.rpc_client(), '_' + method)(self.context,
+                                                            **kwargs)
+
+        LOG.debug('Calling %(method)s for nested stack of %(name)s '
+                  'in-process', {'method': method, 'name': self.name})
+        # Give the nested stack its own copy of the context, as it would
+        # have received over RPC.
+        cnxt = context.RequestContext.from_dict(self.context.to_dict())
+        try:
+            return getattr(engine, method)(cnxt,
+                                           parsed_template=parsed_template,
+                                           **kwargs)
+        except dispatcher.ExpectedException as ex:
+            six.reraise(*ex.exc_info)
+
     def raise_local_exception(self, ex):
         warnings.warn('raise_local_exception() is deprecated. Use the '
                       'translate_remote_exceptions context manager instead.',
@@ -399,6 +500,7 @@ class StackResource(resource.Resource):
             if ret:
                 # Reset nested, to indicate we changed status
                 self._nested = None
+                self._nested_summaries = None
             return ret
         elif status == self.FAILED:
             raise exception.ResourceFailure(status_reason, self,
@@ -484,11 +586,11 @@ class StackResource(resource.Resource):
             'stack_identity': dict(self.nested_identifier()),
             'args': {rpc_api.PARAM_TIMEOUT: timeout_mins}
         })
+        self._nested_summaries = None
         with self.translate_remote_exceptions:
             result = None
             try:
-                result = self.rpc_client()._update_stack(self.context,
-                                                         **kwargs)
+                result = self._call_engine('update_stack', kwargs)
             finally:
                 if not result:
                     raw_template.RawTemplate.delete(self.context,
@@ -525,6 +627,7 @@ class StackResource(resource.Resource):
         if stack_identity is None:
             return
 
+        self._nested_summaries = None
         try:
             if self.abandon_in_progress:
                 self.rpc_client().abandon_stack(self.context, stack_identity)
@@ -587,18 +690,32 @@ class StackResource(resource.Resource):
         particular exception, not KeyError, being raised if the key does not
         exist.)
         """
-        if self._outputs is None or self._outputs.get(op,
-                                                      NotImplemented) is None:
+        if self._outputs is None or self._outputs.get(op) is None:
             stack_identity = self.nested_identifier()
             if stack_identity is None:
                 return
-            stack = self.rpc_client().show_stack(self.context,
-                                                 dict(stack_identity))
-            if not stack:
-                return
-            outputs = stack[0][rpc_api.STACK_OUTPUTS]
-            self._outputs = {o[rpc_api.OUTPUT_KEY]: o[rpc_api.OUTPUT_VALUE]
-                             for o in outputs if rpc_api.OUTPUT_ERROR not in o}
+
+            # Fetch every output that the parent stack refers to in one go,
+            # rather than making a separate call for each attribute. Outputs
+            # that resolved to None are fetched again, since their value may
+            # not be final yet.
+            fetched = self._outputs or {}
+            keys = [op] + sorted(k for k in self._referenced_outputs()
+                                 if k != op and fetched.get(k) is None)
+
+            def fetch_outputs(output_keys):
+                outputs = self.rpc_client().show_outputs(self.context,
+                                                         dict(stack_identity),
+                                                         output_keys)
+                return {o[rpc_api.OUTPUT_KEY]: o[rpc_api.OUTPUT_VALUE]
+                        for o in outputs if rpc_api.OUTPUT_ERROR not in o}
+
+            outputs = nested_output_cache.get_outputs(self.context,
+                                                      self.resource_id,
+                                                      keys, fetch_outputs)
+            if self._outputs is None:
+                self._outputs = {}
+            self._outputs.update(outputs)
 
         try:
             return self._outputs[op]
@@ -606,5 +723,27 @@ class StackResource(resource.Resource):
             raise exception.InvalidTemplateAttribute(resource=self.name,
                                                      key=op)
 
+    def _output_key(self, attr_name):
+        """Return the nested stack output key for an attribute name."""
+        return attr_name
+
+    def _referenced_outputs(self):
+        """Return the output keys referenced by the rest of the stack."""
+        stack = self.stack
+        dep_attrs = stack.get_dep_attrs(
+            six.itervalues(stack.t.resource_definitions(stack)),
+            stack.outputs,
+            self.name,
+            stack.t.OUTPUT_VALUE)
+        keys = set()
+        for attr in dep_attrs:
+            if isinstance(attr, tuple):
+                attr = attr[0]
+            if isinstance(attr, six.string_types):
+                key = self._output_key(attr)
+                if key:
+                    keys.add(key)
+        return keys
+
     def _resolve_attribute(self, name):
         return self.get_output(name)
@@ -45,7 +45,7 @@ class BaseVolume(resource.Resource):
         return vol.id
 
     def check_create_complete(self, vol_id):
-        vol = self.client().volumes.get(vol_id)
+        vol = self.client_plugin().fetch_volume(vol_id)
 
         if vol.status == 'available':
             return True
@@ -124,6 +124,7 @@ class BaseVolume(resource.Resource):
             # just wait for the deletion to complete
             if vol.status != 'deleting':
                 cinder.volumes.delete(self.resource_id)
+                self.client_plugin().expire_volume(self.resource_id)
             return False
         except Exception as ex:
             self.client_plugin().ignore_not_found(ex)
@@ -146,7 +147,7 @@ class BaseVolume(resource.Resource):
 
         if not prg.delete['complete']:
             try:
-                vol = self.client().volumes.get(self.resource_id)
+                vol = self.client_plugin().fetch_volume(self.resource_id)
             except Exception as ex:
                 self.client_plugin().ignore_not_found(ex)
                 prg.delete['complete'] = True
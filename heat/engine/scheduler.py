@@ -11,11 +11,16 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import collections
 import functools
+import heapq
+import itertools
+import random
 import sys
 import types
 
 import eventlet
+from oslo_config import cfg
 from oslo_log import log as logging
 from oslo_utils import encodeutils
 from oslo_utils import excutils
@@ -28,6 +33,10 @@ from heat.common import timeutils
 
 LOG = logging.getLogger(__name__)
 
+cfg.CONF.import_opt('poll_backoff_max_period', 'heat.common.config')
+cfg.CONF.import_opt('poll_backoff_initial_polls', 'heat.common.config')
+cfg.CONF.import_opt('poll_backoff_factor', 'heat.common.config')
+
 
 # Whether TaskRunner._sleep actually does an eventlet sleep when called.
 ENABLE_SLEEP = True
@@ -48,6 +57,43 @@ def task_description(task):
     return encodeutils.safe_decode(repr(task))
 
 
+class PollBackoff(object):
+    """Calculate the poll periods for a task waiting on an operation.
+
+    The first initial_polls polls are made on every step, so that operations
+    that complete quickly are not delayed. After that the period between polls
+    grows exponentially up to max_period steps, with random jitter to spread
+    out the polls of operations that were started at the same time.
+    """
+
+    def __init__(self, max_period=None, initial_polls=None, factor=None):
+        if max_period is None:
+            max_period = cfg.CONF.poll_backoff_max_period
+        if initial_polls is None:
+            initial_polls = cfg.CONF.poll_backoff_initial_polls
+        if factor is None:
+            factor = cfg.CONF.poll_backoff_factor
+        self.max_period = max_period
+        self.initial_polls = initial_polls
+        self.factor = factor
+        self._polls = 0
+
+    def next_period(self):
+        """Return the number of steps to wait before polling again.
+
+        None is returned when the next poll should happen on the next step, so
+        the result may be yielded directly from a task.
+        """
+        self._polls += 1
+        backoffs = self._polls - self.initial_polls
+        if self.max_period <= 1 or backoffs <= 0:
+            return None
+
+        period = min(self.factor ** backoffs, self.max_period)
+        period = int(round(random.uniform(period / 2.0, period)))
+        return period if period > 1 else None
+
+
 @functools.total_ordering
 class Timeout(BaseException):
     """Raised when task has exceeded its allotted (wallclock) running time.
@@ -377,7 +423,8 @@ class DependencyTaskGroup(object):
 
     def __init__(self, dependencies, task=lambda o: o(),
                  reverse=False, name=None, error_wait_time=None,
-                 aggregate_exceptions=False):
+                 aggregate_exceptions=False, max_running=None,
+                 limit_group=None):
         """Initialise with the task dependencies.
 
         A task to run on each dependency may optionally be specified.  If no
@@ -397,10 +444,37 @@ class DependencyTaskGroup(object):
         will not be cancelled in the event of an error (operations downstream
         of the error will be cancelled). Once all chains are complete, any
         errors will be rolled up into an ExceptionGroup exception.
+
+        If max_running is specified, no more than that number of subtasks are
+        run at once. If limit_group is specified, it will be called for each
+        task, passing the dependency key as an argument, and may return a
+        tuple of a group name and the maximum number of subtasks in that group
+        to run at once, or None if the task is not limited.
         """
         self._keys = list(dependencies)
         self._runners = dict((o, TaskRunner(task, o)) for o in self._keys)
         self._graph = dependencies.graph(reverse=reverse)
+
+        # Subtasks are tracked by their position in self._keys. Subtasks whose
+        # dependencies have all been satisfied are held in a heap until they
+        # are started, and then in the running dict until they complete, so
+        # that each step only visits the subtasks that can make progress.
+        self._index = dict((k, i) for i, k in enumerate(self._keys))
+        self._ready_heap = [i for i, k in enumerate(self._keys)
+                            if not self._graph[k]]
+        heapq.heapify(self._ready_heap)
+        self._deferred = []
+        self._running_tasks = {}
+
+        # Ready subtasks that could not be started because of a concurrency
+        # limit are held until a subtask in the same group (or any subtask,
+        # for the overall limit) completes.
+        self.max_running = max_running
+        self._limit_group = limit_group
+        self._groups = {}
+        self._group_counts = collections.defaultdict(int)
+        self._throttled = collections.defaultdict(list)
+
         self.error_wait_time = error_wait_time
         self.aggregate_exceptions = aggregate_exceptions
 
@@ -421,12 +495,14 @@ class DependencyTaskGroup(object):
         thrown_exceptions = []
 
         try:
-            while any(six.itervalues(self._runners)):
+            while self._pending():
                 try:
                     for k, r in self._ready():
                         r.start()
                         if not r:
-                            del self._graph[k]
+                            self._complete(k)
+                        else:
+                            self._running_tasks[self._index[k]] = r
 
                     if self._graph:
                         try:
@@ -437,7 +513,7 @@ class DependencyTaskGroup(object):
 
                     for k, r in self._running():
                         if r.step():
-                            del self._graph[k]
+                            self._complete(k)
                 except Exception:
                     exc_info = None
                     try:
@@ -490,18 +566,95 @@ class DependencyTaskGroup(object):
             self._cancel_recursively(dependent_node, node_runner)
 
         del self._graph[key]
+        self._stopped(self._index[key])
+
+    def _complete(self, key):
+        """Remove a completed subtask, and queue any that become ready."""
+        dependents = list(self._graph[key].required_by())
+        del self._graph[key]
+        self._stopped(self._index[key])
+
+        for dep in dependents:
+            if not self._graph.get(dep, True):
+                heapq.heappush(self._ready_heap, self._index[dep])
+
+    def _stopped(self, index):
+        """Release the concurrency limits held by a subtask."""
+        self._running_tasks.pop(index, None)
+        if index not in self._groups:
+            return
+
+        group = self._groups.pop(index)
+        self._group_counts[group] -= 1
+        for g in (group, None):
+            for i in self._throttled.pop(g, []):
+                heapq.heappush(self._ready_heap, i)
+
+    def _throttle(self, index):
+        """Hold a ready subtask if starting it would exceed a limit.
+
+        Returns True if the subtask has been held.
+        """
+        if self.max_running is None and self._limit_group is None:
+            return False
+
+        group = None
+        if self._limit_group is not None:
+            limit = self._limit_group(self._keys[index])
+            if limit is not None:
+                group, max_group = limit
+                if self._group_counts[group] >= max_group:
+                    self._throttled[group].append(index)
+                    return True
+
+        if (self.max_running is not None and
+                len(self._groups) >= self.max_running):
+            self._throttled[None].append(index)
+            return True
+
+        self._groups[index] = group
+        self._group_counts[group] += 1
+        return False
+
+    def _pending(self):
+        """Return True if any subtask remains to be run.
+
+        Subtasks that are waiting on their dependencies are not checked;
+        these can only be outstanding while one of their dependencies is
+        ready or running.
+        """
+        return (any(six.itervalues(self._running_tasks)) or
+                any(self._runners[self._keys[i]]
+                    for i in itertools.chain(
+                        self._ready_heap, self._deferred,
+                        *six.itervalues(self._throttled))))
 
     def _ready(self):
         """Iterate over all subtasks that are ready to start.
 
         Ready subtasks are subtasks whose dependencies have all been satisfied,
-        but which have not yet been started.
+        but which have not yet been started. They are returned in the order of
+        the dependencies; a subtask that becomes ready during the iteration is
+        returned in the same iteration only if it comes later in that order.
         """
-        for k in self._keys:
-            if not self._graph.get(k, True):
-                runner = self._runners[k]
-                if runner and not runner.started():
-                    yield k, runner
+        for i in self._deferred:
+            heapq.heappush(self._ready_heap, i)
+        self._deferred = []
+
+        last = -1
+        while self._ready_heap:
+            i = heapq.heappop(self._ready_heap)
+            if i < last:
+                self._deferred.append(i)
+                continue
+            last = i
+
+            k = self._keys[i]
+            runner = self._runners[k]
+            if runner and not runner.started():
+                if self._throttle(i):
+                    continue
+                yield k, runner
 
     def _running(self):
         """Iterate over all subtasks that are currently running.
@@ -509,8 +662,5 @@ class DependencyTaskGroup(object):
         Running subtasks are subtasks have been started but have not yet
         completed.
         """
-
-        def running(k_r):
-            return k_r[0] in self._graph and k_r[1].started()
-
-        return six.moves.filter(running, six.iteritems(self._runners))
+        return [(self._keys[i], self._running_tasks[i])
+                for i in sorted(self._running_tasks)]
@@ -49,15 +49,21 @@ from heat.engine import attributes
 from heat.engine.cfn import template as cfntemplate
 from heat.engine import clients
 from heat.engine import environment
+from heat.engine import event
 from heat.engine.hot import functions as hot_functions
+from heat.engine.notification import scheduler as scheduler_notification
+from heat.engine import operation_scheduler
 from heat.engine import parameter_groups
 from heat.engine import properties
 from heat.engine import resources
+from heat.engine.resources import stack_resource
 from heat.engine import service_software_config
 from heat.engine import service_stack_watch
 from heat.engine import stack as parser
+from heat.engine import stack_list_cache
 from heat.engine import stack_lock
 from heat.engine import support
+from heat.engine import sync_point_store
 from heat.engine import template as templatem
 from heat.engine import update
 from heat.engine import watchrule
@@ -101,10 +107,19 @@ class ThreadGroupManager(object):
         """Dummy task which gets queued on the service.Service threadgroup.
 
         Without this, service.Service sees nothing running i.e has nothing to
-        wait() on, so the process exits. This could also be used to trigger
-        periodic non-stack-specific housekeeping tasks.
+        wait() on, so the process exits. This is also used to publish the
+        statistics of the stack operation scheduler.
         """
-        pass
+        scheduler = operation_scheduler.get_scheduler()
+        if scheduler.max_running > 0:
+            stats = scheduler.stats()
+            LOG.debug('Stack operation scheduler: %s', stats)
+            try:
+                scheduler_notification.send(context.get_admin_context(),
+                                            stats)
+            except Exception as ex:
+                LOG.error(_LE('Failed to send stack operation scheduler '
+                              'statistics: %s'), ex)
 
     def _serialize_profile_info(self):
         prof = profiler.get()
@@ -195,6 +210,11 @@ class ThreadGroupManager(object):
 
         # Link to self to allow the stack to run tasks
         stack.thread_group_mgr = self
+        if stack.owner_id is None:
+            # Nested stacks are not queued, as their parent stacks are
+            # already holding a place while waiting for them.
+            func = operation_scheduler.get_scheduler().wrap(
+                stack.context.tenant_id, stack.id, func)
         th = self.start(stack.id, func, *args, **kwargs)
         th.link(release)
         return th
@@ -303,7 +323,7 @@ class EngineService(service.Service):
     by the RPC caller.
     """
 
-    RPC_API_VERSION = '1.35'
+    RPC_API_VERSION = '1.36'
 
     def __init__(self, host, topic):
         super(EngineService, self).__init__()
@@ -373,6 +393,8 @@ class EngineService(service.Service):
         self.listener.start()
 
         if cfg.CONF.convergence_engine:
+            sync_point_store.check_deployment(context.get_admin_context(),
+                                              self.host)
             self.worker_service = worker.WorkerService(
                 host=self.host,
                 topic=rpc_worker_api.TOPIC,
@@ -393,6 +415,7 @@ class EngineService(service.Service):
 
         self._configure_db_conn_pool_size()
         self.service_manage_cleanup()
+        stack_resource.set_local_engine(self)
         if self.manage_thread_grp is None:
             self.manage_thread_grp = threadgroup.ThreadGroup()
         self.manage_thread_grp.add_timer(cfg.CONF.periodic_interval,
@@ -427,6 +450,7 @@ class EngineService(service.Service):
 
     def stop(self):
         self._stop_rpc_server()
+        stack_resource.set_local_engine(None)
 
         if cfg.CONF.convergence_engine and self.worker_service:
             # Stop the WorkerService
@@ -443,6 +467,9 @@ class EngineService(service.Service):
                 # Stop threads gracefully
                 self.thread_group_mgr.stop(stack_id, True)
                 LOG.info(_LI("Stack %s processing was finished"), stack_id)
+
+        # Write out any events still buffered by this engine
+        event.flush_pending()
         if self.manage_thread_grp:
             self.manage_thread_grp.stop()
             ctxt = context.get_admin_context()
@@ -564,21 +591,26 @@ class EngineService(service.Service):
         if not tenant_safe:
             cnxt = context.get_admin_context()
 
-        stacks = stack_object.Stack.get_all(
-            cnxt,
-            limit=limit,
-            sort_keys=sort_keys,
-            marker=marker,
-            sort_dir=sort_dir,
-            filters=filters,
-            show_deleted=show_deleted,
-            show_nested=show_nested,
-            show_hidden=show_hidden,
-            tags=tags,
-            tags_any=tags_any,
-            not_tags=not_tags,
-            not_tags_any=not_tags_any)
-        return [api.format_stack_db_object(stack) for stack in stacks]
+        params = {'limit': limit,
+                  'sort_keys': sort_keys,
+                  'marker': marker,
+                  'sort_dir': sort_dir,
+                  'filters': filters,
+                  'show_deleted': show_deleted,
+                  'show_nested': show_nested,
+                  'show_hidden': show_hidden,
+                  'tags': tags,
+                  'tags_any': tags_any,
+                  'not_tags': not_tags,
+                  'not_tags_any': not_tags_any}
+
+        def list_stacks():
+            stacks = stack_object.Stack.get_all(cnxt, summary=True,
+                                                **params)
+            return [api.format_stack_db_object(stack) for stack in stacks]
+
+        return stack_list_cache.get_or_create(cnxt, 'list', params,
+                                              list_stacks)
 
     @context.request_context
     def count_stacks(self, cnxt, filters=None, tenant_safe=True,
@@ -607,16 +639,20 @@ class EngineService(service.Service):
         if not tenant_safe:
             cnxt = context.get_admin_context()
 
-        return stack_object.Stack.count_all(
-            cnxt,
-            filters=filters,
-            show_deleted=show_deleted,
-            show_nested=show_nested,
-            show_hidden=show_hidden,
-            tags=tags,
-            tags_any=tags_any,
-            not_tags=not_tags,
-            not_tags_any=not_tags_any)
+        params = {'filters': filters,
+                  'show_deleted': show_deleted,
+                  'show_nested': show_nested,
+                  'show_hidden': show_hidden,
+                  'tags': tags,
+                  'tags_any': tags_any,
+                  'not_tags': not_tags,
+                  'not_tags_any': not_tags_any}
+
+        def count_stacks():
+            return stack_object.Stack.count_all(cnxt, **params)
+
+        return stack_list_cache.get_or_create(cnxt, 'count', params,
+                                              count_stacks)
 
     def _validate_deferred_auth_context(self, cnxt, stack):
         if cfg.CONF.deferred_auth_method != 'password':
@@ -664,7 +700,8 @@ class EngineService(service.Service):
                                            stack_user_project_id=None,
                                            convergence=False,
                                            parent_resource_name=None,
-                                           template_id=None):
+                                           template_id=None,
+                                           parsed_template=None):
         common_params = api.extract_args(args)
 
         # If it is stack-adopt, use parameters from adopt_stack_data
@@ -680,7 +717,9 @@ class EngineService(service.Service):
             new_params.update(params.get(rpc_api.STACK_PARAMETERS, {}))
             params[rpc_api.STACK_PARAMETERS] = new_params
 
-        if template_id is not None:
+        if parsed_template is not None:
+            tmpl = parsed_template
+        elif template_id is not None:
             tmpl = templatem.Template.load(cnxt, template_id)
         else:
             tmpl = templatem.Template(template, files=files)
@@ -744,7 +783,7 @@ class EngineService(service.Service):
                      args, environment_files=None,
                      owner_id=None, nested_depth=0, user_creds_id=None,
                      stack_user_project_id=None, parent_resource_name=None,
-                     template_id=None):
+                     template_id=None, parsed_template=None):
         """Create a new stack using the template provided.
 
         Note that at this stage the template has already been fetched from the
@@ -768,6 +807,9 @@ class EngineService(service.Service):
                          nested stacks
         :param parent_resource_name: the parent resource name
         :param template_id: the ID of a pre-stored template in the DB
+        :param parsed_template: the pre-stored template, already parsed; only
+                         passed when called in-process by a nested stack
+                         resource
         """
         LOG.info(_LI('Creating stack %s'), stack_name)
 
@@ -800,7 +842,7 @@ class EngineService(service.Service):
             cnxt, stack_name, template, params, files, environment_files,
             args, owner_id, nested_depth, user_creds_id,
             stack_user_project_id, convergence, parent_resource_name,
-            template_id)
+            template_id, parsed_template)
 
         self.resource_enforcer.enforce_stack(stack)
         stack_id = stack.store()
@@ -828,7 +870,8 @@ class EngineService(service.Service):
 
     def _prepare_stack_updates(self, cnxt, current_stack,
                                template, params, environment_files,
-                               files, args, template_id=None):
+                               files, args, template_id=None,
+                               parsed_template=None):
         """Return the current and updated stack for a given transition.
 
         Changes *will not* be persisted, this is a helper method for
@@ -841,6 +884,7 @@ class EngineService(service.Service):
         :param files: Files referenced from the template
         :param args: Request parameters/args passed from API
         :param template_id: the ID of a pre-stored template in the DB
+        :param parsed_template: the pre-stored template, already parsed
         """
 
         # Now parse the template and any parameters for the updated
@@ -848,7 +892,7 @@ class EngineService(service.Service):
         # any environment provided into the existing one and attempt
         # to use the existing stack template, if one is not provided.
         if args.get(rpc_api.PARAM_EXISTING):
-            assert template_id is None, \
+            assert template_id is None and parsed_template is None, \
                 "Cannot specify template_id with PARAM_EXISTING"
 
             if template is not None:
@@ -896,7 +940,9 @@ class EngineService(service.Service):
             tmpl.env = new_env
 
         else:
-            if template_id is not None:
+            if parsed_template is not None:
+                tmpl = parsed_template
+            elif template_id is not None:
                 tmpl = templatem.Template.load(cnxt, template_id)
             else:
                 tmpl = templatem.Template(template, files=files)
@@ -937,7 +983,8 @@ class EngineService(service.Service):
 
     @context.request_context
     def update_stack(self, cnxt, stack_identity, template, params,
-                     files, args, environment_files=None, template_id=None):
+                     files, args, environment_files=None, template_id=None,
+                     parsed_template=None):
         """Update an existing stack based on the provided template and params.
 
         Note that at this stage the template has already been fetched from the
@@ -953,6 +1000,9 @@ class EngineService(service.Service):
                names included in the files dict
         :type  environment_files: list or None
         :param template_id: the ID of a pre-stored template in the DB
+        :param parsed_template: the pre-stored template, already parsed; only
+                         passed when called in-process by a nested stack
+                         resource
         """
         # Get the database representation of the existing stack
         db_stack = self._get_stack(cnxt, stack_identity)
@@ -974,7 +1024,7 @@ class EngineService(service.Service):
 
         tmpl, current_stack, updated_stack = self._prepare_stack_updates(
             cnxt, current_stack, template, params,
-            environment_files, files, args, template_id)
+            environment_files, files, args, template_id, parsed_template)
 
         if current_stack.convergence:
             current_stack.thread_group_mgr = self.thread_group_mgr
@@ -1343,6 +1393,26 @@ class EngineService(service.Service):
 
         return api.format_stack_output(outputs[output_key])
 
+    @context.request_context
+    def show_outputs(self, cntx, stack_identity, output_keys):
+        """Returns the specified outputs, resolving only those outputs.
+
+        Keys that are not outputs of the stack are ignored.
+
+        :param cntx: RPC context.
+        :param stack_identity: Name of the stack you want to see.
+        :param output_keys: list of keys of the desired stack outputs.
+        :return: list of outputs with key, value and description in defined
+                 format.
+        """
+        s = self._get_stack(cntx, stack_identity)
+        stack = parser.Stack.load(cntx, stack=s)
+
+        outputs = stack.outputs
+
+        return [api.format_stack_output(outputs[key])
+                for key in output_keys if key in outputs]
+
     def _remote_call(self, cnxt, lock_engine_id, timeout, call, **kwargs):
         self.cctxt = self._client.prepare(
             version='1.0',
@@ -1697,32 +1767,22 @@ class EngineService(service.Service):
 
             if nested_depth:
                 root_stack_identifier = st.identifier()
-                # find all resources associated with a root stack
-                all_r = resource_objects.Resource.get_all_by_root_stack(
-                    cnxt, st.id, None)
-
-                # find stacks to the requested nested_depth
-                stack_ids = {r.stack_id for r in six.itervalues(all_r)}
-                stack_filters = {
-                    'id': stack_ids,
-                    'nested_depth': list(range(nested_depth + 1))
-                }
-
-                stacks = stack_object.Stack.get_all(cnxt,
-                                                    filters=stack_filters,
-                                                    show_nested=True)
-                stack_identifiers = {s.id: s.identifier() for s in stacks}
-
-                if filters is None:
-                    filters = {}
-                filters['stack_id'] = list(stack_identifiers.keys())
-                events = list(event_object.Event.get_all_by_tenant(
-                    cnxt, limit=limit,
+                # find events of the stacks nested to the requested depth
+                events = list(event_object.Event.get_all_by_root_stack(
+                    cnxt, st.id,
+                    nested_depth=nested_depth,
+                    limit=limit,
                     marker=marker,
                     sort_keys=sort_keys,
                     sort_dir=sort_dir,
                     filters=filters))
 
+                stack_ids = {e.stack_id for e in events}
+                stacks = stack_object.Stack.get_all(cnxt,
+                                                    filters={'id': stack_ids},
+                                                    show_nested=True)
+                stack_identifiers = {s.id: s.identifier() for s in stacks}
+
             else:
                 events = list(event_object.Event.get_all_by_stack(
                     cnxt,
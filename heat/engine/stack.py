@@ -42,11 +42,13 @@ from heat.common import timeutils
 from heat.engine import dependencies
 from heat.engine import environment
 from heat.engine import event
+from heat.engine import nested_output_cache
 from heat.engine.notification import stack as notification
 from heat.engine import parameter_groups as param_groups
 from heat.engine import resource
 from heat.engine import resources
 from heat.engine import scheduler
+from heat.engine import stack_list_cache
 from heat.engine import sync_point
 from heat.engine import template as tmpl
 from heat.engine import update
@@ -365,7 +367,7 @@ class Stack(collections.Mapping):
         elif template_cache and tid in template_cache:
             t = template_cache[tid]
         else:
-            t = tmpl.Template.load(self.context, tid)
+            t = tmpl.Template.load_cached(self.context, tid)
             if template_cache:
                 template_cache[tid] = t
 
@@ -487,7 +489,7 @@ class Stack(collections.Mapping):
     def load(cls, context, stack_id=None, stack=None, show_deleted=True,
              use_stored_context=False, force_reload=False, cache_data=None,
              service_check_defer=False,
-             resource_validate=True):
+             resource_validate=True, template=None):
         """Retrieve a Stack from the database."""
         if stack is None:
             stack = stack_object.Stack.get_by_id(
@@ -505,7 +507,8 @@ class Stack(collections.Mapping):
                             use_stored_context=use_stored_context,
                             cache_data=cache_data,
                             service_check_defer=service_check_defer,
-                            resource_validate=resource_validate)
+                            resource_validate=resource_validate,
+                            template=template)
 
     @classmethod
     def load_all(cls, context, limit=None, marker=None, sort_keys=None,
@@ -539,9 +542,11 @@ class Stack(collections.Mapping):
     @classmethod
     def _from_db(cls, context, stack,
                  use_stored_context=False, cache_data=None,
-                 service_check_defer=False, resource_validate=True):
-        template = tmpl.Template.load(
-            context, stack.raw_template_id, stack.raw_template)
+                 service_check_defer=False, resource_validate=True,
+                 template=None):
+        if template is None:
+            template = tmpl.Template.load(
+                context, stack.raw_template_id, stack.raw_template)
         return cls(context, stack.name, template,
                    stack_id=stack.id,
                    action=stack.action, status=stack.status,
@@ -665,6 +670,7 @@ class Stack(collections.Mapping):
             stack_tag_object.StackTagList.set(self.context, self.id, self.tags)
 
         self._set_param_stackid()
+        stack_list_cache.invalidate(self.tenant_id)
 
         return self.id
 
@@ -863,6 +869,9 @@ class Stack(collections.Mapping):
                          self.name, 'OS::Heat::Stack')
 
         ev.store()
+        # Stack events mark state transitions, so make sure they (and any
+        # resource events buffered before them) are visible straight away.
+        event.flush_pending()
         self.dispatch_event(ev)
 
     def dispatch_event(self, ev):
@@ -930,11 +939,19 @@ class Stack(collections.Mapping):
                 updated = stack_object.Stack.select_and_update(
                     self.context, self.id, values,
                     exp_trvsl=self.current_traversal)
+                if updated:
+                    self._invalidate_cached_state()
 
                 return updated
 
             else:
                 stack.update_and_save(values)
+                self._invalidate_cached_state()
+
+    def _invalidate_cached_state(self):
+        stack_list_cache.invalidate(self.tenant_id)
+        if self.owner_id is not None:
+            nested_output_cache.invalidate(self.id)
 
     def _send_notification_and_add_event(self):
         notification.send(self)
@@ -959,6 +976,7 @@ class Stack(collections.Mapping):
             self._send_notification_and_add_event()
             stack.persist_state_and_release_lock(self.context, self.id,
                                                  engine_id, values)
+            self._invalidate_cached_state()
 
     @property
     def state(self):
@@ -1007,6 +1025,20 @@ class Stack(collections.Mapping):
 
         return {'resource_data': data['resources'].get(resource.name)}
 
+    def concurrency_limits(self):
+        """Return the limits on resource actions to run at once.
+
+        The result is a dict of keyword arguments for a DependencyTaskGroup
+        whose dependency keys are resources.
+        """
+        def limit_group(res):
+            limit = self.env.get_concurrency_limit(res.type())
+            if limit is not None:
+                return res.type(), limit
+
+        return {'max_running': self.env.get_concurrency_limit(),
+                'limit_group': limit_group}
+
     @scheduler.wrappertask
     def stack_task(self, action, reverse=False, post_func=None,
                    aggregate_exceptions=False, pre_completion_func=None):
@@ -1062,7 +1094,8 @@ class Stack(collections.Mapping):
             resource_action,
             reverse,
             error_wait_time=get_error_wait_time,
-            aggregate_exceptions=aggregate_exceptions)
+            aggregate_exceptions=aggregate_exceptions,
+            **self.concurrency_limits())
 
         try:
             yield action_task()
@@ -1743,9 +1776,9 @@ class Stack(collections.Mapping):
                                'Failed stack pre-ops: %s' % six.text_type(e))
                 return
 
-        action_task = scheduler.DependencyTaskGroup(self.dependencies,
-                                                    resource.Resource.destroy,
-                                                    reverse=True)
+        action_task = scheduler.DependencyTaskGroup(
+            self.dependencies, resource.Resource.destroy, reverse=True,
+            **self.concurrency_limits())
         try:
             scheduler.TaskRunner(action_task)(timeout=self.timeout_secs())
         except exception.ResourceFailure as ex:
@@ -1779,6 +1812,7 @@ class Stack(collections.Mapping):
             except exception.NotFound:
                 LOG.info(_LI("Tried to delete stack that does not exist "
                              "%s "), self.id)
+            stack_list_cache.invalidate(self.tenant_id)
             self.id = None
 
     @profiler.trace('Stack.suspend', hide_args=False)
@@ -2058,6 +2092,7 @@ class Stack(collections.Mapping):
                 stack_object.Stack.delete(self.context, self.id)
             except exception.NotFound:
                 pass
+            stack_list_cache.invalidate(self.tenant_id)
 
     def time_elapsed(self):
         """Time elapsed in seconds since the stack operation started."""
@@ -0,0 +1,91 @@
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Caching of the results of listing and counting stacks.
+
+Results are cached per tenant, keyed by the arguments of the request. Rather
+than finding and deleting every cached result when a stack changes, each
+tenant has a generation stored in the cache that forms part of the keys of
+its results; replacing the generation invalidates all of them at once.
+Requests made with an admin context can see the stacks of every tenant, so
+they use a separate generation that is replaced on any change.
+"""
+
+import hashlib
+
+from oslo_cache import core
+from oslo_config import cfg
+from oslo_serialization import jsonutils
+from oslo_utils import uuidutils
+
+from heat.common import cache
+
+ALL_TENANTS = '*'
+
+_region = cache.get_cache_region()
+
+
+def _enabled():
+    return cfg.CONF.cache.enabled and cfg.CONF.stack_list_cache.caching
+
+
+def _scope(cnxt):
+    return ALL_TENANTS if cnxt.is_admin else cnxt.tenant_id
+
+
+def _generation_key(scope):
+    return 'heat-stack-list-generation:%s' % scope
+
+
+def _generation(scope):
+    key = _generation_key(scope)
+    generation = _region.get(key)
+    if generation is core.NO_VALUE:
+        generation = uuidutils.generate_uuid()
+        _region.set(key, generation)
+    return generation
+
+
+def get_or_create(cnxt, kind, params, creator):
+    """Return a cached result, or create and cache it.
+
+    :param cnxt: the context of the request
+    :param kind: the kind of result, e.g. 'list' or 'count'
+    :param params: a dict of the arguments that determine the result
+    :param creator: a function that returns the result
+    """
+    if not _enabled():
+        return creator()
+
+    scope = _scope(cnxt)
+    args = jsonutils.dumps([kind, _generation(scope), params],
+                           sort_keys=True)
+    key = 'heat-stack-list:%s:%s' % (
+        scope, hashlib.sha1(args.encode('utf-8')).hexdigest())
+
+    result = _region.get(key,
+                         expiration_time=cfg.CONF.stack_list_cache.
+                         expiration_time)
+    if result is core.NO_VALUE:
+        result = creator()
+        _region.set(key, result)
+    return result
+
+
+def invalidate(tenant_id):
+    """Discard the cached results that may include the tenant's stacks."""
+    if not _enabled():
+        return
+
+    for scope in (tenant_id, ALL_TENANTS):
+        _region.set(_generation_key(scope), uuidutils.generate_uuid())
@@ -13,17 +13,21 @@
 # limitations under the License.
 
 import ast
-import eventlet
-import random
-import six
+import base64
+import zlib
 
+from oslo_config import cfg
 from oslo_log import log as logging
+from oslo_serialization import jsonutils
+import six
 
 from heat.common import exception
-from heat.objects import sync_point as sync_point_object
+from heat.engine import sync_point_store
 
 LOG = logging.getLogger(__name__)
 
+cfg.CONF.import_opt('sync_point_compress_threshold', 'heat.common.config')
+
 
 KEY_SEPERATOR = ':'
 
@@ -38,18 +42,16 @@ def make_key(*components):
 
 
 def create(context, entity_id, traversal_id, is_update, stack_id):
-    """Creates a sync point entry in DB."""
-    values = {'entity_id': entity_id, 'traversal_id': traversal_id,
-              'is_update': is_update, 'atomic_key': 0,
-              'stack_id': stack_id, 'input_data': {}}
-    return sync_point_object.SyncPoint.create(context, values)
+    """Creates a sync point entry in the sync point store."""
+    return sync_point_store.get_store().create(context, entity_id,
+                                               traversal_id, is_update,
+                                               stack_id)
 
 
 def get(context, entity_id, traversal_id, is_update):
-    """Retrieves a sync point entry from DB."""
-    sync_point = sync_point_object.SyncPoint.get_by_key(context, entity_id,
-                                                        traversal_id,
-                                                        is_update)
+    """Retrieves a sync point entry from the sync point store."""
+    sync_point = sync_point_store.get_store().get(context, entity_id,
+                                                  traversal_id, is_update)
     if sync_point is None:
         key = (entity_id, traversal_id, is_update)
         raise exception.EntityNotFound(entity='Sync Point', name=key)
@@ -59,19 +61,16 @@ def get(context, entity_id, traversal_id, is_update):
 
 def delete_all(context, stack_id, traversal_id):
     """Deletes all sync points of a stack associated with a traversal_id."""
-    return sync_point_object.SyncPoint.delete_all_by_stack_and_traversal(
-        context, stack_id, traversal_id
-    )
+    return sync_point_store.get_store().delete_all(context, stack_id,
+                                                   traversal_id)
 
 
 def update_input_data(context, entity_id, current_traversal,
                       is_update, atomic_key, input_data):
-    rows_updated = sync_point_object.SyncPoint.update_input_data(
+    return sync_point_store.get_store().update_input_data(
         context, entity_id, current_traversal, is_update, atomic_key,
         input_data)
 
-    return rows_updated
-
 
 def _str_pack_tuple(t):
     return u'tuple:' + str(t)
@@ -104,42 +103,139 @@ def _serialize(d):
     return d2
 
 
+INPUT_DATA_VERSION = 2
+
+
+def _pack_key(key):
+    if isinstance(key, tuple):
+        return list(key)
+    return key
+
+
+def _unpack_key(key):
+    if isinstance(key, list):
+        return tuple(key)
+    return key
+
+
+def _pack_attrs(attrs, names):
+    # Attribute names are stored once in a table shared by all of the
+    # senders' data; each attribute is a [key, value] pair, where the key is
+    # the index of the name, or a list of the index followed by the path for
+    # attributes that were requested with a path.
+    packed = []
+    for key, value in attrs.items():
+        if isinstance(key, tuple):
+            name, path = key[0], list(key[1:])
+        else:
+            name, path = key, None
+        if name not in names:
+            names[name] = len(names)
+        idx = names[name]
+        packed.append([[idx] + path if path is not None else idx, value])
+    return packed
+
+
+def _unpack_attrs(packed, names):
+    attrs = {}
+    for key, value in packed:
+        if isinstance(key, list):
+            key = (names[key[0]],) + tuple(key[1:])
+        else:
+            key = names[key]
+        attrs[key] = value
+    return attrs
+
+
+def _pack_value(value, names):
+    if not isinstance(value, dict):
+        return value
+    attrs = value.get('attrs')
+    if not isinstance(attrs, dict):
+        return _serialize(value)
+    packed = _serialize(dict((k, v) for k, v in value.items()
+                             if k != 'attrs'))
+    packed['attrs'] = _pack_attrs(attrs, names)
+    return packed
+
+
+def _unpack_value(value, names):
+    if not isinstance(value, dict):
+        return value
+    attrs = value.get('attrs')
+    if not isinstance(attrs, list):
+        return _deserialize(value)
+    unpacked = _deserialize(dict((k, v) for k, v in value.items()
+                                 if k != 'attrs'))
+    unpacked['attrs'] = _unpack_attrs(attrs, names)
+    return unpacked
+
+
+def _compress(data):
+    return base64.b64encode(
+        zlib.compress(jsonutils.dumps(data).encode('utf-8'))).decode('ascii')
+
+
+def _decompress(data):
+    return jsonutils.loads(
+        zlib.decompress(base64.b64decode(data)).decode('utf-8'))
+
+
 def deserialize_input_data(db_input_data):
-    db_input_data = db_input_data.get('input_data')
-    if not db_input_data:
-        return {}
+    if db_input_data.get('version') != INPUT_DATA_VERSION:
+        # data stored in the original format, with tuple keys packed into
+        # strings
+        db_input_data = db_input_data.get('input_data')
+        if not db_input_data:
+            return {}
+
+        return dict(_deserialize(db_input_data))
 
-    return dict(_deserialize(db_input_data))
+    if 'zlib' in db_input_data:
+        db_input_data = _decompress(db_input_data['zlib'])
+    names = db_input_data.get('names', [])
+    return dict((_unpack_key(k), _unpack_value(v, names))
+                for k, v in db_input_data.get('input_data', []))
 
 
 def serialize_input_data(input_data):
-    return {'input_data': _serialize(input_data)}
+    names = {}
+    packed = [[_pack_key(k), _pack_value(v, names)]
+              for k, v in input_data.items()]
+    data = {'names': sorted(names, key=names.get),
+            'input_data': packed}
+
+    threshold = cfg.CONF.sync_point_compress_threshold
+    if threshold and len(jsonutils.dumps(data)) > threshold:
+        return {'version': INPUT_DATA_VERSION, 'zlib': _compress(data)}
+
+    data['version'] = INPUT_DATA_VERSION
+    return data
 
 
 def sync(cnxt, entity_id, current_traversal, is_update, propagate,
-         predecessors, new_data):
-    rows_updated = None
-    sync_point = None
-    input_data = None
-    nconflicts = max(0, len(predecessors) - 2)
-    # limit to 10 seconds
-    max_wt = min(nconflicts * 0.01, 10)
-    while not rows_updated:
-        sync_point = get(cnxt, entity_id, current_traversal, is_update)
-        input_data = deserialize_input_data(sync_point.input_data)
-        input_data.update(new_data)
-        rows_updated = update_input_data(
-            cnxt, entity_id, current_traversal, is_update,
-            sync_point.atomic_key, serialize_input_data(input_data))
-        # don't aggressively spin; induce some sleep
-        if not rows_updated:
-            eventlet.sleep(random.uniform(0, max_wt))
+         predecessors, new_data, force=False):
+    store = sync_point_store.get_store()
+    store.add_input_data(cnxt, entity_id, current_traversal, is_update,
+                         serialize_input_data(new_data))
+
+    input_data = {}
+    for data in store.get_all_input_data(cnxt, entity_id, current_traversal,
+                                         is_update):
+        input_data.update(deserialize_input_data(data))
 
     waiting = predecessors - set(input_data)
     key = make_key(entity_id, current_traversal, is_update)
     if waiting:
         LOG.debug('[%s] Waiting %s: Got %s; still need %s',
                   key, entity_id, _dump_list(input_data), _dump_list(waiting))
+    elif (not store.claim(cnxt, entity_id, current_traversal, is_update,
+                          serialize_input_data(input_data)) and not force):
+        # A retrigger forces the propagation, since it resends a sync point
+        # whose first check was dropped while the previous traversal still
+        # held the resource.
+        LOG.debug('[%s] Ready %s: Already propagated by another sender',
+                  key, entity_id)
     else:
         LOG.debug('[%s] Ready %s: Got %s',
                   key, entity_id, _dump_list(input_data))
@@ -0,0 +1,241 @@
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Storage drivers for convergence sync points."""
+
+import abc
+
+from oslo_config import cfg
+from oslo_db import exception as db_exception
+import six
+from stevedore import driver
+
+from heat.common import exception
+from heat.common.i18n import _
+from heat.common import service_utils
+from heat.objects import service as service_objects
+from heat.objects import sync_point as sync_point_object
+
+cfg.CONF.import_opt('sync_point_store', 'heat.common.config')
+cfg.CONF.import_opt('num_engine_workers', 'heat.common.config')
+
+
+@six.add_metaclass(abc.ABCMeta)
+class SyncPointStore(object):
+    """Base class for sync point storage drivers.
+
+    A sync point is identified by (entity_id, traversal_id, is_update). Each
+    predecessor of the sync point adds its input data, and once all of them
+    have done so exactly one caller is allowed to claim the sync point and
+    propagate the merged data. Input data is passed to and returned from the
+    driver in its serialised form.
+    """
+
+    # Whether the sync points are visible to every heat-engine process. A
+    # driver that is not shared can only be used by a single engine worker.
+    shared = True
+
+    @abc.abstractmethod
+    def create(self, context, entity_id, traversal_id, is_update, stack_id):
+        """Create a sync point with no input data."""
+        pass
+
+    @abc.abstractmethod
+    def get(self, context, entity_id, traversal_id, is_update):
+        """Return a sync point, or None if it does not exist."""
+        pass
+
+    @abc.abstractmethod
+    def update_input_data(self, context, entity_id, traversal_id, is_update,
+                          atomic_key, input_data):
+        """Store the input data of a sync point if its key is unchanged.
+
+        The update only succeeds if the atomic_key of the sync point matches
+        the one given, and the key is incremented when it does. Returns the
+        number of sync points updated.
+        """
+        pass
+
+    @abc.abstractmethod
+    def add_input_data(self, context, entity_id, traversal_id, is_update,
+                       input_data):
+        """Atomically add input data from one predecessor to a sync point.
+
+        Raises EntityNotFound if the sync point does not exist.
+        """
+        pass
+
+    @abc.abstractmethod
+    def get_all_input_data(self, context, entity_id, traversal_id,
+                           is_update):
+        """Return a list of all input data added to a sync point."""
+        pass
+
+    def claim(self, context, entity_id, traversal_id, is_update, input_data):
+        """Mark a sync point as complete, storing the merged input data.
+
+        This is a compare-and-swap operation; it returns True for only the
+        first caller, and False for any later caller or if the sync point
+        does not exist.
+        """
+        # The sync point starts with an atomic_key of 0 and is only updated
+        # when it is claimed, so exactly one claim can succeed.
+        return bool(self.update_input_data(context, entity_id, traversal_id,
+                                           is_update, 0, input_data))
+
+    @abc.abstractmethod
+    def delete_all(self, context, stack_id, traversal_id):
+        """Delete all sync points of a stack for the given traversal."""
+        pass
+
+
+class SQLSyncPointStore(SyncPointStore):
+    """Store sync points in the Heat database."""
+
+    def create(self, context, entity_id, traversal_id, is_update, stack_id):
+        values = {'entity_id': entity_id, 'traversal_id': traversal_id,
+                  'is_update': is_update, 'atomic_key': 0,
+                  'stack_id': stack_id, 'input_data': {}}
+        return sync_point_object.SyncPoint.create(context, values)
+
+    def get(self, context, entity_id, traversal_id, is_update):
+        return sync_point_object.SyncPoint.get_by_key(context, entity_id,
+                                                      traversal_id, is_update)
+
+    def update_input_data(self, context, entity_id, traversal_id, is_update,
+                          atomic_key, input_data):
+        return sync_point_object.SyncPoint.update_input_data(
+            context, entity_id, traversal_id, is_update, atomic_key,
+            input_data)
+
+    def add_input_data(self, context, entity_id, traversal_id, is_update,
+                       input_data):
+        try:
+            sync_point_object.SyncPoint.add_input_data(
+                context, entity_id, traversal_id, is_update, input_data)
+        except db_exception.DBReferenceError:
+            key = (entity_id, traversal_id, is_update)
+            raise exception.EntityNotFound(entity='Sync Point', name=key)
+
+    def get_all_input_data(self, context, entity_id, traversal_id,
+                           is_update):
+        return sync_point_object.SyncPoint.get_all_input_data(
+            context, entity_id, traversal_id, is_update)
+
+    def delete_all(self, context, stack_id, traversal_id):
+        return sync_point_object.SyncPoint.delete_all_by_stack_and_traversal(
+            context, stack_id, traversal_id)
+
+
+class MemorySyncPointStore(SyncPointStore):
+    """Store sync points in the memory of the engine process.
+
+    The sync points are not shared with other processes, so this driver can
+    only be used when a single heat-engine worker is running on a single
+    host, such as in development and test environments.
+    """
+
+    shared = False
+
+    def __init__(self):
+        self._sync_points = {}
+
+    @staticmethod
+    def _key(entity_id, traversal_id, is_update):
+        return str(entity_id), traversal_id, bool(is_update)
+
+    def create(self, context, entity_id, traversal_id, is_update, stack_id):
+        key = self._key(entity_id, traversal_id, is_update)
+        sync_point = sync_point_object.SyncPoint(
+            context, entity_id=key[0], traversal_id=traversal_id,
+            is_update=key[2], atomic_key=0, stack_id=stack_id,
+            input_data={})
+        self._sync_points[key] = (sync_point, [])
+        return sync_point
+
+    def get(self, context, entity_id, traversal_id, is_update):
+        key = self._key(entity_id, traversal_id, is_update)
+        sync_point, inputs = self._sync_points.get(key, (None, None))
+        return sync_point
+
+    def update_input_data(self, context, entity_id, traversal_id, is_update,
+                          atomic_key, input_data):
+        sync_point = self.get(context, entity_id, traversal_id, is_update)
+        if sync_point is None or sync_point.atomic_key != atomic_key:
+            return 0
+        sync_point.atomic_key = atomic_key + 1
+        sync_point.input_data = input_data
+        return 1
+
+    def add_input_data(self, context, entity_id, traversal_id, is_update,
+                       input_data):
+        key = self._key(entity_id, traversal_id, is_update)
+        try:
+            self._sync_points[key][1].append(input_data)
+        except KeyError:
+            raise exception.EntityNotFound(entity='Sync Point', name=key)
+
+    def get_all_input_data(self, context, entity_id, traversal_id,
+                           is_update):
+        key = self._key(entity_id, traversal_id, is_update)
+        sync_point, inputs = self._sync_points.get(key, (None, []))
+        return list(inputs)
+
+    def delete_all(self, context, stack_id, traversal_id):
+        keys = [k for k, (sp, inputs) in six.iteritems(self._sync_points)
+                if k[1] == traversal_id and sp.stack_id == stack_id]
+        for k in keys:
+            del self._sync_points[k]
+        return len(keys)
+
+
+_store = None
+
+
+def get_store():
+    """Return the configured sync point storage driver."""
+    global _store
+
+    if _store is None:
+        mgr = driver.DriverManager('heat.sync_point_stores',
+                                   cfg.CONF.sync_point_store,
+                                   invoke_on_load=True)
+        if not mgr.driver.shared and cfg.CONF.num_engine_workers != 1:
+            raise exception.Error(_('The "%s" sync point store can only be '
+                                    'used when num_engine_workers is '
+                                    '1.') % cfg.CONF.sync_point_store)
+        _store = mgr.driver
+    return _store
+
+
+def check_deployment(context, host):
+    """Check that the configured driver can be used by this engine.
+
+    A driver that is not shared between processes can't coordinate the
+    traversals of engines running on other hosts, so the engine refuses to
+    start while any of them are up.
+    """
+    if get_store().shared:
+        return
+
+    for srv in service_objects.Service.get_all(context):
+        service = service_utils.format_service(srv)
+        if (service['binary'] == 'heat-engine' and service['host'] != host and
+                service['status'] == 'up'):
+            raise exception.Error(_('The "%(store)s" sync point store can '
+                                    'only be used by a single heat-engine, '
+                                    'but an engine is running on host '
+                                    '%(host)s.') % {
+                'store': cfg.CONF.sync_point_store,
+                'host': service['host']})
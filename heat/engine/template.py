@@ -18,6 +18,8 @@ import functools
 import hashlib
 import warnings
 
+from oslo_config import cfg
+from oslo_serialization import jsonutils
 import six
 from stevedore import extension
 
@@ -30,6 +32,8 @@ from heat.engine import output
 from heat.engine import template_files
 from heat.objects import raw_template as template_object
 
+cfg.CONF.import_opt('template_cache_max_size', 'heat.common.config')
+
 __all__ = ['Template']
 
 
@@ -91,6 +95,91 @@ def get_template_class(template_data):
         raise exception.InvalidTemplateVersion(explanation=explanation)
 
 
+class TemplateCache(object):
+    """A bounded LRU cache of parsed templates, keyed by template ID.
+
+    Entries are evicted in least-recently-used order once the approximate
+    size of the cached template data exceeds max_size bytes. Templates
+    returned from the cache are shared between callers and must be treated
+    as read-only.
+    """
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = collections.OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, template_id):
+        return template_id in self._entries
+
+    def get(self, template_id):
+        try:
+            tmpl, size = self._entries.pop(template_id)
+        except KeyError:
+            self.misses += 1
+            return None
+        self._entries[template_id] = (tmpl, size)
+        self.hits += 1
+        return tmpl
+
+    def put(self, template_id, tmpl, size):
+        self.invalidate(template_id)
+        if size > self.max_size:
+            return
+        self._entries[template_id] = (tmpl, size)
+        self.size += size
+        while self.size > self.max_size:
+            old_tmpl, old_size = self._entries.popitem(last=False)[1]
+            self.size -= old_size
+            self.evictions += 1
+
+    def invalidate(self, template_id):
+        entry = self._entries.pop(template_id, None)
+        if entry is not None:
+            self.size -= entry[1]
+
+    def clear(self):
+        self._entries.clear()
+        self.size = 0
+
+    def stats(self):
+        return {'entries': len(self._entries),
+                'size': self.size,
+                'max_size': self.max_size,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions}
+
+
+_template_cache = None
+
+
+def get_template_cache():
+    """Return the engine-wide cache of parsed templates."""
+    global _template_cache
+
+    max_size = cfg.CONF.template_cache_max_size
+    if _template_cache is None:
+        _template_cache = TemplateCache(max_size)
+    elif _template_cache.max_size != max_size:
+        _template_cache.max_size = max_size
+        _template_cache.clear()
+    return _template_cache
+
+
+def _raw_template_size(t):
+    # An approximation of the memory held by a parsed template, based on the
+    # size of its serialised form.
+    return (len(jsonutils.dumps(t.template)) +
+            len(jsonutils.dumps(t.environment or {})))
+
+
 class Template(collections.Mapping):
     """Abstract base class for template format plugins.
 
@@ -161,6 +250,25 @@ class Template(collections.Mapping):
         return cls(t.template, template_id=template_id, env=env,
                    files=t_files)
 
+    @classmethod
+    def load_cached(cls, context, template_id):
+        """Retrieve a Template with the given ID, using the template cache.
+
+        The returned Template may be shared with other callers, so it must not
+        be modified. Use load() to obtain a Template that can be changed and
+        stored.
+        """
+        cache = get_template_cache()
+        if not cache.max_size:
+            return cls.load(context, template_id)
+
+        tmpl = cache.get(template_id)
+        if tmpl is None:
+            t = template_object.RawTemplate.get_by_id(context, template_id)
+            tmpl = cls.load(context, template_id, t)
+            cache.put(template_id, tmpl, _raw_template_size(t))
+        return tmpl
+
     def store(self, context):
         """Store the Template in the database and return its ID."""
         rt = {
@@ -173,6 +281,8 @@ class Template(collections.Mapping):
             self.id = new_rt.id
         else:
             template_object.RawTemplate.update_by_id(context, self.id, rt)
+            if _template_cache is not None:
+                _template_cache.invalidate(self.id)
         return self.id
 
     @property
@@ -306,6 +416,14 @@ class Template(collections.Mapping):
         """
         pass
 
+    def resources_changed(self):
+        """Note that the resources section of the template was modified.
+
+        This must be called after editing the resources section in place, so
+        that any definitions cached from it are discarded.
+        """
+        pass
+
     def remove_resource(self, name):
         """Remove a resource from the template."""
         self.t.get(self.RESOURCES, {}).pop(name)
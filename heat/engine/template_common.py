@@ -11,6 +11,7 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import abc
 import collections
 import functools
 import weakref
@@ -36,6 +37,8 @@ class CommonTemplate(template.Template):
         super(CommonTemplate, self).__init__(template, template_id=template_id,
                                              files=files, env=env)
         self._conditions_cache = None, None
+        self._resources_version = 0
+        self._resource_defns_cache = None, None, None, None, None
 
     @classmethod
     def _parse_resource_field(cls, key, valid_types, typename,
@@ -153,6 +156,58 @@ class CommonTemplate(template.Template):
         self._conditions_cache = get_cache_stack, conds
         return conds
 
+    def resource_definitions(self, stack):
+        """Return a dictionary of ResourceDefinition objects.
+
+        The definitions are parsed once and reused for subsequent calls with
+        the same stack, as long as the stack's parameters and the resolved
+        conditions are unchanged and the resources have not been modified
+        through add_resource(), remove_resource() or merge_snippets(). Code
+        that edits the resources section in place must call
+        resources_changed() afterwards.
+        """
+        conds = self.conditions(stack)
+
+        (get_cache_stack, cached_params, cached_conds,
+         cached_version, cached_defns) = self._resource_defns_cache
+        if (cached_defns is not None and
+                get_cache_stack is not None and
+                get_cache_stack() is stack and
+                cached_params is getattr(stack, 'parameters', None) and
+                cached_conds is conds and
+                cached_version == self._resources_version):
+            return dict(cached_defns)
+
+        defns = self._parse_resource_definitions(stack, conds)
+
+        if stack is not None:
+            self._resource_defns_cache = (weakref.ref(stack),
+                                          getattr(stack, 'parameters', None),
+                                          conds,
+                                          self._resources_version,
+                                          defns)
+        return dict(defns)
+
+    @abc.abstractmethod
+    def _parse_resource_definitions(self, stack, conditions):
+        """Parse the resources section into ResourceDefinition objects."""
+        pass
+
+    def resources_changed(self):
+        self._resources_version += 1
+
+    def remove_resource(self, name):
+        super(CommonTemplate, self).remove_resource(name)
+        self.resources_changed()
+
+    def remove_all_resources(self):
+        super(CommonTemplate, self).remove_all_resources()
+        self.resources_changed()
+
+    def merge_snippets(self, other):
+        super(CommonTemplate, self).merge_snippets(other)
+        self.resources_changed()
+
     def outputs(self, stack):
         conds = self.conditions(stack)
 
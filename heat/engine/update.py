@@ -62,7 +62,8 @@ class StackUpdate(object):
         updater = scheduler.DependencyTaskGroup(
             self.dependencies(),
             self._resource_update,
-            error_wait_time=get_error_wait_time)
+            error_wait_time=get_error_wait_time,
+            **self.new_stack.concurrency_limits())
 
         if not self.rollback:
             yield cleanup_prev()
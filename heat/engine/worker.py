@@ -28,6 +28,7 @@ from heat.common.i18n import _LW
 from heat.common import messaging as rpc_messaging
 from heat.db import api as db_api
 from heat.engine import check_resource
+from heat.engine import operation_scheduler
 from heat.engine import stack as parser
 from heat.engine import sync_point
 from heat.objects import stack as stack_objects
@@ -170,6 +171,7 @@ class WorkerService(service.Service):
             return
 
         msg_queue = eventlet.queue.LightQueue()
+        queued = False
         try:
             self.thread_group_mgr.add_msg_queue(stack.id, msg_queue)
             if current_traversal != stack.current_traversal:
@@ -181,11 +183,28 @@ class WorkerService(service.Service):
                                                   self._rpc_client,
                                                   self.thread_group_mgr,
                                                   msg_queue)
-                cr.check(cnxt, resource_id, current_traversal, resource_data,
-                         is_update, adopt_stack_data, rsrc, stack)
+                args = (cnxt, resource_id, current_traversal, resource_data,
+                        is_update, adopt_stack_data, rsrc, stack)
+                scheduler = operation_scheduler.get_scheduler()
+                if stack.owner_id is None and scheduler.max_running > 0:
+                    # Wait for a place in the queue in a separate thread, so
+                    # that the RPC dispatcher is free to process the checks
+                    # of nested stacks, which are needed to free places.
+                    # Nested stacks are not queued, as the resources of their
+                    # parent stacks are holding a place while waiting for
+                    # them.
+                    check = scheduler.wrap(cnxt.tenant_id, stack.id,
+                                           cr.check)
+                    th = self.thread_group_mgr.start(stack.id, check, *args)
+                    th.link(self.thread_group_mgr.remove_msg_queue,
+                            stack.id, msg_queue)
+                    queued = True
+                else:
+                    cr.check(*args)
         finally:
-            self.thread_group_mgr.remove_msg_queue(None,
-                                                   stack.id, msg_queue)
+            if not queued:
+                self.thread_group_mgr.remove_msg_queue(None,
+                                                       stack.id, msg_queue)
 
     @context.request_context
     def cancel_check_resource(self, cnxt, stack_id):
@@ -170,6 +170,11 @@ class Resource(
         ]
         return dict(resources)
 
+    @classmethod
+    def get_summaries_by_stack(cls, context, stack_id):
+        """Return the id, name, state and physical ID of each resource."""
+        return db_api.resource_get_summaries_by_stack(context, stack_id)
+
     @classmethod
     def get_all_active_by_stack(cls, context, stack_id):
         resources_db = db_api.resource_get_all_active_by_stack(context,
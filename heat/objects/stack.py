@@ -62,6 +62,15 @@ class Stack(
         'parent_resource_name': fields.StringField(nullable=True),
     }
 
+    # The fields needed to summarise a stack in a stack listing.
+    SUMMARY_FIELDS = (
+        'id', 'name', 'tenant', 'username', 'owner_id',
+        'stack_user_project_id', 'action', 'status', 'status_reason',
+        'created_at', 'updated_at', 'deleted_at',
+    )
+
+    _summary_tags = None
+
     @staticmethod
     def _from_db_object(context, stack, db_stack):
         for field in stack.fields:
@@ -114,7 +123,13 @@ class Stack(
                 sort_dir=None, filters=None,
                 show_deleted=False, show_nested=False, show_hidden=False,
                 tags=None, tags_any=None, not_tags=None,
-                not_tags_any=None, eager_load=False):
+                not_tags_any=None, eager_load=False, summary=False):
+        """Return the stacks matching the given filters.
+
+        If summary is True, only the SUMMARY_FIELDS of each stack are fetched
+        from the database and set in the returned objects, along with the
+        stack's tags; the template is not loaded.
+        """
         db_stacks = db_api.stack_get_all(
             context,
             limit=limit,
@@ -129,13 +144,27 @@ class Stack(
             tags_any=tags_any,
             not_tags=not_tags,
             not_tags_any=not_tags_any,
-            eager_load=eager_load)
+            eager_load=eager_load,
+            columns=cls.SUMMARY_FIELDS if summary else None)
         for db_stack in db_stacks:
+            if summary:
+                yield cls._summary_from_db_object(context, db_stack)
+                continue
             try:
                 yield cls._from_db_object(context, cls(context), db_stack)
             except exception.NotFound:
                 pass
 
+    @classmethod
+    def _summary_from_db_object(cls, context, db_stack):
+        stack = cls(context)
+        for field in cls.SUMMARY_FIELDS:
+            stack[field] = getattr(db_stack, field)
+        stack._summary_tags = list(db_stack.tags)
+        stack._context = context
+        stack.obj_reset_changes()
+        return stack
+
     @classmethod
     def get_all_by_owner_id(cls, context, owner_id):
         db_stacks = db_api.stack_get_all_by_owner_id(context, owner_id)
@@ -246,4 +275,6 @@ class Stack(
 
     @property
     def tags(self):
+        if self._summary_tags is not None:
+            return self._summary_tags
         return stack_tag.StackTagList.get(self._context, self.id)
@@ -83,6 +83,29 @@ class SyncPoint(
             atomic_key,
             input_data)
 
+    @classmethod
+    def add_input_data(cls,
+                       context,
+                       entity_id,
+                       traversal_id,
+                       is_update,
+                       input_data):
+        values = {'entity_id': entity_id, 'traversal_id': traversal_id,
+                  'is_update': is_update, 'input_data': input_data}
+        db_api.sync_point_input_create(context, values)
+
+    @classmethod
+    def get_all_input_data(cls,
+                           context,
+                           entity_id,
+                           traversal_id,
+                           is_update):
+        return db_api.sync_point_input_get_all(
+            context,
+            entity_id,
+            traversal_id,
+            is_update)
+
     @classmethod
     def delete_all_by_stack_and_traversal(cls,
                                           context,
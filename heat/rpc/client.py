@@ -58,6 +58,7 @@ class EngineClient(object):
                and list_software_configs
         1.34 - Add migrate_convergence_1 call
         1.35 - Add with_condition to list_template_functions
+        1.36 - Add show_outputs call
     """
 
     BASE_RPC_API_VERSION = '1.0'
@@ -842,6 +843,12 @@ class EngineClient(object):
                                              output_key=output_key),
                          version='1.19')
 
+    def show_outputs(self, cntx, stack_identity, output_keys):
+        return self.call(cntx, self.make_msg('show_outputs',
+                                             stack_identity=stack_identity,
+                                             output_keys=output_keys),
+                         version='1.36')
+
     def export_stack(self, ctxt, stack_identity):
         """Exports the stack data in JSON format.
 
@@ -24,6 +24,7 @@ from heat.common import context
 from heat.common import exception as heat_exc
 from heat.common import identifier
 from heat.common import policy
+from heat.common import serializers
 from heat.common import template_format
 from heat.common import urlfetch
 from heat.rpc import api as rpc_api
@@ -450,6 +451,30 @@ class StackControllerTest(tools.ControllerTest, common.HeatTestCase):
         result = self.controller.index(req, tenant_id=self.tenant)
         self.assertNotIn('count', result)
 
+    def test_index_paged(self, mock_enforce):
+        self._mock_enforce_setup(mock_enforce, 'index', True)
+        cfg.CONF.set_override('api_list_page_size', 2, enforce_type=True)
+        identities = [identifier.HeatIdentifier(self.tenant, 's%d' % i,
+                                                str(i))
+                      for i in range(3)]
+        engine_resp = [{u'stack_identity': dict(identity),
+                        u'stack_name': identity.stack_name}
+                       for identity in identities]
+        req = self._get('/stacks')
+        rpc_client = self.controller.rpc_client
+        rpc_client.list_stacks = mock.Mock(side_effect=[engine_resp[:2],
+                                                        engine_resp[2:]])
+
+        result = self.controller.index(req, tenant_id=self.tenant)
+        self.assertIsInstance(result['stacks'], serializers.StreamedList)
+        self.assertEqual(['0', '1', '2'],
+                         [s['id'] for s in result['stacks']])
+        self.assertEqual([mock.call(mock.ANY, filters=None,
+                                    limit=2, marker=None),
+                          mock.call(mock.ANY, filters=None,
+                                    limit=2, marker='1')],
+                         rpc_client.list_stacks.call_args_list)
+
     def test_index_enforces_global_index_if_global_tenant(self, mock_enforce):
         params = {'global_tenant': 'True'}
         req = self._get('/stacks', params=params)
@@ -12,11 +12,13 @@
 #    under the License.
 
 import mock
+from oslo_config import cfg
 from webob import exc
 
 from heat.api.openstack.v1 import util
 from heat.common import context
 from heat.common import policy
+from heat.common import serializers
 from heat.common import wsgi
 from heat.tests import common
 
@@ -129,3 +131,44 @@ class TestPolicyEnforce(common.HeatTestCase):
         self.assertRaises(exc.HTTPForbidden,
                           self.controller.an_action,
                           self.req, tenant_id='foo')
+
+
+class TestPagedList(common.HeatTestCase):
+    def setUp(self):
+        super(TestPagedList, self).setUp()
+        self.items = [{'id': i} for i in range(5)]
+
+        def fetch(limit, marker):
+            start = 0 if marker is None else marker + 1
+            if limit is None:
+                return self.items[start:]
+            return self.items[start:start + limit]
+
+        self.fetch = mock.Mock(side_effect=fetch)
+
+    def test_disabled(self):
+        result = util.paged_list(self.fetch, lambda i: i['id'])
+        self.assertEqual(self.items, result)
+        self.fetch.assert_called_once_with(limit=None, marker=None)
+
+    def test_paged(self):
+        cfg.CONF.set_override('api_list_page_size', 2, enforce_type=True)
+        result = util.paged_list(self.fetch, lambda i: i['id'])
+        self.assertIsInstance(result, serializers.StreamedList)
+        # the first page is retrieved before the result is iterated
+        self.fetch.assert_called_once_with(limit=2, marker=None)
+
+        self.assertEqual(self.items, list(result))
+        self.assertEqual([mock.call(limit=2, marker=None),
+                          mock.call(limit=2, marker=1),
+                          mock.call(limit=2, marker=3)],
+                         self.fetch.call_args_list)
+
+    def test_paged_from_marker(self):
+        cfg.CONF.set_override('api_list_page_size', 2, enforce_type=True)
+        result = util.paged_list(self.fetch, lambda i: i['id'], marker=0)
+        self.assertEqual(self.items[1:], list(result))
+        self.assertEqual([mock.call(limit=2, marker=0),
+                          mock.call(limit=2, marker=2),
+                          mock.call(limit=2, marker=4)],
+                         self.fetch.call_args_list)
@@ -413,12 +413,11 @@ class HeatScalingGroupAttrTest(common.HeatTestCase):
 
     def test_output_refs_map(self):
         # Setup
-        mock_members = self.patchobject(grouputils, 'get_members')
-        members = [mock.MagicMock(), mock.MagicMock()]
-        members[0].name = 'resource-1-name'
-        members[0].resource_id = 'resource-1-id'
-        members[1].name = 'resource-2-name'
-        members[1].resource_id = 'resource-2-id'
+        mock_members = self.patchobject(grouputils, 'get_member_view')
+        members = [grouputils.Member('resource-1-name', 'COMPLETE', None,
+                                     'resource-1-id'),
+                   grouputils.Member('resource-2-name', 'COMPLETE', None,
+                                     'resource-2-id')]
         mock_members.return_value = members
 
         # Test
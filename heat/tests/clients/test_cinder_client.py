@@ -12,11 +12,14 @@
 #    under the License.
 """Tests for :module:'heat.engine.clients.os.cinder'."""
 
+import datetime
 import uuid
 
 from cinderclient import exceptions as cinder_exc
 from keystoneauth1 import exceptions as ks_exceptions
 import mock
+from oslo_config import cfg
+from oslo_utils import timeutils
 
 from heat.common import exception
 from heat.engine.clients.os import cinder
@@ -56,6 +59,124 @@ class CinderClientPluginTest(common.HeatTestCase):
             snapshot_id)
 
 
+class CinderClientPluginFetchVolumeTest(CinderClientPluginTest):
+    """Tests for the batched volume status checks."""
+
+    vol_ids = ('vol1', 'vol2', 'vol3')
+
+    def setUp(self):
+        super(CinderClientPluginFetchVolumeTest, self).setUp()
+        self.patchobject(cinder, '_volume_pollers', new={})
+        self.volumes = [self._volume(vol_id) for vol_id in self.vol_ids]
+        self.cinder_client.volumes.list.side_effect = (
+            lambda marker=None: [] if marker else self.volumes)
+        self.cinder_client.volumes.get.side_effect = (
+            lambda vol_id: self.volumes[self.vol_ids.index(vol_id)])
+
+    @staticmethod
+    def _volume(vol_id, status='creating'):
+        vol = mock.Mock(status=status)
+        vol.id = vol_id
+        return vol
+
+    def _fetch_after(self, seconds, vol_ids=vol_ids):
+        now = timeutils.utcnow()
+        with mock.patch.object(timeutils, 'utcnow',
+                               return_value=now +
+                               datetime.timedelta(seconds=seconds)):
+            return [self.cinder_plugin.fetch_volume(vol_id)
+                    for vol_id in vol_ids]
+
+    def test_fetch_volume_disabled(self):
+        self._fetch_after(0)
+        self.assertEqual(3, self.cinder_client.volumes.get.call_count)
+        self.assertFalse(self.cinder_client.volumes.list.called)
+
+    def test_fetch_volume_batched(self):
+        cfg.CONF.set_override('volume_status_poll_interval', 5,
+                              enforce_type=True)
+        self.assertEqual(self.volumes, self._fetch_after(0))
+        self.assertEqual(self.volumes, self._fetch_after(1))
+        self.assertEqual(3, self.cinder_client.volumes.get.call_count)
+        self.assertFalse(self.cinder_client.volumes.list.called)
+
+        self.assertEqual(self.volumes, self._fetch_after(10))
+        # the list is paged until a page comes back empty
+        self.cinder_client.volumes.list.assert_has_calls(
+            [mock.call(marker=None), mock.call(marker='vol3')])
+        self.assertEqual(2, self.cinder_client.volumes.list.call_count)
+        self.assertEqual(3, self.cinder_client.volumes.get.call_count)
+
+        self._fetch_after(20)
+        self.assertEqual(4, self.cinder_client.volumes.list.call_count)
+
+    def test_fetch_volume_few_not_listed(self):
+        cfg.CONF.set_override('volume_status_poll_interval', 5,
+                              enforce_type=True)
+        # listing the project is not cheaper than fetching a single volume
+        self._fetch_after(0, ('vol1',))
+        self._fetch_after(10, ('vol1',))
+        self.assertEqual(2, self.cinder_client.volumes.get.call_count)
+        self.assertFalse(self.cinder_client.volumes.list.called)
+
+    def test_fetch_volume_settled(self):
+        cfg.CONF.set_override('volume_status_poll_interval', 5,
+                              enforce_type=True)
+        self.volumes[0].status = 'available'
+        self._fetch_after(0, ('vol1', 'vol1'))
+        self.assertEqual(2, self.cinder_client.volumes.get.call_count)
+        # the poller is dropped once it has no volumes to wait on
+        self.assertEqual({}, cinder._volume_pollers)
+
+    def test_fetch_volume_expired(self):
+        cfg.CONF.set_override('volume_status_poll_interval', 5,
+                              enforce_type=True)
+        self._fetch_after(0)
+        extended = self._volume('vol1', 'extending')
+        self.cinder_client.volumes.get.reset_mock()
+        self.cinder_client.volumes.get.side_effect = None
+        self.cinder_client.volumes.get.return_value = extended
+
+        # after an action, the volume is fetched rather than reported with
+        # its status from before the action
+        self.cinder_plugin.expire_volume('vol1')
+        self.assertEqual([extended] + self.volumes[1:], self._fetch_after(1))
+        self.cinder_client.volumes.get.assert_called_once_with('vol1')
+
+    def test_fetch_volume_listed_settled(self):
+        cfg.CONF.set_override('volume_status_poll_interval', 5,
+                              enforce_type=True)
+        self._fetch_after(0)
+        current = self._volume('vol1', 'extending')
+        self.volumes[0] = self._volume('vol1', 'available')
+        self.cinder_client.volumes.get.side_effect = None
+        self.cinder_client.volumes.get.return_value = current
+
+        # a settled status in the list, which may predate an action, is
+        # never reported
+        self.assertEqual([current] + self.volumes[1:], self._fetch_after(10))
+        self.assertTrue(self.cinder_client.volumes.list.called)
+
+    def test_fetch_volume_not_listed(self):
+        cfg.CONF.set_override('volume_status_poll_interval', 5,
+                              enforce_type=True)
+        new_vol = self._volume('vol4')
+        self.cinder_client.volumes.get.side_effect = None
+        self.cinder_client.volumes.get.return_value = new_vol
+        self.assertEqual([new_vol, new_vol],
+                         self._fetch_after(0, ('vol4', 'vol4')))
+        self.cinder_client.volumes.get.assert_called_once_with('vol4')
+
+    def test_fetch_volume_deleted(self):
+        cfg.CONF.set_override('volume_status_poll_interval', 5,
+                              enforce_type=True)
+        self.cinder_client.volumes.list.side_effect = None
+        self.cinder_client.volumes.list.return_value = []
+        self.cinder_client.volumes.get.side_effect = cinder_exc.NotFound(404)
+        self.assertTrue(self.cinder_plugin.check_detach_volume_complete(
+            'vol1'))
+
+
 class VolumeConstraintTest(common.HeatTestCase):
 
     def setUp(self):
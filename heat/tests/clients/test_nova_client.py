@@ -13,6 +13,7 @@
 """Tests for :module:'heat.engine.clients.os.nova'."""
 
 import collections
+import datetime
 import uuid
 
 import mock
@@ -21,6 +22,7 @@ from novaclient import exceptions as nova_exceptions
 from oslo_config import cfg
 from oslo_serialization import jsonutils as json
 from oslo_utils import encodeutils
+from oslo_utils import timeutils
 import requests
 import six
 
@@ -328,6 +330,115 @@ class NovaClientPluginFetchServerTest(NovaClientPluginTestCase):
         self.nova_client.servers.get.assert_called_once_with(self.server.id)
 
 
+class NovaClientPluginServerPollerTest(NovaClientPluginTestCase):
+
+    def setUp(self):
+        super(NovaClientPluginServerPollerTest, self).setUp()
+        self.patchobject(nova, '_server_pollers', new={})
+        self.servers = {}
+        for server_id in ('1234', '5678'):
+            server = mock.Mock()
+            server.id = server_id
+            server.status = 'BUILD'
+            self.servers[server_id] = server
+        self.nova_client.servers.get.side_effect = (
+            lambda server_id: self.servers[server_id])
+        self.nova_client.servers.list.return_value = []
+
+    def _poll_after(self, seconds):
+        now = timeutils.utcnow()
+        with mock.patch.object(timeutils, 'utcnow',
+                               return_value=now +
+                               datetime.timedelta(seconds=seconds)):
+            return [self.nova_plugin.fetch_server(server_id)
+                    for server_id in sorted(self.servers)]
+
+    def test_disabled(self):
+        self.assertIsNone(self.nova_plugin._server_poller())
+        self.nova_plugin.fetch_server('1234')
+        self.nova_plugin.fetch_server('1234')
+        self.assertEqual(2, self.nova_client.servers.get.call_count)
+        self.assertFalse(self.nova_client.servers.list.called)
+
+    def test_shared_by_project(self):
+        cfg.CONF.set_override('server_status_poll_interval', 5,
+                              enforce_type=True)
+        poller = self.nova_plugin._server_poller()
+        other_plugin = utils.dummy_context().clients.client_plugin('nova')
+        self.assertIs(poller, other_plugin._server_poller())
+        other_tenant = utils.dummy_context(tenant_id='other')
+        self.assertIsNot(poller,
+                         other_tenant.clients.client_plugin(
+                             'nova')._server_poller())
+
+    def test_bulk_poll(self):
+        cfg.CONF.set_override('server_status_poll_interval', 5,
+                              enforce_type=True)
+        # servers are fetched individually when first seen
+        self.assertEqual([self.servers['1234'], self.servers['5678']],
+                         self._poll_after(0))
+        self.assertEqual(2, self.nova_client.servers.get.call_count)
+
+        # within the interval, the previous results are reused
+        self._poll_after(1)
+        self.assertEqual(2, self.nova_client.servers.get.call_count)
+        self.assertFalse(self.nova_client.servers.list.called)
+
+        # after the interval, only the changed servers are listed, a page
+        # at a time
+        deleting = mock.Mock()
+        deleting.id = '1234'
+        deleting.status = 'ACTIVE'
+        setattr(deleting, 'OS-EXT-STS:task_state', 'deleting')
+        self.nova_client.servers.list.side_effect = [[deleting], []]
+        self.assertEqual([deleting, self.servers['5678']],
+                         self._poll_after(10))
+        self.assertEqual(2, self.nova_client.servers.get.call_count)
+        self.assertEqual(2, self.nova_client.servers.list.call_count)
+        first, second = self.nova_client.servers.list.call_args_list
+        self.assertIn('changes-since', first[1]['search_opts'])
+        self.assertIsNone(first[1]['marker'])
+        self.assertEqual('1234', second[1]['marker'])
+
+    def test_settled_server_fetched(self):
+        cfg.CONF.set_override('server_status_poll_interval', 5,
+                              enforce_type=True)
+        self.servers['1234'].status = 'ACTIVE'
+        self._poll_after(0)
+        self.assertEqual(2, self.nova_client.servers.get.call_count)
+
+        # a server that is not building or deleting may have had an action
+        # issued since it was cached, so it is always fetched
+        self._poll_after(1)
+        self.assertEqual(3, self.nova_client.servers.get.call_count)
+        self.nova_client.servers.get.assert_called_with('1234')
+        self.assertEqual(1, len(self.nova_plugin._server_poller()))
+
+    def test_settled_poller_dropped(self):
+        cfg.CONF.set_override('server_status_poll_interval', 5,
+                              enforce_type=True)
+        self._poll_after(0)
+        poller = self.nova_plugin._server_poller()
+        self.assertEqual(2, len(poller))
+
+        self.servers['1234'].status = 'ACTIVE'
+        self.servers['5678'].status = 'ACTIVE'
+        self._poll_after(600)
+        self.assertEqual(0, len(poller))
+        self.assertEqual({}, nova._server_pollers)
+
+    def test_not_found(self):
+        cfg.CONF.set_override('server_status_poll_interval', 5,
+                              enforce_type=True)
+        self.nova_client.servers.get.side_effect = (
+            nova_exceptions.NotFound(404))
+        self.assertRaises(nova_exceptions.NotFound,
+                          self.nova_plugin.fetch_server, '1234')
+        self.assertTrue(
+            self.nova_plugin.check_delete_server_complete('1234'))
+        self.assertEqual({}, nova._server_pollers)
+
+
 class NovaClientPluginCheckActiveTest(NovaClientPluginTestCase):
 
     scenarios = [
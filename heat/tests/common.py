@@ -92,6 +92,8 @@ class HeatTestCase(testscenarios.WithScenarios,
         self.useFixture(fixtures.MonkeyPatch(
             'heat.common.exception._FATAL_EXCEPTION_FORMAT_ERRORS',
             True))
+        self.useFixture(fixtures.MonkeyPatch(
+            'heat.engine.template._template_cache', None))
 
         def enable_sleep():
             scheduler.ENABLE_SLEEP = True
@@ -760,6 +760,37 @@ class HeatMigrationsCheckers(test_migrations.WalkVersionsMixin,
         self.assertEqual('resource', fk['referred_table'])
         self.assertEqual(['id'], fk['referred_columns'])
 
+    def _check_074(self, engine, data):
+        self.assertColumnExists(engine, 'stack', 'event_count')
+
+    def _check_075(self, engine, data):
+        self.assertColumnExists(engine, 'event', 'resource_properties_data')
+
+    def _check_076(self, engine, data):
+        self.assertIndexMembers(engine, 'event',
+                                'ix_event_stack_id_created_at_id',
+                                ['stack_id', 'created_at', 'id'])
+        self.assertIndexMembers(engine, 'stack', 'ix_stack_created_at_id',
+                                ['created_at', 'id'])
+
+    def _check_077(self, engine, data):
+        self.assertColumnExists(engine, 'event', 'root_stack_id')
+        self.assertIndexMembers(engine, 'event',
+                                'ix_event_root_stack_id_created_at_id',
+                                ['root_stack_id', 'created_at', 'id'])
+
+    def _check_078(self, engine, data):
+        self.assertColumnExists(engine, 'sync_point_input', 'input_data')
+        self.assertIndexMembers(engine, 'sync_point_input',
+                                'ix_sync_point_input_sync_point',
+                                ['entity_id', 'traversal_id', 'is_update'])
+        self.assertIndexMembers(engine, 'sync_point_input',
+                                'ix_sync_point_input_traversal_id',
+                                ['traversal_id'])
+
+    def _check_079(self, engine, data):
+        self.assertColumnExists(engine, 'stack', 'resource_count')
+
 
 class TestHeatMigrationsMySQL(HeatMigrationsCheckers,
                               test_base.MySQLOpportunisticTestCase):
@@ -33,6 +33,7 @@ from heat.common import context
 from heat.common import exception
 from heat.common import template_format
 from heat.db.sqlalchemy import api as db_api
+from heat.db.sqlalchemy import models
 from heat.engine.clients.os import glance
 from heat.engine.clients.os import nova
 from heat.engine import environment
@@ -41,6 +42,7 @@ from heat.engine.resources.aws.ec2 import instance as instances
 from heat.engine import stack as parser
 from heat.engine import template as tmpl
 from heat.engine import template_files
+from heat.rpc import api as rpc_api
 from heat.tests import common
 from heat.tests.openstack.nova import fakes as fakes_nova
 from heat.tests import utils
@@ -153,7 +155,19 @@ class SqlAlchemyTest(common.HeatTestCase):
         mock_paginate_query.side_effect = InvalidSortKey()
         self.assertRaises(exception.Invalid,
                           db_api._events_filter_and_page_query,
-                          self.ctx, query, sort_keys=['foo'])
+                          self.ctx, query,
+                          sort_keys=[rpc_api.EVENT_RES_TYPE])
+
+    @mock.patch.object(db_api.utils, 'paginate_query')
+    @mock.patch.object(db_api, '_keyset_paginate_query')
+    def test_events_filter_unknown_sort_key_uses_keyset(
+            self, mock_keyset_query, mock_paginate_query):
+        query = mock.Mock()
+        db_api._events_filter_and_page_query(self.ctx, query,
+                                             sort_keys=['foo'])
+
+        self.assertTrue(mock_keyset_query.called)
+        self.assertFalse(mock_paginate_query.called)
 
     @mock.patch.object(db_api.db_filters, 'exact_filter')
     def test_filter_and_page_query_handles_no_filters(self, mock_db_filter):
@@ -209,23 +223,38 @@ class SqlAlchemyTest(common.HeatTestCase):
         self.assertIn(['created_at'], args)
 
     @mock.patch.object(db_api.utils, 'paginate_query')
+    @mock.patch.object(db_api, '_keyset_paginate_query')
     def test_paginate_query_default_sorts_by_created_at_and_id(
-            self, mock_paginate_query):
+            self, mock_keyset_query, mock_paginate_query):
         query = mock.Mock()
         model = mock.Mock()
         db_api._paginate_query(self.ctx, query, model, sort_keys=None)
-        args, _ = mock_paginate_query.call_args
-        self.assertIn(['created_at', 'id'], args)
+        self.assertTrue(mock_keyset_query.called)
+        self.assertFalse(mock_paginate_query.called)
 
-    @mock.patch.object(db_api.utils, 'paginate_query')
+    @mock.patch.object(db_api, '_keyset_paginate_query')
     def test_paginate_query_default_sorts_dir_by_desc(self,
-                                                      mock_paginate_query):
+                                                      mock_keyset_query):
         query = mock.Mock()
         model = mock.Mock()
         db_api._paginate_query(self.ctx, query, model, sort_dir=None)
-        args, _ = mock_paginate_query.call_args
+        args, _ = mock_keyset_query.call_args
         self.assertIn('desc', args)
 
+    @mock.patch.object(db_api, '_keyset_paginate_query')
+    def test_paginate_query_created_at_uses_keyset(self, mock_keyset_query):
+        query = mock.Mock()
+        model = mock.Mock()
+        db_api._paginate_query(self.ctx, query, model,
+                               sort_keys=['created_at'], sort_dir='asc')
+        args, _ = mock_keyset_query.call_args
+        self.assertIn('asc', args)
+
+    def test_keyset_paginate_query_invalid_sort_dir(self):
+        query = mock.Mock()
+        self.assertRaises(exception.Invalid, db_api._keyset_paginate_query,
+                          self.ctx, query, mock.Mock(), None, None, 'up')
+
     @mock.patch.object(db_api.utils, 'paginate_query')
     def test_paginate_query_uses_given_sort_plus_id(self,
                                                     mock_paginate_query):
@@ -246,7 +275,8 @@ class SqlAlchemyTest(common.HeatTestCase):
         ctx = mock.MagicMock()
         ctx.session.query.return_value = mock_query_object
 
-        db_api._paginate_query(ctx, query, model, marker=marker)
+        db_api._paginate_query(ctx, query, model, marker=marker,
+                               sort_keys=['name'])
         mock_query_object.get.assert_called_once_with(marker)
         args, _ = mock_paginate_query.call_args
         self.assertIn('real_marker', args)
@@ -453,6 +483,16 @@ class SqlAlchemyTest(common.HeatTestCase):
         st_db = db_api.stack_get_all(self.ctx)
         self.assertEqual(1, len(st_db))
 
+    def test_stack_get_all_columns(self):
+        self._setup_test_stack('stack', UUID1)
+        st_db = db_api.stack_get_all(self.ctx, columns=('id', 'name'))
+        self.assertEqual(1, len(st_db))
+        loaded = st_db[0].__dict__
+        self.assertEqual(UUID1, loaded['id'])
+        self.assertEqual('stack', loaded['name'])
+        self.assertNotIn('raw_template_id', loaded)
+        self.assertNotIn('raw_template', loaded)
+
     def test_stack_get_all_show_deleted(self):
         stacks = [self._setup_test_stack('stack', x)[1] for x in UUIDs]
 
@@ -565,6 +605,14 @@ class SqlAlchemyTest(common.HeatTestCase):
         self.assertEqual(1, len(st_db))
         self.assertEqual(stacks[0].id, st_db[0].id)
 
+    def test_stack_get_all_marker_asc(self):
+        stacks = [self._setup_test_stack('stack', x)[1] for x in UUIDs]
+
+        st_db = db_api.stack_get_all(self.ctx, marker=stacks[1].id,
+                                     sort_dir='asc')
+        self.assertEqual(1, len(st_db))
+        self.assertEqual(stacks[2].id, st_db[0].id)
+
     def test_stack_get_all_non_existing_marker(self):
         [self._setup_test_stack('stack', x)[1] for x in UUIDs]
 
@@ -2251,6 +2299,53 @@ class DBAPIStackTest(common.HeatTestCase):
         self.assertEqual(0, db_api.stack_count_total_resources(
             self.ctx, None))
 
+    def test_stack_count_total_resources_maintained(self):
+        root = create_stack(self.ctx, self.template, self.user_creds)
+        child = create_stack(self.ctx, self.template, self.user_creds,
+                             owner_id=root.id)
+        self.assertEqual(0, root.resource_count)
+
+        with mock.patch.object(db_api,
+                               '_stack_count_resources_in_tree') as cnt:
+            resources = [create_resource(self.ctx, stack, name='r%d' % i,
+                                         root_stack_id=root.id)
+                         for i, stack in enumerate([root, child, child])]
+            self.assertEqual(3, db_api.stack_count_total_resources(
+                self.ctx, root.id))
+
+            db_api.resource_delete(self.ctx, resources[0].id)
+            self.assertEqual(2, db_api.stack_count_total_resources(
+                self.ctx, root.id))
+
+            db_api.stack_delete(self.ctx, child.id)
+            self.assertEqual(0, db_api.stack_count_total_resources(
+                self.ctx, root.id))
+            self.assertFalse(cnt.called)
+
+    def test_stack_count_total_resources_purge_deleted(self):
+        root = create_stack(self.ctx, self.template, self.user_creds)
+        create_resource(self.ctx, root, name='r0', root_stack_id=root.id)
+        create_resource(self.ctx, root, name='r1', root_stack_id=root.id,
+                        action='DELETE', status='COMPLETE')
+
+        db_api.resource_purge_deleted(self.ctx, root.id)
+        self.assertEqual(1, db_api.stack_count_total_resources(
+            self.ctx, root.id))
+
+    def test_stack_count_total_resources_initialised_lazily(self):
+        root = create_stack(self.ctx, self.template, self.user_creds)
+        create_resource(self.ctx, root, root_stack_id=root.id)
+        # Simulate a stack created before the counter existed
+        db_api.stack_update(self.ctx, root.id, {'resource_count': None})
+
+        self.assertEqual(1, db_api.stack_count_total_resources(
+            self.ctx, root.id))
+        self.assertEqual(1, db_api.stack_get(self.ctx,
+                                             root.id).resource_count)
+        create_resource(self.ctx, root, name='r1', root_stack_id=root.id)
+        self.assertEqual(2, db_api.stack_get(self.ctx,
+                                             root.id).resource_count)
+
 
 class DBAPIResourceTest(common.HeatTestCase):
     def setUp(self):
@@ -2358,6 +2453,22 @@ class DBAPIResourceTest(common.HeatTestCase):
         self.assertEqual({}, db_api.resource_get_all_by_stack(
             self.ctx, self.stack2.id))
 
+    def test_resource_get_summaries_by_stack(self):
+        stack1 = create_stack(self.ctx, self.template, self.user_creds)
+        res1 = create_resource(self.ctx, self.stack, name='res1',
+                               physical_resource_id='phys1')
+        res2 = create_resource(self.ctx, self.stack, name='res2',
+                               action='delete', physical_resource_id=None)
+        create_resource(self.ctx, stack1, name='res3')
+
+        summaries = db_api.resource_get_summaries_by_stack(self.ctx,
+                                                           self.stack.id)
+        self.assertEqual([(res1.id, 'res1', 'create', 'complete', 'phys1'),
+                          (res2.id, 'res2', 'delete', 'complete', None)],
+                         [(s.id, s.name, s.action, s.status,
+                           s.physical_resource_id) for s in summaries])
+        self.assertIsNotNone(summaries[0].created_at)
+
     def test_resource_get_all_active_by_stack(self):
         values = [
             {'name': 'res1', 'action': rsrc.Resource.DELETE,
@@ -2703,6 +2814,41 @@ class DBAPIEventTest(common.HeatTestCase):
         events = db_api.event_get_all_by_stack(self.ctx, self.stack2.id)
         self.assertEqual(1, len(events))
 
+    def test_event_get_all_by_root_stack(self):
+        root = create_stack(self.ctx, self.template, self.user_creds,
+                            nested_depth=0, backup=False)
+        child = create_stack(self.ctx, self.template, self.user_creds,
+                             owner_id=root.id, nested_depth=1, backup=False)
+        grandchild = create_stack(self.ctx, self.template, self.user_creds,
+                                  owner_id=child.id, nested_depth=2,
+                                  backup=False)
+        other = create_stack(self.ctx, self.template, self.user_creds,
+                             nested_depth=0, backup=False)
+        backup = create_stack(self.ctx, self.template, self.user_creds,
+                              owner_id=child.id, nested_depth=2, backup=True)
+        for stack in (root, child, grandchild, backup):
+            create_event(self.ctx, stack_id=stack.id, root_stack_id=root.id,
+                         resource_name=stack.id)
+        create_event(self.ctx, stack_id=other.id, root_stack_id=other.id)
+
+        events = db_api.event_get_all_by_root_stack(self.ctx, root.id)
+        self.assertEqual(set([root.id, child.id, grandchild.id]),
+                         set(e.resource_name for e in events))
+
+        events = db_api.event_get_all_by_root_stack(self.ctx, root.id,
+                                                    nested_depth=1)
+        self.assertEqual(set([root.id, child.id]),
+                         set(e.resource_name for e in events))
+
+        events = db_api.event_get_all_by_root_stack(
+            self.ctx, root.id, filters={'resource_name': child.id})
+        self.assertEqual([child.id], [e.resource_name for e in events])
+
+        events = db_api.event_get_all_by_root_stack(
+            self.ctx, root.id, nested_depth=1,
+            filters={'resource_name': grandchild.id})
+        self.assertEqual([], events)
+
     def test_event_count_all_by_stack(self):
         self.stack1 = create_stack(self.ctx, self.template, self.user_creds)
         self.stack2 = create_stack(self.ctx, self.template, self.user_creds)
@@ -2719,6 +2865,110 @@ class DBAPIEventTest(common.HeatTestCase):
         self.assertEqual(1, db_api.event_count_all_by_stack(self.ctx,
                                                             self.stack2.id))
 
+    def test_event_count_maintained(self):
+        cfg.CONF.set_override('max_events_per_stack', 3, enforce_type=True)
+        cfg.CONF.set_override('event_purge_batch_size', 2, enforce_type=True)
+        stack = create_stack(self.ctx, self.template, self.user_creds)
+        self.assertEqual(0, stack.event_count)
+
+        with mock.patch.object(db_api, 'event_count_all_by_stack') as cnt:
+            for i in range(3):
+                create_event(self.ctx, stack_id=stack.id)
+            self.assertFalse(cnt.called)
+        self.assertEqual(3, db_api._event_count_get(self.ctx, stack.id))
+
+        # Reaching the limit prunes event_purge_batch_size events
+        create_event(self.ctx, stack_id=stack.id)
+        self.assertEqual(2, db_api._event_count_get(self.ctx, stack.id))
+        self.assertEqual(2, db_api.event_count_all_by_stack(self.ctx,
+                                                            stack.id))
+
+    def test_event_count_initialised_lazily(self):
+        cfg.CONF.set_override('max_events_per_stack', 10, enforce_type=True)
+        stack = create_stack(self.ctx, self.template, self.user_creds)
+        create_event(self.ctx, stack_id=stack.id)
+        create_event(self.ctx, stack_id=stack.id)
+        # Simulate a stack created before the counter existed
+        db_api.stack_update(self.ctx, stack.id, {'event_count': None})
+
+        create_event(self.ctx, stack_id=stack.id)
+        self.assertEqual(3, db_api._event_count_get(self.ctx, stack.id))
+
+    def test_event_count_reset_without_limit(self):
+        cfg.CONF.set_override('max_events_per_stack', 10, enforce_type=True)
+        stack = create_stack(self.ctx, self.template, self.user_creds)
+        count = self.ctx.session.query(models.Stack.event_count).filter_by(
+            id=stack.id)
+        create_event(self.ctx, stack_id=stack.id)
+        self.assertEqual(1, count.scalar())
+
+        cfg.CONF.set_override('max_events_per_stack', 0, enforce_type=True)
+        create_event(self.ctx, stack_id=stack.id)
+        db_api.event_create_batch(self.ctx, [{'stack_id': stack.id}])
+        self.assertIsNone(count.scalar())
+
+        cfg.CONF.set_override('max_events_per_stack', 10, enforce_type=True)
+        create_event(self.ctx, stack_id=stack.id)
+        self.assertEqual(4, db_api._event_count_get(self.ctx, stack.id))
+
+    def test_event_get_all_by_stack_keyset_pages(self):
+        stack = create_stack(self.ctx, self.template, self.user_creds)
+        # Events sharing a timestamp are ordered by id
+        created_at = timeutils.utcnow()
+        for i in range(5):
+            create_event(self.ctx, stack_id=stack.id, created_at=created_at,
+                         resource_name='res%d' % i)
+
+        for sort_dir in ('asc', 'desc'):
+            pages = []
+            marker = None
+            while True:
+                page = db_api.event_get_all_by_stack(
+                    self.ctx, stack.id, limit=2, marker=marker,
+                    sort_dir=sort_dir)
+                if not page:
+                    break
+                pages.extend(e.resource_name for e in page)
+                marker = page[-1].uuid
+            expected = ['res%d' % i for i in range(5)]
+            if sort_dir == 'desc':
+                expected.reverse()
+            self.assertEqual(expected, pages)
+
+    def test_event_create_batch(self):
+        stack1 = create_stack(self.ctx, self.template, self.user_creds)
+        stack2 = create_stack(self.ctx, self.template, self.user_creds)
+        values = [
+            {'stack_id': stack1.id, 'resource_name': 'res1'},
+            {'stack_id': stack1.id, 'resource_name': 'res2'},
+            {'stack_id': stack2.id, 'resource_name': 'res3'},
+        ]
+        db_api.event_create_batch(self.ctx, values)
+
+        self.assertEqual(2, db_api.event_count_all_by_stack(self.ctx,
+                                                            stack1.id))
+        self.assertEqual(1, db_api.event_count_all_by_stack(self.ctx,
+                                                            stack2.id))
+
+    def test_event_create_batch_prunes_once_per_stack(self):
+        cfg.CONF.set_override('max_events_per_stack', 3, enforce_type=True)
+        cfg.CONF.set_override('event_purge_batch_size', 1, enforce_type=True)
+        stack = create_stack(self.ctx, self.template, self.user_creds)
+        for i in range(3):
+            create_event(self.ctx, stack_id=stack.id,
+                         resource_name='old%d' % i)
+        values = [{'stack_id': stack.id, 'resource_name': 'new%d' % i}
+                  for i in range(2)]
+
+        with mock.patch.object(db_api, '_delete_event_rows',
+                               wraps=db_api._delete_event_rows) as delete:
+            db_api.event_create_batch(self.ctx, values)
+            delete.assert_called_once_with(self.ctx, stack.id, 2)
+
+        events = db_api.event_get_all_by_stack(self.ctx, stack.id)
+        self.assertEqual(set(['old2', 'new0', 'new1']),
+                         set(e.resource_name for e in events))
+
 
 class DBAPIWatchRuleTest(common.HeatTestCase):
     def setUp(self):
@@ -3149,6 +3399,53 @@ class DBAPISyncPointTest(common.HeatTestCase):
         )
         self.assertEqual(0, rows_updated)
 
+    def test_sync_point_input_create_get_all(self):
+        sync_point = create_sync_point(
+            self.ctx, entity_id=str(self.resources[0].id),
+            stack_id=self.stack.id, traversal_id=self.stack.current_traversal
+        )
+        for i in range(3):
+            db_api.sync_point_input_create(
+                self.ctx, {'entity_id': sync_point.entity_id,
+                           'traversal_id': sync_point.traversal_id,
+                           'is_update': sync_point.is_update,
+                           'input_data': {'input_data': {'key%d' % i: i}}})
+
+        inputs = db_api.sync_point_input_get_all(
+            self.ctx, sync_point.entity_id, sync_point.traversal_id,
+            sync_point.is_update)
+        self.assertEqual([{'input_data': {'key0': 0}},
+                          {'input_data': {'key1': 1}},
+                          {'input_data': {'key2': 2}}], inputs)
+        self.assertEqual([], db_api.sync_point_input_get_all(
+            self.ctx, sync_point.entity_id, sync_point.traversal_id,
+            not sync_point.is_update))
+
+        # the sync point itself is not modified by its inputs
+        ret_sync_point = db_api.sync_point_get(self.ctx,
+                                               sync_point.entity_id,
+                                               sync_point.traversal_id,
+                                               sync_point.is_update)
+        self.assertEqual(0, ret_sync_point.atomic_key)
+
+    def test_sync_point_delete_inputs(self):
+        sync_point = create_sync_point(
+            self.ctx, entity_id=str(self.resources[0].id),
+            stack_id=self.stack.id, traversal_id=self.stack.current_traversal
+        )
+        db_api.sync_point_input_create(
+            self.ctx, {'entity_id': sync_point.entity_id,
+                       'traversal_id': sync_point.traversal_id,
+                       'is_update': sync_point.is_update,
+                       'input_data': {}})
+
+        rows_deleted = db_api.sync_point_delete_all_by_stack_and_traversal(
+            self.ctx, self.stack.id, self.stack.current_traversal)
+        self.assertEqual(1, rows_deleted)
+        self.assertEqual([], db_api.sync_point_input_get_all(
+            self.ctx, sync_point.entity_id, sync_point.traversal_id,
+            sync_point.is_update))
+
     def test_sync_point_delete(self):
         for res in self.resources:
             sync_point_rsrc = create_sync_point(
@@ -55,6 +55,16 @@ class ThreadGroupManagerTest(common.HeatTestCase):
                 self.stack, self.lock_mock,
                 self.f, *self.fargs, **self.fkwargs)
 
+    def test_service_task_sends_scheduler_stats(self):
+        scheduler = mock.Mock(max_running=2)
+        scheduler.stats.return_value = {'running': 2}
+        self.patch('heat.engine.service.operation_scheduler.get_scheduler',
+                   return_value=scheduler)
+        notify = self.patch('heat.engine.service.scheduler_notification')
+        thm = service.ThreadGroupManager()
+        thm._service_task()
+        notify.send.assert_called_once_with(mock.ANY, {'running': 2})
+
     def test_tgm_start(self):
         stack_id = 'test'
 
@@ -26,6 +26,7 @@ from heat.engine import scheduler
 from heat.engine import stack
 from heat.engine import sync_point
 from heat.engine import worker
+from heat.objects import resource as resource_objects
 from heat.rpc import api as rpc_api
 from heat.rpc import worker_client
 from heat.tests import common
@@ -77,6 +78,61 @@ class CheckWorkflowUpdateTest(common.HeatTestCase):
         for mocked in [mock_cru, mock_crc, mock_pcr, mock_csc, mock_cid]:
             self.assertFalse(mocked.called)
 
+    @mock.patch.object(check_resource.eventlet, 'spawn_after')
+    def test_concurrency_limit_reached(
+            self, mock_spawn, mock_cru, mock_crc, mock_pcr, mock_csc,
+            mock_cid):
+        self.stack.env.load({'concurrency_limits': {'max_resources': 1}})
+        other = self.stack['B']
+        other.state_set(other.CREATE, other.IN_PROGRESS)
+        self.cr._rpc_client = mock.Mock()
+
+        self.patchobject(check_resource, '_throttled_checks',
+                         new=check_resource.ThrottledChecks())
+
+        self.cr.check(self.ctx, self.resource.id,
+                      self.stack.current_traversal, {}, self.is_update,
+                      None, self.resource, self.stack)
+        self.assertFalse(mock_cru.called)
+        self.assertFalse(self.cr._rpc_client.check_resource.called)
+        self.assertEqual(1, mock_spawn.call_count)
+        args = mock_spawn.call_args[0]
+        self.assertEqual(check_resource.CONCURRENCY_RETRY_DELAY, args[0])
+
+        # the timer sends the check again
+        args[1](*args[2:])
+        self.cr._rpc_client.check_resource.assert_called_once_with(
+            self.ctx, self.resource.id, self.stack.current_traversal,
+            sync_point.serialize_input_data({}), self.is_update, None)
+
+    @mock.patch.object(check_resource.listener_client.EngineListenerClient,
+                       'is_alive', return_value=False)
+    def test_concurrency_limit_ignores_dead_engine(
+            self, mock_alive, mock_cru, mock_crc, mock_pcr, mock_csc,
+            mock_cid):
+        self.stack.env.load({'concurrency_limits': {'max_resources': 1}})
+        other = self.stack['B']
+        other.state_set(other.CREATE, other.IN_PROGRESS)
+        resource_objects.Resource.get_obj(self.ctx, other.id).update_and_save(
+            {'engine_id': 'dead-engine'})
+
+        self.assertFalse(self.cr._concurrency_limit_reached(
+            self.ctx, self.resource, self.stack))
+        mock_alive.assert_called_once_with(self.ctx)
+
+    def test_concurrency_limit_by_type(
+            self, mock_cru, mock_crc, mock_pcr, mock_csc, mock_cid):
+        self.stack.env.load({'concurrency_limits': {
+            'max_resources': 2,
+            'resource_types': {'OS::Heat::RandomString': 1}}})
+        self.assertFalse(self.cr._concurrency_limit_reached(
+            self.ctx, self.resource, self.stack))
+        other = self.stack['B']
+        other.state_set(other.CREATE, other.IN_PROGRESS)
+        self.assertEqual(other.type(), self.resource.type())
+        self.assertTrue(self.cr._concurrency_limit_reached(
+            self.ctx, self.resource, self.stack))
+
     @mock.patch.object(worker.WorkerService, '_retrigger_replaced')
     def test_stale_traversal(
             self, mock_rnt, mock_cru, mock_crc, mock_pcr, mock_csc, mock_cid):
@@ -373,7 +429,8 @@ class CheckWorkflowUpdateTest(common.HeatTestCase):
         mock_pcr.assert_called_once_with(self.ctx, mock.ANY, resC.id,
                                          self.stack.current_traversal,
                                          mock.ANY, (resC.id, True), None,
-                                         True, None)
+                                         True, None,
+                                         retrigger=True)
         call_args, call_kwargs = mock_pcr.call_args
         actual_predecessors = call_args[4]
         self.assertItemsEqual(expected_predecessors, actual_predecessors)
@@ -391,7 +448,8 @@ class CheckWorkflowUpdateTest(common.HeatTestCase):
         mock_pcr.assert_called_once_with(self.ctx, mock.ANY, 2,
                                          self.stack.current_traversal,
                                          mock.ANY, (2, False), None,
-                                         False, None)
+                                         False, None,
+                                         retrigger=True)
 
     def test_delete_retrigger_check_resource_new_traversal_updates_rsrc(
             self, mock_cru, mock_crc, mock_pcr, mock_csc, mock_cid):
@@ -406,7 +464,8 @@ class CheckWorkflowUpdateTest(common.HeatTestCase):
         mock_pcr.assert_called_once_with(self.ctx, mock.ANY, 2,
                                          self.stack.current_traversal,
                                          mock.ANY, (2, True), None,
-                                         True, None)
+                                         True, None,
+                                         retrigger=True)
 
     @mock.patch.object(stack.Stack, 'purge_db')
     def test_handle_failure(self, mock_purgedb, mock_cru, mock_crc, mock_pcr,
@@ -722,3 +781,45 @@ class MiscMethodsTest(common.HeatTestCase):
         msg_queue.put_nowait(rpc_api.THREAD_CANCEL)
         self.assertRaises(check_resource.CancelOperation,
                           check_resource._check_for_message, msg_queue)
+
+
+class ThrottledChecksTest(common.HeatTestCase):
+    def setUp(self):
+        super(ThrottledChecksTest, self).setUp()
+        self.mock_spawn = self.patchobject(check_resource.eventlet,
+                                           'spawn_after')
+        self.checks = check_resource.ThrottledChecks()
+
+    def test_backoff(self):
+        send = mock.Mock()
+        for i in range(8):
+            self.checks.defer('stack', 'trvsl', (1, True), send)
+        delays = [c[0][0] for c in self.mock_spawn.call_args_list]
+        self.assertEqual([1, 2, 4, 8, 16, 32, 60, 60], delays)
+        # each new attempt replaces the previous timer
+        self.assertEqual(7, self.mock_spawn.return_value.cancel.call_count)
+
+        self.checks.started('stack', 'trvsl', (1, True))
+        self.checks.defer('stack', 'trvsl', (1, True), send)
+        self.assertEqual(1, self.mock_spawn.call_args[0][0])
+
+    def test_new_traversal_resets_backoff(self):
+        send = mock.Mock()
+        self.checks.defer('stack', 'trvsl', (1, True), send)
+        self.checks.defer('stack', 'trvsl2', (1, True), send)
+        self.assertEqual(1, self.mock_spawn.call_args[0][0])
+
+    def test_release_oldest(self):
+        send1, send2 = mock.Mock(), mock.Mock()
+        self.checks.defer('stack', 'trvsl', (1, True), send1)
+        self.checks.defer('stack', 'trvsl', (2, True), send2)
+        self.checks.release('other')
+        self.checks.release('stack')
+        send1.assert_called_once_with()
+        self.assertFalse(send2.called)
+
+        self.checks.release('stack')
+        send2.assert_called_once_with()
+        self.checks.release('stack')
+        self.assertEqual(1, send1.call_count)
+        self.assertEqual({}, dict(self.checks._waiting))
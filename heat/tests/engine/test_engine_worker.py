@@ -14,9 +14,11 @@
 # limitations under the License.
 
 import mock
+from oslo_config import cfg
 
 from heat.db import api as db_api
 from heat.engine import check_resource
+from heat.engine import operation_scheduler
 from heat.engine import stack as parser
 from heat.engine import template as templatem
 from heat.engine import worker
@@ -136,6 +138,34 @@ class WorkerServiceTest(common.HeatTestCase):
         # ensure remove is also called
         self.assertTrue(mock_tgm.remove_msg_queue.called)
 
+    @mock.patch.object(check_resource, 'load_resource')
+    @mock.patch.object(check_resource.CheckResource, 'check')
+    def test_check_resource_queued_in_thread(self, mock_check,
+                                             mock_load_resource):
+        self.patchobject(operation_scheduler, '_scheduler', new=None)
+        cfg.CONF.set_override('max_concurrent_stack_operations', 1,
+                              enforce_type=True)
+        mock_tgm = mock.MagicMock()
+        self.worker = worker.WorkerService('host-1',
+                                           'topic-1',
+                                           'engine_id',
+                                           mock_tgm)
+        ctx = utils.dummy_context()
+        current_traversal = 'something'
+        fake_res = mock.MagicMock()
+        fake_res.current_traversal = current_traversal
+        fake_res.owner_id = None
+        mock_load_resource.return_value = (fake_res, fake_res, fake_res)
+        self.worker.check_resource(ctx, mock.Mock(), current_traversal,
+                                   {}, mock.Mock(), mock.Mock())
+
+        # the RPC handler returns without waiting for a place in the queue
+        self.assertFalse(mock_check.called)
+        self.assertTrue(mock_tgm.start.called)
+        self.assertFalse(mock_tgm.remove_msg_queue.called)
+        mock_tgm.start.return_value.link.assert_called_once_with(
+            mock_tgm.remove_msg_queue, fake_res.id, mock.ANY)
+
     @mock.patch.object(worker, '_wait_for_cancellation')
     @mock.patch.object(worker, '_cancel_check_resource')
     @mock.patch.object(wc.WorkerClient, 'cancel_check_resource')
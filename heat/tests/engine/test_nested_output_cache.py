@@ -0,0 +1,104 @@
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import datetime
+
+import mock
+from oslo_cache import core
+from oslo_config import cfg
+
+from heat.common import exception
+from heat.engine import nested_output_cache
+from heat.objects import stack as stack_object
+from heat.tests import common
+from heat.tests import utils
+
+
+class NestedOutputCacheTest(common.HeatTestCase):
+
+    def setUp(self):
+        super(NestedOutputCacheTest, self).setUp()
+        region = core.create_region()
+        region.configure('dogpile.cache.memory')
+        self.patchobject(nested_output_cache, '_region', new=region)
+        cfg.CONF.set_override('enabled', True, group='cache',
+                              enforce_type=True)
+        self.ctx = utils.dummy_context()
+        self.creator = mock.Mock(
+            side_effect=lambda keys: dict((k, object()) for k in keys))
+        self.status = ['UPDATE', 'COMPLETE', '',
+                       datetime.datetime(2016, 7, 1, 12, 0)]
+        self.get_status = self.patchobject(
+            stack_object.Stack, 'get_status',
+            side_effect=lambda cnxt, stack_id: tuple(self.status))
+
+    def _get(self, stack_id='nested', keys=('out',)):
+        return nested_output_cache.get_outputs(self.ctx, stack_id,
+                                               list(keys), self.creator)
+
+    def test_disabled(self):
+        cfg.CONF.set_override('caching', False, group='nested_output_cache',
+                              enforce_type=True)
+        self.assertIsNot(self._get()['out'], self._get()['out'])
+        self.assertEqual(2, self.creator.call_count)
+        self.assertFalse(self.get_status.called)
+
+    def test_cached(self):
+        outputs = self._get()
+        self.assertIs(outputs['out'], self._get()['out'])
+        self.assertIsNot(outputs['out'], self._get('other')['out'])
+        self.assertEqual(2, self.creator.call_count)
+
+    def test_not_complete(self):
+        self.status[1] = 'IN_PROGRESS'
+        self.assertIsNot(self._get()['out'], self._get()['out'])
+        self.assertEqual(2, self.creator.call_count)
+
+    def test_not_found(self):
+        self.get_status.side_effect = exception.NotFound
+        self.assertIsNot(self._get()['out'], self._get()['out'])
+        self.assertEqual(2, self.creator.call_count)
+
+    def test_cached_per_key(self):
+        outputs = self._get(keys=['a', 'b'])
+        more_outputs = self._get(keys=['b', 'c'])
+        self.assertIs(outputs['b'], more_outputs['b'])
+        self.assertEqual([mock.call(['a', 'b']), mock.call(['c'])],
+                         self.creator.call_args_list)
+
+    def test_unavailable_not_cached(self):
+        self.creator.side_effect = None
+        self.creator.return_value = {}
+        self.assertEqual({}, self._get())
+        self.assertEqual({}, self._get())
+        self.assertEqual(2, self.creator.call_count)
+
+    def test_none_not_cached(self):
+        self.creator.side_effect = None
+        self.creator.return_value = {'out': None}
+        self.assertEqual({'out': None}, self._get())
+        self.assertEqual({'out': None}, self._get())
+        self.assertEqual(2, self.creator.call_count)
+
+    def test_stack_changed(self):
+        outputs = self._get()
+        self.status[3] = datetime.datetime(2016, 7, 1, 12, 5)
+        self.assertIsNot(outputs['out'], self._get()['out'])
+        self.assertEqual(2, self.creator.call_count)
+
+    def test_invalidate(self):
+        outputs = self._get()
+        other_outputs = self._get('other')
+        nested_output_cache.invalidate('nested')
+        self.assertIsNot(outputs['out'], self._get()['out'])
+        self.assertIs(other_outputs['out'], self._get('other')['out'])
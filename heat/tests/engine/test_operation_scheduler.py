@@ -0,0 +1,134 @@
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import eventlet
+from eventlet import event
+from oslo_config import cfg
+
+from heat.engine import operation_scheduler
+from heat.tests import common
+
+
+class OperationSchedulerTest(common.HeatTestCase):
+
+    def setUp(self):
+        super(OperationSchedulerTest, self).setUp()
+        self.started = []
+        self.finish = {}
+
+    def _spawn(self, scheduler, tenant_id, stack_id):
+        name = '%s/%s' % (tenant_id, stack_id)
+        self.finish[name] = event.Event()
+
+        def operation():
+            self.started.append(name)
+            self.finish[name].wait()
+
+        op = scheduler.wrap(tenant_id, stack_id, operation)
+        gt = eventlet.spawn(op)
+        eventlet.sleep(0)
+        return gt
+
+    def _complete(self, name):
+        self.finish[name].send()
+        eventlet.sleep(0)
+        eventlet.sleep(0)
+
+    def test_unlimited(self):
+        scheduler = operation_scheduler.OperationScheduler(0)
+        for i in range(5):
+            self._spawn(scheduler, 't1', 's%d' % i)
+        self.assertEqual(5, len(self.started))
+        self.assertEqual(0, scheduler.stats()['queued'])
+
+    def test_limit(self):
+        scheduler = operation_scheduler.OperationScheduler(2)
+        for i in range(4):
+            self._spawn(scheduler, 't1', 's%d' % i)
+        self.assertEqual(['t1/s0', 't1/s1'], self.started)
+        stats = scheduler.stats()
+        self.assertEqual(2, stats['running'])
+        self.assertEqual(2, stats['queued'])
+        self.assertEqual({'t1': 2}, stats['queued_by_tenant'])
+
+        self._complete('t1/s0')
+        self.assertEqual(['t1/s0', 't1/s1', 't1/s2'], self.started)
+        self.assertEqual(1, scheduler.stats()['waited'])
+
+    def test_fair_between_tenants(self):
+        scheduler = operation_scheduler.OperationScheduler(2)
+        self._spawn(scheduler, 'busy', 's0')
+        self._spawn(scheduler, 'busy', 's1')
+        self._spawn(scheduler, 'busy', 's2')
+        self._spawn(scheduler, 'busy', 's3')
+        self._spawn(scheduler, 'quiet', 's4')
+
+        # the quiet tenant is served before the queued operations of the
+        # busy tenant, despite being queued last
+        self._complete('busy/s0')
+        self.assertEqual('quiet/s4', self.started[-1])
+        self._complete('busy/s1')
+        self.assertEqual('busy/s2', self.started[-1])
+
+    def test_fair_between_stacks(self):
+        scheduler = operation_scheduler.OperationScheduler(1)
+        self._spawn(scheduler, 't1', 'running')
+        self._spawn(scheduler, 't1', 'big')
+        self._spawn(scheduler, 't1', 'big')
+        self._spawn(scheduler, 't1', 'small')
+
+        self._complete('t1/running')
+        self.assertEqual('t1/big', self.started[-1])
+        self._complete('t1/big')
+        self.assertEqual('t1/small', self.started[-1])
+
+    def test_tenant_weights(self):
+        scheduler = operation_scheduler.OperationScheduler(
+            3, tenant_weights={'heavy': 2.0})
+        self._spawn(scheduler, 'heavy', 's0')
+        self._spawn(scheduler, 'light', 's1')
+        self._spawn(scheduler, 'light', 's2')
+        self._spawn(scheduler, 'light', 's3')
+        self._spawn(scheduler, 'heavy', 's4')
+
+        # light has 2 running with weight 1, heavy has 1 with weight 2
+        self._complete('light/s1')
+        self.assertEqual('heavy/s4', self.started[-1])
+
+    def test_cancel_queued(self):
+        scheduler = operation_scheduler.OperationScheduler(1)
+        self._spawn(scheduler, 't1', 's0')
+        gt = self._spawn(scheduler, 't1', 's1')
+        gt.kill()
+        self.assertEqual(0, scheduler.stats()['queued'])
+
+        self._complete('t1/s0')
+        self.assertEqual(['t1/s0'], self.started)
+        self.assertEqual(0, scheduler.stats()['running'])
+
+    def test_get_scheduler(self):
+        self.patchobject(operation_scheduler, '_scheduler', new=None)
+        cfg.CONF.set_override('max_concurrent_stack_operations', 10,
+                              enforce_type=True)
+        cfg.CONF.set_override('stack_operation_tenant_weights',
+                              {'t1': '3', 't2': '0', 't3': 'x'},
+                              enforce_type=True)
+        scheduler = operation_scheduler.get_scheduler()
+        self.assertEqual(10, scheduler.max_running)
+        # weights that are not positive numbers are ignored
+        self.assertEqual({'t1': 3.0}, scheduler.tenant_weights)
+        self.assertIs(scheduler, operation_scheduler.get_scheduler())
+
+    def test_invalid_weight(self):
+        self.assertRaises(ValueError, operation_scheduler.OperationScheduler,
+                          2, tenant_weights={'t1': 0})
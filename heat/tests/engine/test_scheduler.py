@@ -11,10 +11,12 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import collections
 import contextlib
 import itertools
 
 import eventlet
+from oslo_config import cfg
 import six
 
 from heat.common.i18n import repr_wrapper
@@ -391,6 +393,110 @@ class DependencyTaskGroupTest(common.HeatTestCase):
         exc = self.assertRaises(type(e2), task.throw, e2)
         self.assertIs(e2, exc)
 
+    def test_long_chain_scales_linearly(self):
+        num_tasks = 500
+        tasks = [(str(i + 1), str(i)) for i in range(num_tasks)]
+        deps = dependencies.Dependencies(tasks)
+
+        tg = scheduler.DependencyTaskGroup(deps, DummyTask(1))
+        started = self.patchobject(scheduler.TaskRunner, 'started',
+                                   autospec=True,
+                                   side_effect=lambda r: r._runner is not None)
+        scheduler.TaskRunner(tg)(wait_time=None)
+
+        # each subtask is only examined when it is ready or running, rather
+        # than on every step of the group
+        self.assertLess(started.call_count, 10 * (num_tasks + 1))
+        self.assertFalse(tg._graph)
+
+    def _run_limited(self, deps, **limits):
+        running = set()
+        max_seen = collections.defaultdict(int)
+
+        def task(key):
+            running.add(key)
+            for group in (None, key[0]):
+                max_seen[group] = max(max_seen[group],
+                                      len([k for k in running
+                                           if group in (None, k[0])]))
+            yield
+            yield
+            running.discard(key)
+
+        tg = scheduler.DependencyTaskGroup(deps, task, **limits)
+        scheduler.TaskRunner(tg)(wait_time=None)
+        self.assertFalse(tg._graph)
+        self.assertEqual(set(), running)
+        return max_seen
+
+    def test_max_running(self):
+        deps = dependencies.Dependencies([('a%d' % i, None)
+                                          for i in range(10)])
+        max_seen = self._run_limited(deps, max_running=3)
+        self.assertEqual(3, max_seen[None])
+
+    def test_limit_group(self):
+        deps = dependencies.Dependencies(
+            [('a%d' % i, None) for i in range(6)] +
+            [('b%d' % i, None) for i in range(6)] +
+            [('c0', 'a0')])
+
+        def limit_group(key):
+            if key[0] == 'a':
+                return 'a', 2
+
+        max_seen = self._run_limited(deps, limit_group=limit_group)
+        self.assertEqual(2, max_seen['a'])
+        self.assertEqual(6, max_seen['b'])
+
+    def test_limit_group_and_max_running(self):
+        deps = dependencies.Dependencies(
+            [('a%d' % i, None) for i in range(6)] +
+            [('b%d' % i, None) for i in range(6)])
+
+        def limit_group(key):
+            return key[0], 1
+
+        max_seen = self._run_limited(deps, max_running=4,
+                                     limit_group=limit_group)
+        self.assertEqual(2, max_seen[None])
+        self.assertEqual(1, max_seen['a'])
+        self.assertEqual(1, max_seen['b'])
+
+
+class PollBackoffTest(common.HeatTestCase):
+
+    def test_disabled_by_default(self):
+        backoff = scheduler.PollBackoff()
+        periods = [backoff.next_period() for i in range(100)]
+        self.assertEqual([None] * 100, periods)
+
+    def test_initial_polls(self):
+        self.patchobject(scheduler.random, 'uniform',
+                         side_effect=lambda a, b: b)
+        backoff = scheduler.PollBackoff(max_period=10, initial_polls=3,
+                                        factor=2)
+        periods = [backoff.next_period() for i in range(7)]
+        self.assertEqual([None, None, None, 2, 4, 8, 10], periods)
+
+    def test_jitter(self):
+        self.patchobject(scheduler.random, 'uniform',
+                         side_effect=lambda a, b: a)
+        backoff = scheduler.PollBackoff(max_period=10, initial_polls=0,
+                                        factor=2)
+        periods = [backoff.next_period() for i in range(5)]
+        self.assertEqual([None, 2, 4, 5, 5], periods)
+
+    def test_config(self):
+        cfg.CONF.set_override('poll_backoff_max_period', 30,
+                              enforce_type=True)
+        cfg.CONF.set_override('poll_backoff_initial_polls', 5,
+                              enforce_type=True)
+        backoff = scheduler.PollBackoff()
+        self.assertEqual(30, backoff.max_period)
+        self.assertEqual(5, backoff.initial_polls)
+        self.assertEqual(1.5, backoff.factor)
+
 
 class TaskTest(common.HeatTestCase):
 
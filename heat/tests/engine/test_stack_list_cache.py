@@ -0,0 +1,79 @@
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import mock
+from oslo_cache import core
+from oslo_config import cfg
+
+from heat.engine import stack_list_cache
+from heat.tests import common
+from heat.tests import utils
+
+
+class StackListCacheTest(common.HeatTestCase):
+
+    def setUp(self):
+        super(StackListCacheTest, self).setUp()
+        region = core.create_region()
+        region.configure('dogpile.cache.memory')
+        self.patchobject(stack_list_cache, '_region', new=region)
+        cfg.CONF.set_override('enabled', True, group='cache',
+                              enforce_type=True)
+        cfg.CONF.set_override('caching', True, group='stack_list_cache',
+                              enforce_type=True)
+        self.ctx = utils.dummy_context()
+        self.creator = mock.Mock(side_effect=lambda: object())
+
+    def _get(self, cnxt=None, kind='list', params=None):
+        return stack_list_cache.get_or_create(cnxt or self.ctx, kind,
+                                              params or {'limit': 10},
+                                              self.creator)
+
+    def test_disabled(self):
+        cfg.CONF.set_override('caching', False, group='stack_list_cache',
+                              enforce_type=True)
+        self.assertIsNot(self._get(), self._get())
+        self.assertEqual(2, self.creator.call_count)
+
+    def test_cached(self):
+        result = self._get()
+        self.assertIs(result, self._get())
+        self.assertEqual(1, self.creator.call_count)
+
+    def test_keyed_by_params(self):
+        result = self._get()
+        self.assertIsNot(result, self._get(params={'limit': 20}))
+        self.assertIsNot(result, self._get(kind='count'))
+        self.assertEqual(3, self.creator.call_count)
+
+    def test_scoped_by_tenant(self):
+        result = self._get()
+        other = utils.dummy_context(tenant_id='other_tenant')
+        self.assertIsNot(result, self._get(other))
+        admin = utils.dummy_context()
+        admin.is_admin = True
+        self.assertIsNot(result, self._get(admin))
+        self.assertEqual(3, self.creator.call_count)
+
+    def test_invalidate(self):
+        result = self._get()
+        other = utils.dummy_context(tenant_id='other_tenant')
+        other_result = self._get(other)
+        admin = utils.dummy_context()
+        admin.is_admin = True
+        admin_result = self._get(admin)
+
+        stack_list_cache.invalidate(self.ctx.tenant_id)
+        self.assertIsNot(result, self._get())
+        self.assertIsNot(admin_result, self._get(admin))
+        self.assertIs(other_result, self._get(other))
@@ -13,9 +13,13 @@
 # limitations under the License.
 
 import mock
+from oslo_config import cfg
 from oslo_db import exception
 
+from heat.common import exception as heat_exception
+from heat.engine import check_resource
 from heat.engine import sync_point
+from heat.objects import sync_point as sync_point_object
 from heat.tests import common
 from heat.tests.engine import tools
 from heat.tests import utils
@@ -41,11 +45,11 @@ class SyncPointTestCase(common.HeatTestCase):
         sync_point.sync(ctx, resource.id, stack.current_traversal, True,
                         mock_callback, set(graph[(resource.id, True)]),
                         {sender: None})
-        updated_sync_point = sync_point.get(ctx, resource.id,
-                                            stack.current_traversal, True)
-        input_data = sync_point.deserialize_input_data(
-            updated_sync_point.input_data)
-        self.assertEqual({sender: None}, input_data)
+        inputs = sync_point_object.SyncPoint.get_all_input_data(
+            ctx, resource.id, stack.current_traversal, True)
+        self.assertEqual([{sender: None}],
+                         [sync_point.deserialize_input_data(i)
+                          for i in inputs])
         self.assertFalse(mock_callback.called)
 
     def test_sync_non_waiting(self):
@@ -71,25 +75,91 @@ class SyncPointTestCase(common.HeatTestCase):
 
     def test_serialize_input_data(self):
         res = sync_point.serialize_input_data({(3, 8): None})
-        self.assertEqual({'input_data': {u'tuple:(3, 8)': None}}, res)
+        self.assertEqual({'version': 2, 'names': [],
+                          'input_data': [[[3, 8], None]]}, res)
 
-    @mock.patch('heat.engine.sync_point.update_input_data', return_value=None)
-    @mock.patch('eventlet.sleep', side_effect=exception.DBError)
-    def sync_with_sleep(self, ctx, stack, mock_sleep_time, mock_uid):
-        resource = stack['C']
+    def test_serialize_input_data_attrs(self):
+        data = {(3, True): {'id': 3, 'name': 'A', 'reference_id': 'ref',
+                            'attrs': {'foo': 'bar', ('foo', 'x', 0): 'baz'},
+                            'status': 'COMPLETE', 'action': 'CREATE',
+                            'uuid': 'uuid'},
+                (4, True): {'id': 4, 'attrs': {'foo': 'qux'}}}
+        res = sync_point.serialize_input_data(data)
+        self.assertEqual(['foo'], res['names'])
+        self.assertEqual(data, sync_point.deserialize_input_data(res))
+
+    def test_serialize_input_data_compressed(self):
+        cfg.CONF.set_override('sync_point_compress_threshold', 10,
+                              enforce_type=True)
+        data = {(3, True): {'id': 3, 'attrs': {('foo', 'x'): 'a' * 100}}}
+        res = sync_point.serialize_input_data(data)
+        self.assertEqual(['version', 'zlib'], sorted(res))
+        self.assertEqual(data, sync_point.deserialize_input_data(res))
+
+    def test_deserialize_legacy_input_data(self):
+        legacy = {'input_data': {u'tuple:(3, True)': {
+            'id': 3, 'attrs': {u"tuple:('foo', 'x')": 'bar', 'baz': 1}}}}
+        self.assertEqual({(3, True): {'id': 3,
+                                      'attrs': {('foo', 'x'): 'bar',
+                                                'baz': 1}}},
+                         sync_point.deserialize_input_data(legacy))
+        self.assertEqual({}, sync_point.deserialize_input_data({}))
+
+    def test_sync_propagates_once(self):
+        ctx = utils.dummy_context()
+        stack = tools.get_stack('test_stack', utils.dummy_context(),
+                                template=tools.string_template_five,
+                                convergence=True)
+        stack.converge_stack(stack.t, action=stack.CREATE)
+        resource = stack['A']
         graph = stack.convergence_dependencies.graph()
+        predecessors = set(graph[(resource.id, True)])
 
         mock_callback = mock.Mock()
-        self.assertRaises(exception.DBError, sync_point.sync, ctx, resource.id,
-                          stack.current_traversal, True, mock_callback,
-                          set(graph[(resource.id, True)]), {})
-        return mock_sleep_time
+        sync_point.sync(ctx, resource.id, stack.current_traversal, True,
+                        mock_callback, predecessors, {(3, True): None})
+        # a redelivered message must not propagate a second time
+        sync_point.sync(ctx, resource.id, stack.current_traversal, True,
+                        mock_callback, predecessors, {(3, True): None})
+        self.assertEqual(1, mock_callback.call_count)
 
-    def test_sync_with_time_throttle(self):
+        # a retrigger resends the sync point even though it was claimed
+        sync_point.sync(ctx, resource.id, stack.current_traversal, True,
+                        mock_callback, predecessors, {(3, True): None},
+                        force=True)
+        self.assertEqual(2, mock_callback.call_count)
+
+    def test_retrigger_after_claim(self):
         ctx = utils.dummy_context()
         stack = tools.get_stack('test_stack', utils.dummy_context(),
                                 template=tools.string_template_five,
                                 convergence=True)
         stack.converge_stack(stack.t, action=stack.CREATE)
-        mock_sleep_time = self.sync_with_sleep(ctx, stack)
-        mock_sleep_time.assert_called_once_with(mock.ANY)
+        resource = stack['A']
+        graph = stack.convergence_dependencies.graph()
+        predecessors = set(graph[(resource.id, True)])
+        rpc_client = mock.Mock()
+
+        check_resource.propagate_check_resource(
+            ctx, rpc_client, resource.id, stack.current_traversal,
+            predecessors, (3, True), None, True, None)
+        self.assertEqual(1, rpc_client.check_resource.call_count)
+
+        # the check for the new traversal was dropped, so it is retriggered
+        check_resource.propagate_check_resource(
+            ctx, rpc_client, resource.id, stack.current_traversal,
+            predecessors, (resource.id, True), None, True, None,
+            retrigger=True)
+        self.assertEqual(2, rpc_client.check_resource.call_count)
+
+    def test_sync_missing_sync_point(self):
+        ctx = utils.dummy_context()
+        self.patchobject(sync_point_object.SyncPoint, 'add_input_data',
+                         side_effect=exception.DBReferenceError(
+                             'sync_point_input', 'fk', 'entity_id',
+                             'sync_point'))
+        mock_callback = mock.Mock()
+        self.assertRaises(heat_exception.EntityNotFound, sync_point.sync,
+                          ctx, 'res-id', 'traversal-id', True,
+                          mock_callback, set(), {(3, True): None})
+        self.assertFalse(mock_callback.called)
@@ -0,0 +1,148 @@
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import mock
+from oslo_config import cfg
+
+from heat.common import exception
+from heat.common import service_utils
+from heat.engine import sync_point
+from heat.engine import sync_point_store
+from heat.objects import service as service_objects
+from heat.tests import common
+from heat.tests import utils
+
+
+class MemorySyncPointStoreTest(common.HeatTestCase):
+    def setUp(self):
+        super(MemorySyncPointStoreTest, self).setUp()
+        self.ctx = utils.dummy_context()
+        self.store = sync_point_store.MemorySyncPointStore()
+        self.patchobject(sync_point_store, 'get_store',
+                         return_value=self.store)
+
+    def test_add_input_data_missing(self):
+        self.assertRaises(exception.EntityNotFound,
+                          self.store.add_input_data, self.ctx,
+                          'res', 'trvsl', True, {})
+
+    def test_claim_once(self):
+        self.store.create(self.ctx, 'res', 'trvsl', True, 'stack')
+        self.assertTrue(self.store.claim(self.ctx, 'res', 'trvsl', True, {}))
+        self.assertFalse(self.store.claim(self.ctx, 'res', 'trvsl', True,
+                                          {}))
+        self.assertFalse(self.store.claim(self.ctx, 'other', 'trvsl', True,
+                                          {}))
+
+    def test_update_input_data(self):
+        self.store.create(self.ctx, 'res', 'trvsl', True, 'stack')
+        self.assertEqual(1, self.store.update_input_data(
+            self.ctx, 'res', 'trvsl', True, 0, {'a': 1}))
+        self.assertEqual(0, self.store.update_input_data(
+            self.ctx, 'res', 'trvsl', True, 0, {'b': 2}))
+        sp = sync_point.get(self.ctx, 'res', 'trvsl', True)
+        self.assertEqual(1, sp.atomic_key)
+        self.assertEqual({'a': 1}, sp.input_data)
+
+    def test_get_missing(self):
+        self.assertRaises(exception.EntityNotFound, sync_point.get,
+                          self.ctx, 'res', 'trvsl', True)
+
+    def test_delete_all(self):
+        self.store.create(self.ctx, 'res1', 'trvsl', True, 'stack')
+        self.store.create(self.ctx, 'res2', 'trvsl', False, 'stack')
+        self.store.create(self.ctx, 'res1', 'trvsl2', True, 'stack')
+        self.assertEqual(2, self.store.delete_all(self.ctx, 'stack',
+                                                  'trvsl'))
+        self.assertEqual([], self.store.get_all_input_data(
+            self.ctx, 'res1', 'trvsl', True))
+        self.store.add_input_data(self.ctx, 'res1', 'trvsl2', True, {})
+
+    def test_sync(self):
+        sync_point.create(self.ctx, 'res', 'trvsl', True, 'stack')
+        predecessors = {(1, True), (2, True)}
+        mock_callback = mock.Mock()
+
+        sync_point.sync(self.ctx, 'res', 'trvsl', True, mock_callback,
+                        predecessors, {(1, True): 'one'})
+        self.assertFalse(mock_callback.called)
+
+        sync_point.sync(self.ctx, 'res', 'trvsl', True, mock_callback,
+                        predecessors, {(2, True): 'two'})
+        sync_point.sync(self.ctx, 'res', 'trvsl', True, mock_callback,
+                        predecessors, {(2, True): 'two'})
+        self.assertEqual(1, mock_callback.call_count)
+        entity_id, data = mock_callback.call_args[0]
+        self.assertEqual('res', entity_id)
+        self.assertEqual({(1, True): 'one', (2, True): 'two'},
+                         sync_point.deserialize_input_data(data))
+
+
+class GetStoreTest(common.HeatTestCase):
+    def setUp(self):
+        super(GetStoreTest, self).setUp()
+        self.patchobject(sync_point_store, '_store', new=None)
+
+    def test_default_store(self):
+        self.assertIsInstance(sync_point_store.get_store(),
+                              sync_point_store.SQLSyncPointStore)
+
+    def test_memory_store(self):
+        cfg.CONF.set_override('sync_point_store', 'memory',
+                              enforce_type=True)
+        cfg.CONF.set_override('num_engine_workers', 1, enforce_type=True)
+        self.assertIsInstance(sync_point_store.get_store(),
+                              sync_point_store.MemorySyncPointStore)
+
+    def test_memory_store_multiple_workers(self):
+        cfg.CONF.set_override('sync_point_store', 'memory',
+                              enforce_type=True)
+        cfg.CONF.set_override('num_engine_workers', 2, enforce_type=True)
+        self.assertRaises(exception.Error, sync_point_store.get_store)
+
+
+class CheckDeploymentTest(common.HeatTestCase):
+    def setUp(self):
+        super(CheckDeploymentTest, self).setUp()
+        self.ctx = utils.dummy_context()
+        self.services = []
+        self.patchobject(service_objects.Service, 'get_all',
+                         return_value=self.services)
+        self.patchobject(service_utils, 'format_service',
+                         side_effect=lambda srv: srv)
+
+    def _add_engine(self, host, status='up'):
+        self.services.append({'binary': 'heat-engine', 'host': host,
+                              'status': status})
+
+    def test_shared_store(self):
+        self.patchobject(sync_point_store, '_store',
+                         new=sync_point_store.SQLSyncPointStore())
+        self._add_engine('other')
+        sync_point_store.check_deployment(self.ctx, 'host')
+
+    def test_memory_store_single_host(self):
+        self.patchobject(sync_point_store, '_store',
+                         new=sync_point_store.MemorySyncPointStore())
+        self._add_engine('host')
+        self._add_engine('other', status='down')
+        sync_point_store.check_deployment(self.ctx, 'host')
+
+    def test_memory_store_other_host(self):
+        self.patchobject(sync_point_store, '_store',
+                         new=sync_point_store.MemorySyncPointStore())
+        self._add_engine('host')
+        self._add_engine('other')
+        self.assertRaises(exception.Error, sync_point_store.check_deployment,
+                          self.ctx, 'host')
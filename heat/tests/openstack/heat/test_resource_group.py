@@ -436,6 +436,51 @@ class ResourceGroupTest(common.HeatTestCase):
         res_prop['listprop'] = list(res_prop['listprop'])
         self.assertEqual(expect, nested)
 
+    def test_index_var_shares_static_values(self):
+        stack = utils.parse_stack(template_repl)
+        snip = stack.t.resource_definitions(stack)['group1']
+        resg = resource_group.ResourceGroup('test', snip, stack)
+        static = {'a': ['b', {'c': 'd'}]}
+        res_def = {
+            'type': 'ResourceWithListProp%index%',
+            'metadata': None,
+            'properties': {
+                'Foo': 'Bar_%index%',
+                'static': static,
+                'mixed': {'static': static, 'name': ['x', '%index%']},
+            }
+        }
+
+        props0 = resg.build_resource_definition('0', res_def)._properties
+        props1 = resg.build_resource_definition('1', res_def)._properties
+        self.assertEqual({'Foo': 'Bar_0', 'static': static,
+                          'mixed': {'static': static, 'name': ['x', '0']}},
+                         props0)
+        self.assertEqual('Bar_1', props1['Foo'])
+        self.assertEqual(['x', '1'], props1['mixed']['name'])
+        for props in (props0, props1):
+            self.assertIs(static, props['static'])
+            self.assertIs(static, props['mixed']['static'])
+
+        # Existing members are not regenerated for an equal definition
+        same_def = copy.deepcopy(res_def)
+        self.assertIs(props0, resg.build_resource_definition(
+            '0', same_def)._properties)
+
+        res_def['properties']['Foo'] = 'Baz_%index%'
+        props0 = resg.build_resource_definition('0', res_def)._properties
+        self.assertEqual('Baz_0', props0['Foo'])
+
+    def test_index_var_no_replacement(self):
+        stack = utils.parse_stack(template_repl)
+        snip = stack.t.resource_definitions(stack)['group1']
+        resg = resource_group.ResourceGroup('test', snip, stack)
+        props = {'Foo': 'Bar', 'listprop': ['a', 'b']}
+        res_def = {'type': 'ResourceWithListProp%index%',
+                   'metadata': None, 'properties': props}
+        defn = resg.build_resource_definition('0', res_def)
+        self.assertIs(props, defn._properties)
+
     def test_assemble_no_properties(self):
         templ = copy.deepcopy(template)
         res_def = templ["resources"]["group1"]["properties"]['resource_def']
@@ -1539,6 +1539,7 @@ class ServersTest(common.HeatTestCase):
         self.assertEqual({'test': 123}, server.metadata_get())
 
         ud_tmpl.t['Resources']['WebServer']['Metadata'] = {'test': 456}
+        ud_tmpl.resources_changed()
         server.t = ud_tmpl.resource_definitions(server.stack)['WebServer']
 
         self.assertEqual({'test': 123}, server.metadata_get())
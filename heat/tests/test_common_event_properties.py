@@ -0,0 +1,38 @@
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from heat.common import event_properties
+from heat.tests import common
+
+
+class EventPropertiesTest(common.HeatTestCase):
+
+    props = {'Foo': 'bar', 'Baz': [1, 2, {'a': None}]}
+
+    def test_round_trip(self):
+        data = event_properties.dumps(self.props)
+        self.assertTrue(data.startswith(b'{'))
+        self.assertEqual(self.props, event_properties.loads(data))
+
+    def test_round_trip_compressed(self):
+        data = event_properties.dumps(self.props, compress=True)
+        self.assertFalse(data.startswith(b'{'))
+        self.assertEqual(self.props, event_properties.loads(data))
+
+    def test_compression_shrinks_large_properties(self):
+        props = {'Foo': 'A' * 10000}
+        self.assertLess(len(event_properties.dumps(props, compress=True)),
+                        len(event_properties.dumps(props)))
+
+    def test_loads_none(self):
+        self.assertIsNone(event_properties.loads(None))
@@ -71,6 +71,35 @@ class JSONResponseSerializerTest(common.HeatTestCase):
         self.assertEqual('application/json', response.content_type)
         self.assertEqual(b'{"key": "value"}', response.body)
 
+    def test_default_streamed(self):
+        def items():
+            for i in range(3):
+                yield {'id': i}
+
+        fixture = {'items': serializers.StreamedList(items()),
+                   'count': 3}
+        response = webob.Response()
+        serializers.JSONResponseSerializer().default(response, fixture)
+        self.assertEqual('application/json', response.content_type)
+        expected = {'items': [{'id': 0}, {'id': 1}, {'id': 2}], 'count': 3}
+        self.assertEqual(expected, json.loads(response.body))
+
+    def test_default_streamed_chunks(self):
+        self.patchobject(serializers, 'STREAM_CHUNK_SIZE', new=10)
+        fixture = {'items': serializers.StreamedList(
+            ['a' * 8, 'b' * 8, 'c' * 8])}
+        serializer = serializers.JSONResponseSerializer()
+        chunks = list(serializer.to_json_chunks(fixture))
+        self.assertEqual(5, len(chunks))
+        self.assertEqual({'items': ['a' * 8, 'b' * 8, 'c' * 8]},
+                         json.loads(b''.join(chunks)))
+
+    def test_default_streamed_empty(self):
+        fixture = {'items': serializers.StreamedList([])}
+        response = webob.Response()
+        serializers.JSONResponseSerializer().default(response, fixture)
+        self.assertEqual(b'{"items": []}', response.body)
+
 
 class XMLResponseSerializerTest(common.HeatTestCase):
 
@@ -18,6 +18,7 @@ from heat.common import template_format
 from heat.engine import environment
 from heat.engine import resource as res
 from heat.engine import stack as parser
+from heat.engine import sync_point
 from heat.engine import template as templatem
 from heat.objects import raw_template as raw_template_object
 from heat.objects import resource as resource_objects
@@ -71,7 +72,7 @@ class StackConvergenceCreateUpdateDeleteTest(common.HeatTestCase):
             expected_calls.append(
                 mock.call.worker_client.WorkerClient.check_resource(
                     stack.context, rsrc_id, stack.current_traversal,
-                    {'input_data': {}},
+                    sync_point.serialize_input_data({}),
                     is_update, None))
         self.assertEqual(expected_calls, mock_cr.mock_calls)
 
@@ -116,11 +117,11 @@ class StackConvergenceCreateUpdateDeleteTest(common.HeatTestCase):
 
         # check if sync_points were stored
         for entity_id in [5, 4, 3, 2, 1, stack_db.id]:
-            sync_point = sync_point_object.SyncPoint.get_by_key(
+            sp = sync_point_object.SyncPoint.get_by_key(
                 stack_db._context, entity_id, stack_db.current_traversal, True
             )
-            self.assertIsNotNone(sync_point)
-            self.assertEqual(stack_db.id, sync_point.stack_id)
+            self.assertIsNotNone(sp)
+            self.assertEqual(stack_db.id, sp.stack_id)
 
         leaves = stack.convergence_dependencies.leaves()
         expected_calls = []
@@ -128,7 +129,7 @@ class StackConvergenceCreateUpdateDeleteTest(common.HeatTestCase):
             expected_calls.append(
                 mock.call.worker_client.WorkerClient.check_resource(
                     stack.context, rsrc_id, stack.current_traversal,
-                    {'input_data': {}},
+                    sync_point.serialize_input_data({}),
                     is_update, None))
         self.assertEqual(expected_calls, mock_cr.mock_calls)
 
@@ -246,20 +247,20 @@ class StackConvergenceCreateUpdateDeleteTest(common.HeatTestCase):
         # check if sync_points are created for forward traversal
         # [F, H, G, A, B, Stack]
         for entity_id in [8, 7, 6, 5, 4, stack_db.id]:
-            sync_point = sync_point_object.SyncPoint.get_by_key(
+            sp = sync_point_object.SyncPoint.get_by_key(
                 stack_db._context, entity_id, stack_db.current_traversal, True
             )
-            self.assertIsNotNone(sync_point)
-            self.assertEqual(stack_db.id, sync_point.stack_id)
+            self.assertIsNotNone(sp)
+            self.assertEqual(stack_db.id, sp.stack_id)
 
         # check if sync_points are created for cleanup traversal
         # [A, B, C, D, E]
         for entity_id in [5, 4, 3, 2, 1]:
-            sync_point = sync_point_object.SyncPoint.get_by_key(
+            sp = sync_point_object.SyncPoint.get_by_key(
                 stack_db._context, entity_id, stack_db.current_traversal, False
             )
-            self.assertIsNotNone(sync_point)
-            self.assertEqual(stack_db.id, sync_point.stack_id)
+            self.assertIsNotNone(sp)
+            self.assertEqual(stack_db.id, sp.stack_id)
 
         leaves = stack.convergence_dependencies.leaves()
         expected_calls = []
@@ -267,7 +268,7 @@ class StackConvergenceCreateUpdateDeleteTest(common.HeatTestCase):
             expected_calls.append(
                 mock.call.worker_client.WorkerClient.check_resource(
                     stack.context, rsrc_id, stack.current_traversal,
-                    {'input_data': {}},
+                    sync_point.serialize_input_data({}),
                     is_update, None))
 
         leaves = curr_stack.convergence_dependencies.leaves()
@@ -275,7 +276,7 @@ class StackConvergenceCreateUpdateDeleteTest(common.HeatTestCase):
             expected_calls.append(
                 mock.call.worker_client.WorkerClient.check_resource(
                     curr_stack.context, rsrc_id, curr_stack.current_traversal,
-                    {'input_data': {}},
+                    sync_point.serialize_input_data({}),
                     is_update, None))
         self.assertEqual(expected_calls, mock_cr.mock_calls)
 
@@ -337,11 +338,11 @@ class StackConvergenceCreateUpdateDeleteTest(common.HeatTestCase):
             is_update = False
             if entity_id == stack_db.id:
                 is_update = True
-            sync_point = sync_point_object.SyncPoint.get_by_key(
+            sp = sync_point_object.SyncPoint.get_by_key(
                 stack_db._context, entity_id, stack_db.current_traversal,
                 is_update)
-            self.assertIsNotNone(sync_point, 'entity %s' % entity_id)
-            self.assertEqual(stack_db.id, sync_point.stack_id)
+            self.assertIsNotNone(sp, 'entity %s' % entity_id)
+            self.assertEqual(stack_db.id, sp.stack_id)
 
         leaves = stack.convergence_dependencies.leaves()
         expected_calls = []
@@ -349,7 +350,7 @@ class StackConvergenceCreateUpdateDeleteTest(common.HeatTestCase):
             expected_calls.append(
                 mock.call.worker_client.WorkerClient.check_resource(
                     stack.context, rsrc_id, stack.current_traversal,
-                    {'input_data': {}},
+                    sync_point.serialize_input_data({}),
                     is_update, None))
 
         leaves = curr_stack.convergence_dependencies.leaves()
@@ -357,7 +358,7 @@ class StackConvergenceCreateUpdateDeleteTest(common.HeatTestCase):
             expected_calls.append(
                 mock.call.worker_client.WorkerClient.check_resource(
                     curr_stack.context, rsrc_id, curr_stack.current_traversal,
-                    {'input_data': {}},
+                    sync_point.serialize_input_data({}),
                     is_update, None))
         self.assertEqual(expected_calls, mock_cr.mock_calls)
 
@@ -17,7 +17,6 @@ import mock
 import mox
 from oslo_config import cfg
 from oslo_messaging.rpc import dispatcher
-from oslo_serialization import jsonutils as json
 import six
 
 from heat.common import context
@@ -25,6 +24,7 @@ from heat.common import environment_util as env_util
 from heat.common import exception
 from heat.common import identifier
 from heat.common import template_format
+from heat.engine import api
 from heat.engine.cfn import template as cfntemplate
 from heat.engine import environment
 from heat.engine.hot import functions as hot_functions
@@ -327,25 +327,25 @@ class StackServiceAuthorizeTest(common.HeatTestCase):
 
     @tools.stack_context('service_authorize_user_attribute_error_test_stack')
     def test_stack_authorize_stack_user_attribute_error(self):
-        self.m.StubOutWithMock(json, 'loads')
-        json.loads(None).AndRaise(AttributeError)
-        self.m.ReplayAll()
+        # Patch the service module's reference only, so that loading the
+        # properties of the stack's events is unaffected.
+        mock_json = self.patchobject(service, 'jsonutils')
+        mock_json.loads.side_effect = AttributeError
         self.assertFalse(self.eng._authorize_stack_user(self.ctx,
                                                         self.stack,
                                                         'foo'))
-        self.m.VerifyAll()
+        mock_json.loads.assert_called_once_with(None)
 
     @tools.stack_context('service_authorize_stack_user_type_error_test_stack')
     def test_stack_authorize_stack_user_type_error(self):
-        self.m.StubOutWithMock(json, 'loads')
-        json.loads(mox.IgnoreArg()).AndRaise(TypeError)
-        self.m.ReplayAll()
+        mock_json = self.patchobject(service, 'jsonutils')
+        mock_json.loads.side_effect = TypeError
 
         self.assertFalse(self.eng._authorize_stack_user(self.ctx,
                                                         self.stack,
                                                         'foo'))
 
-        self.m.VerifyAll()
+        self.assertEqual(1, mock_json.loads.call_count)
 
     def test_stack_authorize_stack_user(self):
         self.ctx = utils.dummy_context()
@@ -496,7 +496,8 @@ class StackServiceTest(common.HeatTestCase):
                                                    tags=mock.ANY,
                                                    tags_any=mock.ANY,
                                                    not_tags=mock.ANY,
-                                                   not_tags_any=mock.ANY)
+                                                   not_tags_any=mock.ANY,
+                                                   summary=True)
 
     @mock.patch.object(stack_object.Stack, 'get_all')
     def test_stack_list_passes_filtering_info(self, mock_stack_get_all):
@@ -514,7 +515,8 @@ class StackServiceTest(common.HeatTestCase):
                                                    tags=mock.ANY,
                                                    tags_any=mock.ANY,
                                                    not_tags=mock.ANY,
-                                                   not_tags_any=mock.ANY)
+                                                   not_tags_any=mock.ANY,
+                                                   summary=True)
 
     @mock.patch.object(stack_object.Stack, 'get_all')
     def test_stack_list_passes_filter_translated(self, mock_stack_get_all):
@@ -533,7 +535,8 @@ class StackServiceTest(common.HeatTestCase):
                                                    tags=mock.ANY,
                                                    tags_any=mock.ANY,
                                                    not_tags=mock.ANY,
-                                                   not_tags_any=mock.ANY)
+                                                   not_tags_any=mock.ANY,
+                                                   summary=True)
 
     @mock.patch.object(stack_object.Stack, 'get_all')
     def test_stack_list_show_nested(self, mock_stack_get_all):
@@ -550,7 +553,8 @@ class StackServiceTest(common.HeatTestCase):
                                                    tags=mock.ANY,
                                                    tags_any=mock.ANY,
                                                    not_tags=mock.ANY,
-                                                   not_tags_any=mock.ANY)
+                                                   not_tags_any=mock.ANY,
+                                                   summary=True)
 
     @mock.patch.object(stack_object.Stack, 'get_all')
     def test_stack_list_show_deleted(self, mock_stack_get_all):
@@ -567,7 +571,8 @@ class StackServiceTest(common.HeatTestCase):
                                                    tags=mock.ANY,
                                                    tags_any=mock.ANY,
                                                    not_tags=mock.ANY,
-                                                   not_tags_any=mock.ANY)
+                                                   not_tags_any=mock.ANY,
+                                                   summary=True)
 
     @mock.patch.object(stack_object.Stack, 'get_all')
     def test_stack_list_show_hidden(self, mock_stack_get_all):
@@ -584,7 +589,8 @@ class StackServiceTest(common.HeatTestCase):
                                                    tags=mock.ANY,
                                                    tags_any=mock.ANY,
                                                    not_tags=mock.ANY,
-                                                   not_tags_any=mock.ANY)
+                                                   not_tags_any=mock.ANY,
+                                                   summary=True)
 
     @mock.patch.object(stack_object.Stack, 'get_all')
     def test_stack_list_tags(self, mock_stack_get_all):
@@ -601,7 +607,8 @@ class StackServiceTest(common.HeatTestCase):
                                                    tags=['foo', 'bar'],
                                                    tags_any=mock.ANY,
                                                    not_tags=mock.ANY,
-                                                   not_tags_any=mock.ANY)
+                                                   not_tags_any=mock.ANY,
+                                                   summary=True)
 
     @mock.patch.object(stack_object.Stack, 'get_all')
     def test_stack_list_tags_any(self, mock_stack_get_all):
@@ -618,7 +625,8 @@ class StackServiceTest(common.HeatTestCase):
                                                    tags=mock.ANY,
                                                    tags_any=['foo', 'bar'],
                                                    not_tags=mock.ANY,
-                                                   not_tags_any=mock.ANY)
+                                                   not_tags_any=mock.ANY,
+                                                   summary=True)
 
     @mock.patch.object(stack_object.Stack, 'get_all')
     def test_stack_list_not_tags(self, mock_stack_get_all):
@@ -635,7 +643,8 @@ class StackServiceTest(common.HeatTestCase):
                                                    tags=mock.ANY,
                                                    tags_any=mock.ANY,
                                                    not_tags=['foo', 'bar'],
-                                                   not_tags_any=mock.ANY)
+                                                   not_tags_any=mock.ANY,
+                                                   summary=True)
 
     @mock.patch.object(stack_object.Stack, 'get_all')
     def test_stack_list_not_tags_any(self, mock_stack_get_all):
@@ -652,7 +661,8 @@ class StackServiceTest(common.HeatTestCase):
                                                    tags=mock.ANY,
                                                    tags_any=mock.ANY,
                                                    not_tags=mock.ANY,
-                                                   not_tags_any=['foo', 'bar'])
+                                                   not_tags_any=['foo', 'bar'],
+                                                   summary=True)
 
     @mock.patch.object(stack_object.Stack, 'count_all')
     def test_count_stacks_passes_filter_info(self, mock_stack_count_all):
@@ -1072,6 +1082,25 @@ class StackServiceTest(common.HeatTestCase):
         self.assertEqual('Specified output key bunny not found.',
                          six.text_type(ex.exc_info[1]))
 
+    def test_stack_show_outputs(self):
+        t = template_format.parse(tools.wp_template)
+        t['outputs'] = {'test': {'value': 'first', 'description': 'sec'},
+                        'test2': {'value': 'sec'}}
+        tmpl = templatem.Template(t)
+        stack = parser.Stack(self.ctx, 'service_list_outputs_stack', tmpl)
+
+        self.patchobject(self.eng, '_get_stack')
+        self.patchobject(parser.Stack, 'load', return_value=stack)
+        format_output = self.patchobject(api, 'format_stack_output',
+                                         wraps=api.format_stack_output)
+
+        outputs = self.eng.show_outputs(self.ctx, mock.ANY,
+                                        ['test', 'bunny'])
+        self.assertEqual([{'output_key': 'test', 'output_value': 'first',
+                           'description': 'sec'}],
+                         outputs)
+        format_output.assert_called_once_with(stack.outputs['test'])
+
     def test_stack_show_output_error(self):
         t = template_format.parse(tools.wp_template)
         t['outputs'] = {'test': {'value': 'first', 'description': 'sec'}}
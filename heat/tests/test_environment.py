@@ -63,6 +63,32 @@ class EnvironmentTest(common.HeatTestCase):
         del(new_env['encrypted_param_names'])
         self.assertEqual(new_env, env.user_env_as_dict())
 
+    def test_concurrency_limits(self):
+        limits = {u'max_resources': 10,
+                  u'resource_types': {u'OS::Neutron::Port': 2}}
+        env = environment.Environment({u'concurrency_limits': limits})
+        self.assertEqual(10, env.get_concurrency_limit())
+        self.assertEqual(2, env.get_concurrency_limit('OS::Neutron::Port'))
+        self.assertIsNone(env.get_concurrency_limit('OS::Nova::Server'))
+        self.assertEqual(limits,
+                         env.user_env_as_dict()[u'concurrency_limits'])
+
+        env.load({u'concurrency_limits': {
+            u'resource_types': {u'OS::Nova::Server': 5}}})
+        self.assertEqual(10, env.get_concurrency_limit())
+        self.assertEqual(2, env.get_concurrency_limit('OS::Neutron::Port'))
+        self.assertEqual(5, env.get_concurrency_limit('OS::Nova::Server'))
+
+    def test_concurrency_limits_invalid(self):
+        for limits in ({u'max_resources': 0},
+                       {u'max_resources': u'ten'},
+                       {u'resource_types': {u'OS::Neutron::Port': -1}},
+                       {u'resource_types': [u'OS::Neutron::Port']},
+                       {u'max_ports': 1}):
+            self.assertRaises(exception.StackValidationFailed,
+                              environment.Environment,
+                              {u'concurrency_limits': limits})
+
     def test_global_registry(self):
         self.g_env.register_class('CloudX::Nova::Server',
                                   generic_resource.GenericResource)
@@ -15,6 +15,8 @@ import mock
 from oslo_config import cfg
 import oslo_db.exception
 
+from heat.common import event_properties
+from heat.db.sqlalchemy import models
 from heat.engine import event
 from heat.engine import rsrc_defn
 from heat.engine import stack
@@ -27,6 +29,8 @@ from heat.tests import utils
 
 cfg.CONF.import_opt('event_purge_batch_size', 'heat.common.config')
 cfg.CONF.import_opt('max_events_per_stack', 'heat.common.config')
+cfg.CONF.import_opt('compress_event_properties', 'heat.common.config')
+cfg.CONF.import_opt('event_write_behind', 'heat.common.config')
 
 tmpl = {
     'HeatTemplateFormatVersion': '2012-12-12',
@@ -178,6 +182,89 @@ class EventTest(EventCommon):
         self.assertEqual(expected, e.as_dict())
 
 
+class EventWriteBehindTest(EventCommon):
+
+    def setUp(self):
+        super(EventWriteBehindTest, self).setUp()
+        cfg.CONF.set_override('event_write_behind', True, enforce_type=True)
+        cfg.CONF.set_override('event_write_behind_batch_size', 3,
+                              enforce_type=True)
+        self._setup_stack(tmpl)
+        self.addCleanup(event.flush_pending)
+
+    def _event(self, phys_id='wibble'):
+        return event.Event(self.ctx, self.stack, 'TEST', 'IN_PROGRESS',
+                           'Testing', phys_id, self.resource.properties,
+                           self.resource.name, self.resource.type())
+
+    def _count(self):
+        return event_object.Event.count_all_by_stack(self.ctx, self.stack.id)
+
+    def test_store_is_buffered(self):
+        e = self._event()
+        e.store()
+        self.assertIsNone(e.id)
+        self.assertIsNotNone(e.uuid)
+        self.assertIsNotNone(e.timestamp)
+        self.assertIsNotNone(e.identifier())
+        self.assertEqual(0, self._count())
+
+        event.flush_pending()
+        events = event_object.Event.get_all_by_stack(self.ctx, self.stack.id)
+        self.assertEqual(1, len(events))
+        self.assertEqual(e.uuid, events[0].uuid)
+
+    def test_flush_on_batch_size(self):
+        for i in range(2):
+            self._event().store()
+        self.assertEqual(0, self._count())
+        self._event().store()
+        self.assertEqual(3, self._count())
+
+    def test_flush_on_stack_state_change(self):
+        self._event().store()
+        self.assertEqual(0, self._count())
+        self.stack.state_set(self.stack.CREATE, self.stack.IN_PROGRESS,
+                             'Testing')
+        events = event_object.Event.get_all_by_stack(self.ctx, self.stack.id)
+        self.assertEqual(2, len(events))
+        self.assertEqual(set(['EventTestResource', self.stack.name]),
+                         set(ev.resource_name for ev in events))
+
+    def test_batch_caps_events(self):
+        cfg.CONF.set_override('event_purge_batch_size', 1, enforce_type=True)
+        cfg.CONF.set_override('max_events_per_stack', 2, enforce_type=True)
+        for phys_id in ('alabama', 'arizona', 'arkansas'):
+            self._event(phys_id).store()
+        self.assertEqual(2, self._count())
+
+    @mock.patch.object(event_object.Event, 'create')
+    @mock.patch.object(event_object.Event, 'create_batch')
+    def test_batch_fail_falls_back(self, mock_batch, mock_create):
+        mock_batch.side_effect = oslo_db.exception.DBError
+        e = self._event()
+        e.store()
+        event.flush_pending()
+        self.assertEqual(1, mock_batch.call_count)
+        self.assertEqual(1, mock_create.call_count)
+        self.assertEqual(e.uuid, mock_create.call_args[0][1]['uuid'])
+
+    @mock.patch.object(event_object.Event, 'create')
+    @mock.patch.object(event_object.Event, 'create_batch')
+    def test_event_fail_does_not_propagate(self, mock_batch, mock_create):
+        mock_batch.side_effect = oslo_db.exception.DBError
+        mock_create.side_effect = [oslo_db.exception.DBError,
+                                   oslo_db.exception.DBError,
+                                   mock.Mock(), mock.Mock()]
+        for phys_id in ('alabama', 'arizona'):
+            self._event(phys_id).store()
+        # The third event fills the batch, so the failure to write the first
+        # one happens in its store() call
+        self.assertIsNone(self._event('arkansas').store())
+        self.assertEqual(0, len(event._write_behind_queue))
+        self.assertEqual(4, mock_create.call_count)
+
+
 class EventTestSingleLargeProp(EventCommon):
 
     def setUp(self):
@@ -201,6 +288,23 @@ class EventTestSingleLargeProp(EventCommon):
              'Error': 'Resource properties are too large to store fully'},
             ev['resource_properties'])
 
+    def test_too_large_single_prop_compressed(self):
+        cfg.CONF.set_override('compress_event_properties', True,
+                              enforce_type=True)
+        self.resource.resource_id_set('resource_physical_id')
+
+        e = event.Event(self.ctx, self.stack, 'TEST', 'IN_PROGRESS', 'Testing',
+                        'alabama', self.resource.properties,
+                        self.resource.name, self.resource.type())
+        e.store()
+        ev = event_object.Event.get_by_id(self.ctx, e.id)
+
+        self.assertEqual(
+            {'Foo1': 'zoo',
+             'Foo2': 'A' * (1 << 16),
+             'Foo3': '99999'},
+            ev['resource_properties'])
+
 
 class EventTestMultipleLargeProp(EventCommon):
 
@@ -223,6 +327,28 @@ class EventTestMultipleLargeProp(EventCommon):
             ev['resource_properties'])
 
 
+class EventTestLegacyProps(EventCommon):
+
+    def setUp(self):
+        super(EventTestLegacyProps, self).setUp()
+        self._setup_stack(tmpl)
+
+    def test_load_pickled_props(self):
+        e = event.Event(self.ctx, self.stack, 'TEST', 'IN_PROGRESS', 'Testing',
+                        'wibble', self.resource.properties,
+                        self.resource.name, self.resource.type())
+        e.store()
+        # Simulate an event stored before the properties were held as JSON
+        db_ev = self.ctx.session.query(models.Event).get(e.id)
+        with self.ctx.session.begin():
+            db_ev.resource_properties_data = None
+            db_ev._resource_properties = {'Foo': 'legacy'}
+        self.ctx.session.expire_all()
+
+        ev = event_object.Event.get_by_id(self.ctx, e.id)
+        self.assertEqual({'Foo': 'legacy'}, ev['resource_properties'])
+
+
 class EventTestStoreProps(EventCommon):
 
     def setUp(self):
@@ -247,7 +373,8 @@ class EventTestStoreProps(EventCommon):
             except IndexError:
                 self.assertEqual(
                     {'Error': 'Resource properties are too large to store'},
-                    args[1]['resource_properties'])
+                    event_properties.loads(
+                        args[1]['resource_properties_data']))
                 return ev
 
         with mock.patch("heat.objects.event.Event") as mock_event:
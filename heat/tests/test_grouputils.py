@@ -11,11 +11,14 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import datetime
+
 import mock
 import six
 
 from heat.common import grouputils
 from heat.common import template_format
+from heat.engine.resources import stack_resource
 from heat.engine import rsrc_defn
 from heat.tests import common
 from heat.tests import utils
@@ -88,3 +91,33 @@ class GroupUtilsTest(common.HeatTestCase):
         self.assertEqual([rsrc_ok], grouputils.get_members(group))
         self.assertEqual(['ID-r1'], grouputils.get_member_refids(group))
         self.assertEqual(['r1'], grouputils.get_member_names(group))
+
+    def test_member_view_from_summaries(self):
+        class Group(object):
+            def nested_resource_summaries(self):
+                return summaries
+
+        def summary(name, status, created_at):
+            return stack_resource.ResourceSummary(name, 'CREATE', status,
+                                                  created_at, 'id-' + name)
+
+        now = datetime.datetime(2016, 7, 1, 12, 0)
+        later = now + datetime.timedelta(seconds=1)
+        summaries = [summary('r2', 'COMPLETE', now),
+                     summary('r1', 'COMPLETE', later),
+                     summary('r0', 'COMPLETE', now),
+                     summary('r3', 'FAILED', now)]
+        group = Group()
+
+        self.assertEqual([grouputils.Member('r0', 'COMPLETE', now, 'id-r0'),
+                          grouputils.Member('r2', 'COMPLETE', now, 'id-r2'),
+                          grouputils.Member('r1', 'COMPLETE', later,
+                                            'id-r1')],
+                         grouputils.get_member_view(group))
+        self.assertEqual(['r3', 'r0', 'r2', 'r1'],
+                         [m.name for m in grouputils.get_member_view(
+                             group, include_failed=True)])
+        self.assertEqual(3, grouputils.get_size(group))
+        self.assertEqual(4, grouputils.get_size(group, include_failed=True))
+        self.assertEqual(['r0', 'r2', 'r1'],
+                         grouputils.get_member_names(group))
@@ -305,8 +305,9 @@ Resources:
         nested_stack.store()
 
         stack_res._rpc_client = mock.MagicMock()
-        stack_res._rpc_client.show_stack.return_value = [
-            api.format_stack(nested_stack)]
+        stack_res._rpc_client.show_outputs.return_value = (
+            api.format_stack_outputs(nested_stack.outputs,
+                                     resolve_value=True))
         stack_res.nested_identifier = mock.Mock()
         stack_res.nested_identifier.return_value = {'foo': 'bar'}
         self.assertEqual('bar', stack_res.FnGetAtt('Outputs.Foo'))
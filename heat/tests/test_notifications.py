@@ -12,10 +12,12 @@
 #    under the License.
 
 import mock
+from oslo_config import cfg
 from oslo_utils import timeutils
 
 from heat.common import timeutils as heat_timeutils
 from heat.engine import notification
+from heat.engine.notification import scheduler as scheduler_notification
 from heat.tests import common
 from heat.tests import utils
 
@@ -140,3 +142,17 @@ class AutoScaleTest(common.HeatTestCase):
              'state': 'x_f', 'adjustment_type': 'y',
              'groupname': 'c', 'capacity': '5',
              'message': 'error', 'adjustment': 'x'})
+
+
+class SchedulerTest(common.HeatTestCase):
+
+    def test_send(self):
+        ctx = utils.dummy_context()
+        notify = self.patchobject(notification, 'notify')
+        stats = {'running': 2, 'queued': 1, 'queued_by_tenant': {'t': 1}}
+
+        scheduler_notification.send(ctx, stats)
+        notify.assert_called_once_with(
+            ctx, 'scheduler.stats', 'INFO',
+            {'running': 2, 'queued': 1, 'queued_by_tenant': {'t': 1},
+             'host': cfg.CONF.host})
@@ -276,9 +276,9 @@ class ProviderTemplateTest(common.HeatTestCase):
         temp_res.nested_identifier.return_value = {'foo': 'bar'}
 
         temp_res._rpc_client = mock.MagicMock()
-        output = {'outputs': [{'output_key': 'Blarg',
-                               'output_value': 'fluffy'}]}
-        temp_res._rpc_client.show_stack.return_value = [output]
+        outputs = [{'output_key': 'Blarg',
+                    'output_value': 'fluffy'}]
+        temp_res._rpc_client.show_outputs.return_value = outputs
         self.assertRaises(exception.InvalidTemplateAttribute,
                           temp_res.FnGetAtt, 'Foo')
 
@@ -316,9 +316,9 @@ class ProviderTemplateTest(common.HeatTestCase):
         temp_res.nested_identifier.return_value = {'foo': 'bar'}
 
         temp_res._rpc_client = mock.MagicMock()
-        output = {'outputs': [{'output_key': 'Foo', 'output_value': None,
-                               'output_error': 'it is all bad'}]}
-        temp_res._rpc_client.show_stack.return_value = [output]
+        outputs = [{'output_key': 'Foo', 'output_value': None,
+                    'output_error': 'it is all bad'}]
+        temp_res._rpc_client.show_outputs.return_value = outputs
         self.assertRaises(exception.InvalidTemplateAttribute,
                           temp_res.FnGetAtt, 'Foo')
 
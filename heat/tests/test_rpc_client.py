@@ -397,6 +397,11 @@ class EngineRpcAPITestCase(common.HeatTestCase):
             'show_output', 'call', stack_identity=self.identity,
             output_key='test', version='1.19')
 
+    def test_stack_show_outputs(self):
+        self._test_engine_api(
+            'show_outputs', 'call', stack_identity=self.identity,
+            output_keys=['test'], version='1.36')
+
     def test_export_stack(self):
         self._test_engine_api('export_stack',
                               'call',
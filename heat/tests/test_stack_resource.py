@@ -17,6 +17,7 @@ import uuid
 import mock
 from oslo_config import cfg
 from oslo_messaging import exceptions as msg_exceptions
+from oslo_messaging.rpc import dispatcher
 from oslo_serialization import jsonutils
 import six
 
@@ -28,6 +29,7 @@ from heat.engine.resources import stack_resource
 from heat.engine import stack as parser
 from heat.engine import template as templatem
 from heat.objects import raw_template
+from heat.objects import resource as resource_objects
 from heat.objects import stack as stack_object
 from heat.objects import stack_lock
 from heat.tests import common
@@ -502,6 +504,62 @@ class StackResourceTest(StackResourceBaseTest):
         self.parent_resource._nested = 'gotthis'
         self.assertEqual('gotthis', self.parent_resource.nested())
 
+    def test_nested_resource_summaries_from_db(self):
+        self.parent_resource._nested = None
+        self.parent_resource.resource_id = 'nested_id'
+
+        def row(id, name, action, status):
+            r = mock.Mock(id=id, action=action, status=status,
+                          created_at='t%d' % id,
+                          physical_resource_id='p%d' % id)
+            # name is an argument of the Mock constructor, so set it after
+            r.name = name
+            return r
+
+        rows = [row(1, 'a', 'CREATE', 'COMPLETE'),
+                row(2, 'b', 'DELETE', 'COMPLETE'),
+                row(3, 'c', 'CREATE', 'FAILED'),
+                row(4, 'c', 'CREATE', 'COMPLETE'),
+                row(5, 'd', 'INIT', 'COMPLETE')]
+        # 'd' was added by an update that failed, and is not in the
+        # template of the nested stack
+        tmpl = templatem.Template({
+            'heat_template_version': '2013-05-23',
+            'resources': {'a': {'type': 'GenericResource'},
+                          'b': {'type': 'GenericResource'},
+                          'c': {'type': 'GenericResource'}}})
+        self.patchobject(stack_object.Stack, 'get_by_id')
+        self.patchobject(templatem.Template, 'load', return_value=tmpl)
+        get_summaries = self.patchobject(resource_objects.Resource,
+                                         'get_summaries_by_stack',
+                                         return_value=rows)
+
+        summaries = self.parent_resource.nested_resource_summaries()
+        self.assertEqual(
+            [stack_resource.ResourceSummary('a', 'CREATE', 'COMPLETE',
+                                            't1', 'p1'),
+             stack_resource.ResourceSummary('c', 'CREATE', 'COMPLETE',
+                                            't4', 'p4')],
+            sorted(summaries))
+        self.assertIs(summaries,
+                      self.parent_resource.nested_resource_summaries())
+        get_summaries.assert_called_once_with(self.parent_resource.context,
+                                              'nested_id')
+
+    def test_nested_resource_summaries_loaded(self):
+        res = mock.Mock(action='CREATE', status='COMPLETE',
+                        created_time='t1', resource_id='p1')
+        res.name = 'a'
+        self.parent_resource._nested = {'a': res}
+        get_summaries = self.patchobject(resource_objects.Resource,
+                                         'get_summaries_by_stack')
+
+        self.assertEqual(
+            [stack_resource.ResourceSummary('a', 'CREATE', 'COMPLETE',
+                                            't1', 'p1')],
+            self.parent_resource.nested_resource_summaries())
+        self.assertFalse(get_summaries.called)
+
     def test_delete_nested_none_nested_stack(self):
         self.parent_resource._nested = None
         self.assertIsNone(self.parent_resource.delete_nested())
@@ -626,18 +684,66 @@ class StackResourceAttrTest(StackResourceBaseTest):
         self.parent_resource.nested_identifier.return_value = {'foo': 'bar'}
 
         self.parent_resource._rpc_client = mock.MagicMock()
-        output = {'outputs': [{'output_key': 'key', 'output_value': 'value'}]}
-        self.parent_resource._rpc_client.show_stack.return_value = [output]
+        outputs = [{'output_key': 'key', 'output_value': 'value'}]
+        self.parent_resource._rpc_client.show_outputs.return_value = outputs
+
+        self.assertEqual("value", self.parent_resource.get_output("key"))
+        self.parent_resource._rpc_client.show_outputs.assert_called_once_with(
+            self.parent_resource.context, {'foo': 'bar'}, ['key'])
+
+    def test_get_output_referenced_keys(self):
+        self.parent_resource.nested_identifier = mock.Mock()
+        self.parent_resource.nested_identifier.return_value = {'foo': 'bar'}
+        self.patchobject(self.parent_resource, '_referenced_outputs',
+                         return_value={'key', 'other'})
+
+        self.parent_resource._rpc_client = mock.MagicMock()
+        outputs = [{'output_key': 'key', 'output_value': 'value'},
+                   {'output_key': 'other', 'output_value': 'more'}]
+        self.parent_resource._rpc_client.show_outputs.return_value = outputs
+
+        self.assertEqual("value", self.parent_resource.get_output("key"))
+        self.assertEqual("more", self.parent_resource.get_output("other"))
+        self.parent_resource._rpc_client.show_outputs.assert_called_once_with(
+            self.parent_resource.context, {'foo': 'bar'}, ['key', 'other'])
+
+    def test_get_output_none_refetched(self):
+        self.parent_resource.nested_identifier = mock.Mock()
+        self.parent_resource.nested_identifier.return_value = {'foo': 'bar'}
+
+        self.parent_resource._rpc_client = mock.MagicMock()
+        self.parent_resource._rpc_client.show_outputs.side_effect = [
+            [{'output_key': 'key', 'output_value': None}],
+            [{'output_key': 'key', 'output_value': 'value'}]]
 
+        self.assertIsNone(self.parent_resource.get_output("key"))
         self.assertEqual("value", self.parent_resource.get_output("key"))
+        self.assertEqual(
+            2, self.parent_resource._rpc_client.show_outputs.call_count)
+
+    def test_referenced_outputs(self):
+        tmpl = templatem.Template(
+            {'HeatTemplateFormatVersion': '2012-12-12',
+             'Resources': {
+                 self.ws_resname: ws_res_snippet,
+                 'dependent': {
+                     'Type': 'GenericResourceType',
+                     'Properties': {
+                         'Foo': {'Fn::GetAtt': [self.ws_resname, 'a']}}}},
+             'Outputs': {
+                 'out': {'Value': {'Fn::GetAtt': [self.ws_resname, 'b']}}}})
+        stack = parser.Stack(self.ctx, 'test_stack', tmpl,
+                             stack_id=str(uuid.uuid4()))
+        rsrc = stack[self.ws_resname]
+        self.assertEqual({'a', 'b'}, rsrc._referenced_outputs())
 
     def test_get_output_key_not_found(self):
         self.parent_resource.nested_identifier = mock.Mock()
         self.parent_resource.nested_identifier.return_value = {'foo': 'bar'}
 
         self.parent_resource._rpc_client = mock.MagicMock()
-        output = {'outputs': []}
-        self.parent_resource._rpc_client.show_stack.return_value = [output]
+        outputs = []
+        self.parent_resource._rpc_client.show_outputs.return_value = outputs
 
         self.assertRaises(exception.InvalidTemplateAttribute,
                           self.parent_resource.get_output,
@@ -648,8 +754,8 @@ class StackResourceAttrTest(StackResourceBaseTest):
         self.parent_resource.nested_identifier.return_value = {'foo': 'bar'}
 
         self.parent_resource._rpc_client = mock.MagicMock()
-        output = {'outputs': [{'output_key': 'key', 'output_value': 'value'}]}
-        self.parent_resource._rpc_client.show_stack.return_value = [output]
+        outputs = [{'output_key': 'key', 'output_value': 'value'}]
+        self.parent_resource._rpc_client.show_outputs.return_value = outputs
 
         self.assertEqual('value',
                          self.parent_resource._resolve_attribute("key"))
@@ -659,9 +765,9 @@ class StackResourceAttrTest(StackResourceBaseTest):
         self.parent_resource.nested_identifier.return_value = {'foo': 'bar'}
 
         self.parent_resource._rpc_client = mock.MagicMock()
-        output = {'outputs': [{'output_key': 'key',
-                               'output_value': {'a': 1, 'b': 2}}]}
-        self.parent_resource._rpc_client.show_stack.return_value = [output]
+        outputs = [{'output_key': 'key',
+                    'output_value': {'a': 1, 'b': 2}}]
+        self.parent_resource._rpc_client.show_outputs.return_value = outputs
 
         self.assertEqual({'a': 1, 'b': 2},
                          self.parent_resource._resolve_attribute("key"))
@@ -671,9 +777,9 @@ class StackResourceAttrTest(StackResourceBaseTest):
         self.parent_resource.nested_identifier.return_value = {'foo': 'bar'}
 
         self.parent_resource._rpc_client = mock.MagicMock()
-        output = {'outputs': [{'output_key': 'key',
-                               'output_value': [1, 2, 3]}]}
-        self.parent_resource._rpc_client.show_stack.return_value = [output]
+        outputs = [{'output_key': 'key',
+                    'output_value': [1, 2, 3]}]
+        self.parent_resource._rpc_client.show_outputs.return_value = outputs
 
         self.assertEqual([1, 2, 3],
                          self.parent_resource._resolve_attribute("key"))
@@ -1007,6 +1113,92 @@ class WithTemplateTest(StackResourceBaseTest):
                           self.ctx, template_id.match)
 
 
+class InProcessEngineTest(StackResourceBaseTest):
+
+    def setUp(self):
+        super(InProcessEngineTest, self).setUp()
+        cfg.CONF.set_override('local_nested_stack_operations', True,
+                              enforce_type=True)
+        self.engine = mock.Mock(engine_id='engine-1')
+        stack_resource.set_local_engine(self.engine)
+        self.addCleanup(stack_resource.set_local_engine, None)
+        self.lock_engine = self.patchobject(stack_lock.StackLock,
+                                            'get_engine_id',
+                                            return_value='engine-1')
+        self.rpcc = mock.Mock()
+        self.parent_resource.rpc_client = self.rpcc
+        self.parent_resource.child_params = mock.Mock(return_value={})
+
+    def test_create_in_process(self):
+        self.engine.create_stack.return_value = {'stack_id': 'pancakes'}
+        self.parent_resource.create_with_template(self.empty_temp)
+
+        self.assertEqual('pancakes', self.parent_resource.resource_id)
+        self.assertFalse(self.rpcc.return_value._create_stack.called)
+        self.lock_engine.assert_called_once_with(self.ctx,
+                                                 self.parent_stack.id)
+        args, kwargs = self.engine.create_stack.call_args
+        self.assertIsNot(self.ctx, args[0])
+        self.assertEqual(self.ctx.tenant_id, args[0].tenant_id)
+        parsed = kwargs['parsed_template']
+        self.assertIsInstance(parsed, templatem.Template)
+        self.assertEqual(parsed.id, kwargs['template_id'])
+        self.assertEqual(self.parent_stack.id, kwargs['owner_id'])
+
+    def test_create_lock_held_by_other_engine(self):
+        self.lock_engine.return_value = 'engine-2'
+        self.rpcc.return_value._create_stack.return_value = {
+            'stack_id': 'pancakes'}
+        self.parent_resource.create_with_template(self.empty_temp)
+
+        self.assertFalse(self.engine.create_stack.called)
+        kwargs = self.rpcc.return_value._create_stack.call_args[1]
+        self.assertNotIn('parsed_template', kwargs)
+
+    def test_create_disabled(self):
+        cfg.CONF.set_override('local_nested_stack_operations', False,
+                              enforce_type=True)
+        self.rpcc.return_value._create_stack.return_value = {
+            'stack_id': 'pancakes'}
+        self.parent_resource.create_with_template(self.empty_temp)
+
+        self.assertFalse(self.engine.create_stack.called)
+        self.assertFalse(self.lock_engine.called)
+        self.assertTrue(self.rpcc.return_value._create_stack.called)
+
+    def test_create_failure(self):
+        try:
+            raise exception.StackValidationFailed(message='oops')
+        except exception.StackValidationFailed:
+            expected = dispatcher.ExpectedException()
+        self.engine.create_stack.side_effect = expected
+
+        self.assertRaises(exception.StackValidationFailed,
+                          self.parent_resource.create_with_template,
+                          self.empty_temp)
+        template_id = self.engine.create_stack.call_args[1]['template_id']
+        self.assertRaises(exception.NotFound,
+                          raw_template.RawTemplate.get_by_id,
+                          self.ctx, template_id)
+
+    def test_update_in_process(self):
+        ident = identifier.HeatIdentifier(self.ctx.tenant_id, 'fake_name',
+                                          'pancakes')
+        self.parent_resource.resource_id = ident.stack_id
+        self.parent_resource.nested_identifier = mock.Mock(return_value=ident)
+        self.engine.update_stack.return_value = dict(ident)
+
+        status = ('CREATE', 'COMPLETE', '', 'now_time')
+        with self.patchobject(stack_object.Stack, 'get_status',
+                              return_value=status):
+            self.parent_resource.update_with_template(self.empty_temp)
+
+        self.assertFalse(self.rpcc.return_value._update_stack.called)
+        kwargs = self.engine.update_stack.call_args[1]
+        self.assertEqual(dict(ident), kwargs['stack_identity'])
+        self.assertIsInstance(kwargs['parsed_template'], templatem.Template)
+
+
 class RaiseLocalException(StackResourceBaseTest):
 
     def test_heat_exception(self):
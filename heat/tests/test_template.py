@@ -16,6 +16,8 @@ import hashlib
 import json
 
 import fixtures
+import mock
+from oslo_config import cfg
 from oslotest import mockpatch
 import six
 from stevedore import extension
@@ -1485,6 +1487,143 @@ class TemplateTest(common.HeatTestCase):
         self.assertEqual(hot_tmpl.env, empty_template.env)
 
 
+class TemplateCacheTest(common.HeatTestCase):
+
+    def setUp(self):
+        super(TemplateCacheTest, self).setUp()
+        self.ctx = utils.dummy_context()
+
+    def _store(self, tmpl_data=None):
+        tmpl = template.Template(copy.deepcopy(tmpl_data or empty_template))
+        return tmpl.store(self.ctx)
+
+    def test_lru_eviction(self):
+        cache = template.TemplateCache(10)
+        cache.put(1, 'one', 4)
+        cache.put(2, 'two', 4)
+        self.assertEqual('one', cache.get(1))
+        cache.put(3, 'three', 4)
+
+        self.assertNotIn(2, cache)
+        self.assertIn(1, cache)
+        self.assertIn(3, cache)
+        self.assertEqual(8, cache.size)
+        self.assertEqual(1, cache.evictions)
+
+    def test_oversized_entry_not_cached(self):
+        cache = template.TemplateCache(10)
+        cache.put(1, 'one', 11)
+        self.assertEqual(0, len(cache))
+        self.assertEqual(0, cache.size)
+
+    def test_stats(self):
+        cache = template.TemplateCache(10)
+        cache.put(1, 'one', 4)
+        cache.get(1)
+        cache.get(2)
+        self.assertEqual({'entries': 1, 'size': 4, 'max_size': 10,
+                          'hits': 1, 'misses': 1, 'evictions': 0},
+                         cache.stats())
+
+    def test_load_cached(self):
+        tmpl_id = self._store()
+        with mock.patch.object(template.Template, 'load',
+                               wraps=template.Template.load) as mock_load:
+            t1 = template.Template.load_cached(self.ctx, tmpl_id)
+            t2 = template.Template.load_cached(self.ctx, tmpl_id)
+        self.assertIs(t1, t2)
+        self.assertEqual(1, mock_load.call_count)
+        stats = template.get_template_cache().stats()
+        self.assertEqual(1, stats['hits'])
+        self.assertEqual(1, stats['misses'])
+
+    def test_load_cached_disabled(self):
+        cfg.CONF.set_override('template_cache_max_size', 0,
+                              enforce_type=True)
+        tmpl_id = self._store()
+        t1 = template.Template.load_cached(self.ctx, tmpl_id)
+        t2 = template.Template.load_cached(self.ctx, tmpl_id)
+        self.assertIsNot(t1, t2)
+        self.assertEqual(0, len(template.get_template_cache()))
+
+    def test_store_invalidates(self):
+        tmpl_id = self._store()
+        t1 = template.Template.load_cached(self.ctx, tmpl_id)
+        t = template.Template.load(self.ctx, tmpl_id)
+        t.t['Description'] = 'updated'
+        t.store(self.ctx)
+
+        t2 = template.Template.load_cached(self.ctx, tmpl_id)
+        self.assertIsNot(t1, t2)
+        self.assertEqual('updated', t2.t['Description'])
+
+
+class ResourceDefinitionsCacheTest(common.HeatTestCase):
+
+    def setUp(self):
+        super(ResourceDefinitionsCacheTest, self).setUp()
+        self.ctx = utils.dummy_context()
+        self.tmpl = template.Template({
+            'heat_template_version': '2016-10-14',
+            'resources': {
+                'foo': {'type': 'GenericResourceType'},
+                'bar': {'type': 'GenericResourceType'},
+            }
+        })
+        self.stack = stack.Stack(self.ctx, 'test_stack', self.tmpl)
+
+    def _parse_count(self):
+        return self.patchobject(
+            self.tmpl, '_parse_resource_definitions',
+            wraps=self.tmpl._parse_resource_definitions)
+
+    def test_memoized_for_same_stack(self):
+        mock_parse = self._parse_count()
+        defns1 = self.tmpl.resource_definitions(self.stack)
+        defns2 = self.tmpl.resource_definitions(self.stack)
+        self.assertEqual(1, mock_parse.call_count)
+        self.assertEqual(defns1, defns2)
+        self.assertIsNot(defns1, defns2)
+        self.assertIs(defns1['foo'], defns2['foo'])
+
+    def test_not_shared_between_stacks(self):
+        mock_parse = self._parse_count()
+        other = stack.Stack(self.ctx, 'other_stack', self.tmpl)
+        self.tmpl.resource_definitions(self.stack)
+        self.tmpl.resource_definitions(other)
+        self.assertEqual(2, mock_parse.call_count)
+
+    def test_invalidated_on_parameter_change(self):
+        mock_parse = self._parse_count()
+        self.tmpl.resource_definitions(self.stack)
+        self.stack.parameters = self.tmpl.parameters(None, {})
+        self.tmpl.resource_definitions(self.stack)
+        self.assertEqual(2, mock_parse.call_count)
+
+    def test_invalidated_on_template_change(self):
+        defns = self.tmpl.resource_definitions(self.stack)
+        self.tmpl.add_resource(rsrc_defn.ResourceDefinition(
+            'baz', 'GenericResourceType'))
+        self.assertIn('baz', self.tmpl.resource_definitions(self.stack))
+
+        self.tmpl.remove_resource('foo')
+        self.assertNotIn('foo', self.tmpl.resource_definitions(self.stack))
+        self.assertIn('foo', defns)
+
+    def test_invalidated_on_template_change_in_place(self):
+        mock_parse = self._parse_count()
+        defns = self.tmpl.resource_definitions(self.stack)
+        self.tmpl.t['resources']['foo']['properties'] = {'Foo': 'abc'}
+        self.assertIs(defns['foo'],
+                      self.tmpl.resource_definitions(self.stack)['foo'])
+        self.assertEqual(1, mock_parse.call_count)
+
+        self.tmpl.resources_changed()
+        new_defns = self.tmpl.resource_definitions(self.stack)
+        self.assertIsNot(defns['foo'], new_defns['foo'])
+        self.assertEqual({'Foo': 'abc'}, new_defns['foo']._properties)
+
+
 class TemplateFnErrorTest(common.HeatTestCase):
     scenarios = [
         ('select_from_list_not_int',